@@ -19,13 +19,30 @@ if os.path.exists(_cert_path):
 import streamlit as st
 import pandas as pd
 import numpy as np
+import pyarrow as pa
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import requests
 from datetime import datetime, timedelta
 import yfinance as yf
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import sys
 import json
+import hashlib
+import time
+import inspect
+import functools
+import copy
+import threading
+import multiprocessing
+from collections import OrderedDict
+from string import Template
+from typing import NamedTuple, Optional
+
+import backtest
 
 # ══════════════════════════════════════════════
 #  PAGE CONFIG
@@ -401,6 +418,33 @@ hr { border-color: var(--toss-border-light) !important; opacity: 0.6; }
 ::-webkit-scrollbar-thumb { background: var(--toss-text4); border-radius: 3px; }
 ::-webkit-scrollbar-thumb:hover { background: var(--toss-text3); }
 
+/* ─── 펀더멘탈 리포트 ─── */
+.fr-report { font-family: 'Pretendard', -apple-system, BlinkMacSystemFont, system-ui, sans-serif; background: #f4f5f7; padding: 4px 0; }
+.fr-card { background: #ffffff; border-radius: 16px; padding: 24px 28px; margin: 16px 0; border-left: 5px solid var(--fr-accent); box-shadow: 0 1px 4px rgba(0,0,0,0.04); }
+.fr-card h3 { margin: 0 0 14px 0; font-size: 1.05rem; font-weight: 700; color: #191f28; }
+.fr-body { color: #4e5968; line-height: 1.9; font-size: 0.86rem; }
+.fr-body h4 { color: #191f28; font-size: 0.92rem; font-weight: 600; margin: 16px 0 6px 0; }
+.fr-body h4:first-child { margin-top: 10px; }
+.fr-good { --fr-accent: #00b386; --fr-tint: rgba(0,179,134,0.09); }
+.fr-warn { --fr-accent: #ff9f43; --fr-tint: rgba(255,159,67,0.09); }
+.fr-bad { --fr-accent: #f04452; --fr-tint: rgba(240,68,82,0.09); }
+.fr-blue { --fr-accent: #3182f6; }
+.fr-purple { --fr-accent: #6c5ce7; }
+.fr-dark { --fr-accent: #191f28; }
+.fr-badge { display: inline-block; background: var(--fr-tint); color: var(--fr-accent); padding: 5px 16px; border-radius: 20px; font-weight: 700; font-size: 0.88rem; }
+.fr-summary { color: #4e5968; line-height: 1.8; font-size: 0.88rem; margin-top: 12px; }
+.fr-up { color: #00b386; font-weight: 600; }
+.fr-down { color: #f04452; font-weight: 600; }
+.fr-flat { color: #8b95a1; font-weight: 600; }
+.fr-pill { padding: 4px 12px; border-radius: 12px; font-weight: 700; }
+.fr-pill-buy { background: #e8fff3; color: #00b386; }
+.fr-pill-accumulate { background: #e8f3ff; color: #3182f6; }
+.fr-pill-hold { background: #fff8e8; color: #e09200; }
+.fr-pill-sell { background: #fff0f0; color: #f04452; }
+.fr-note { margin-top: 12px; padding: 12px 16px; background: #f4f5f7; border-radius: 10px; font-size: 0.82rem; color: #4e5968; }
+.fr-list { padding-left: 20px; }
+.fr-footer { text-align: center; padding: 12px; color: #b0b8c1; font-size: 0.72rem; margin-top: 8px; }
+
 /* ─── Streamlit 브랜딩 숨기기 ─── */
 #MainMenu { visibility: hidden; }
 footer { visibility: hidden !important; display: none !important; }
@@ -1314,6 +1358,15 @@ def resolve_ticker(user_input):
     return upper
 
 
+def normalize_ticker_input(text):
+    """티커 형태(영문·숫자·.-=^)는 그대로 대문자로, 종목명만 resolve_ticker로 변환 (리런마다 검색 방지)"""
+    import re
+    text = (text or "").strip()
+    if re.fullmatch(r"[A-Za-z0-9.\-=^]+", text):
+        return text.upper()
+    return resolve_ticker(text) if text else ""
+
+
 # ══════════════════════════════════════════════
 #  INDICATOR IMPACT KNOWLEDGE BASE
 # ══════════════════════════════════════════════
@@ -1586,11 +1639,228 @@ RATIO_DEFINITIONS = {
     },
 }
 
+# ══════════════════════════════════════════════
+#  DATA CACHE LAYER (Arrow IPC)
+# ══════════════════════════════════════════════
+
+def _frame_to_ipc(df):
+    """DataFrame → Arrow IPC 스트림 버퍼 (RangeIndex는 메타데이터로만 보관)"""
+    table = pa.Table.from_pandas(df)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def _ipc_to_frame(buf):
+    """Arrow IPC 버퍼 → DataFrame. 결측 없는 숫자 컬럼은 버퍼를 그대로 공유 (zero-copy, 읽기 전용)"""
+    table = pa.ipc.open_stream(buf).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+ARROW_CACHE_BUDGET_MB = 256
+
+
+def _approx_size(obj, _depth=0):
+    """dict/list/str 중첩 구조의 대략적인 메모리 크기 (바이트)"""
+    size = sys.getsizeof(obj)
+    if _depth > 8:
+        return size
+    if isinstance(obj, dict):
+        size += sum(_approx_size(k, _depth + 1) + _approx_size(v, _depth + 1) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(_approx_size(v, _depth + 1) for v in obj)
+    return size
+
+
+def _encode_payload(value):
+    """캐시 저장용 인코딩. (payload, 상주 바이트, pandas 바이트) 반환"""
+    if isinstance(value, pd.DataFrame):
+        pandas_bytes = int(value.memory_usage(deep=True).sum())
+        try:
+            buf = _frame_to_ipc(value)
+            return ("frame", buf), buf.size, pandas_bytes
+        except (pa.ArrowException, TypeError, ValueError):
+            return ("raw", copy.deepcopy(value)), pandas_bytes, pandas_bytes
+    if isinstance(value, dict) and value and all(isinstance(v, pd.DataFrame) for v in value.values()):
+        encoded = {}
+        resident = pandas_bytes = 0
+        for k, v in value.items():
+            encoded[k], rb, pb = _encode_payload(v)
+            resident += rb
+            pandas_bytes += pb
+        return ("dict", encoded), resident, pandas_bytes
+    return ("raw", copy.deepcopy(value)), _approx_size(value), 0
+
+
+def _decode_payload(payload):
+    """캐시 항목 복원. 프레임이 아닌 값(info dict, 뉴스 목록 등)은 세션 간 공유되므로 매번 깊은 복사본을 반환
+
+    pickle 대신 deepcopy를 쓰는 이유: 스크립트가 리런마다 다시 정의하는 클래스(NewsRecord 등)는
+    이름으로 다시 찾는 pickle로는 복원되지 않는다.
+    """
+    kind, data = payload
+    if kind == "frame":
+        return _ipc_to_frame(data)
+    if kind == "dict":
+        return {k: _decode_payload(v) for k, v in data.items()}
+    return copy.deepcopy(data)
+
+
+class _ArrowCache:
+    """프로세스 공유 TTL 캐시 — DataFrame은 Arrow IPC 버퍼로 보관, 메모리 예산 초과 시 LRU 축출"""
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._inflight = {}  # 계산 중인 키 → Future(payload). 동시 미스는 한 번만 계산하고 나머지는 대기
+
+    def _func_stats(self, name):
+        return self._stats.setdefault(name, {"hits": 0, "misses": 0, "waits": 0, "evictions": 0, "hit_seconds": 0.0})
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry["bytes"]
+        return entry
+
+    def get_or_compute(self, name, key, ttl, compute):
+        t0 = time.perf_counter()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry["expires"] > now:
+                    self._entries.move_to_end(key)
+                else:
+                    self._drop(key)
+                    entry = None
+            pending = None
+            if entry is None:
+                pending = self._inflight.get(key)
+                owner = pending is None
+                if owner:
+                    pending = self._inflight[key] = Future()
+        if entry is not None:
+            value = _decode_payload(entry["payload"])
+            with self._lock:
+                fs = self._func_stats(name)
+                fs["hits"] += 1
+                fs["hit_seconds"] += time.perf_counter() - t0
+            return value
+        if not owner:
+            payload = pending.result()  # 먼저 계산을 시작한 호출의 결과(또는 예외)를 공유
+            if payload is None:  # 계산하던 세션이 리런으로 중단됨 → 이 호출이 다시 계산
+                return self.get_or_compute(name, key, ttl, compute)
+            with self._lock:
+                self._func_stats(name)["waits"] += 1
+            return _decode_payload(payload)
+
+        try:
+            value = compute()
+            payload, resident, pandas_bytes = _encode_payload(value)
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(key, None)
+            # 일반 예외는 대기자에게 그대로 전달, 리런 중단(StopException 등)은 대기자가 직접 재계산하도록 신호만 보냄
+            if isinstance(exc, Exception):
+                pending.set_exception(exc)
+            else:
+                pending.set_result(None)
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+            pending.set_result(payload)
+            self._func_stats(name)["misses"] += 1
+            if key in self._entries:
+                self._drop(key)
+            if resident > self.budget_bytes:
+                self._func_stats(name)["evictions"] += 1
+                return _decode_payload(payload)
+            for k in [k for k, e in self._entries.items() if e["expires"] <= now]:
+                self._drop(k)
+            while self._entries and self._total_bytes + resident > self.budget_bytes:
+                _, old = self._entries.popitem(last=False)
+                self._total_bytes -= old["bytes"]
+                self._func_stats(old["name"])["evictions"] += 1
+            self._entries[key] = {
+                "name": name, "expires": now + ttl, "payload": payload,
+                "bytes": resident, "pandas_bytes": pandas_bytes,
+            }
+            self._total_bytes += resident
+        # 히트와 같은 형태(캐시 버퍼에서 복원한 값)를 돌려줘야 첫 호출과 이후 호출의 동작이 같다
+        return _decode_payload(payload)
+
+    def clear(self, name=None):
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+                self._stats.clear()
+                self._total_bytes = 0
+            else:
+                for k in [k for k, e in self._entries.items() if e["name"] == name]:
+                    self._drop(k)
+
+    def usage(self):
+        """(사용 바이트, 예산 바이트, 항목 수)"""
+        with self._lock:
+            return self._total_bytes, self.budget_bytes, len(self._entries)
+
+    def report(self):
+        """함수별 히트/미스/축출 · 히트 지연 · 항목당 메모리 리포트"""
+        with self._lock:
+            entries = list(self._entries.values())
+            stats = {k: dict(v) for k, v in self._stats.items()}
+        rows = []
+        for name, s in stats.items():
+            mine = [e for e in entries if e["name"] == name]
+            n = len(mine)
+            pandas_total = sum(e["pandas_bytes"] for e in mine)
+            rows.append({
+                "함수": name,
+                "항목": n,
+                "히트": s["hits"],
+                "미스": s["misses"],
+                "대기": s["waits"],
+                "축출": s["evictions"],
+                "평균 히트(µs)": (s["hit_seconds"] / s["hits"] * 1e6) if s["hits"] else None,
+                "항목당 메모리(KB)": (sum(e["bytes"] for e in mine) / n / 1024) if n else None,
+                "항목당 pandas(KB)": (pandas_total / n / 1024) if n and pandas_total else None,
+            })
+        return pd.DataFrame(rows)
+
+
+@st.cache_resource
+def _get_arrow_cache():
+    """리런 간 유지되는 단일 캐시 인스턴스"""
+    return _ArrowCache(ARROW_CACHE_BUDGET_MB * 1024 * 1024)
+
+
+def arrow_cache(ttl):
+    """st.cache_data 대체 데코레이터 — pickle/복사 대신 Arrow IPC 버퍼를 캐시"""
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"  # 같은 이름의 함수끼리 항목이 섞이지 않도록
+        sig = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (name, tuple(bound.arguments.items()))
+            return _get_arrow_cache().get_or_compute(name, key, ttl, lambda: func(*args, **kwargs))
+
+        wrapper.clear = lambda: _get_arrow_cache().clear(name)
+        return wrapper
+    return decorator
+
+
 # ══════════════════════════════════════════════
 #  DATA FETCHING FUNCTIONS
 # ══════════════════════════════════════════════
 
-@st.cache_data(ttl=3600)
+@arrow_cache(ttl=3600)
 def fetch_fred(series_id, start_date, end_date):
     """FRED API에서 경제 지표 데이터 가져오기"""
     url = "https://api.stlouisfed.org/fred/series/observations"
@@ -1613,7 +1883,7 @@ def fetch_fred(series_id, start_date, end_date):
     return pd.DataFrame()
 
 
-@st.cache_data(ttl=3600)
+@arrow_cache(ttl=3600)
 def fetch_ecos(stat_code, item_code, start_date, end_date):
     """ECOS API에서 한국 경제 지표 데이터 가져오기"""
     start = start_date.replace("-", "")[:6]
@@ -1635,7 +1905,7 @@ def fetch_ecos(stat_code, item_code, start_date, end_date):
     return pd.DataFrame()
 
 
-@st.cache_data(ttl=120)
+@st.cache_data(ttl=120, max_entries=64)
 def fetch_coingecko_price(coin_id):
     """CoinGecko에서 실시간 암호화폐 가격"""
     try:
@@ -1648,7 +1918,7 @@ def fetch_coingecko_price(coin_id):
     return {}
 
 
-@st.cache_data(ttl=300)
+@arrow_cache(ttl=300)
 def fetch_coingecko_chart(coin_id, days=30):
     """CoinGecko에서 암호화폐 차트 데이터"""
     try:
@@ -1665,7 +1935,7 @@ def fetch_coingecko_chart(coin_id, days=30):
     return pd.DataFrame()
 
 
-@st.cache_data(ttl=600)
+@arrow_cache(ttl=600)
 def fetch_stock_info(ticker):
     """yfinance로 종목 기본 정보 가져오기"""
     try:
@@ -1676,41 +1946,63 @@ def fetch_stock_info(ticker):
         return {}
 
 
-@st.cache_data(ttl=600)
-def fetch_stock_financials(ticker):
-    """yfinance로 재무제표 가져오기"""
+# 재무제표 종류 → yfinance Ticker 속성
+FINANCIAL_STATEMENTS = {
+    "balance_sheet": "balance_sheet",
+    "income_stmt": "income_stmt",
+    "cashflow": "cashflow",
+    "q_balance_sheet": "quarterly_balance_sheet",
+    "q_income_stmt": "quarterly_income_stmt",
+}
+
+
+@arrow_cache(ttl=600)
+def fetch_financial_statement(ticker, statement):
+    """yfinance로 재무제표 1종 가져오기 (statement: FINANCIAL_STATEMENTS 키)"""
     try:
-        stock = yf.Ticker(ticker)
-        result = {}
+        df = getattr(yf.Ticker(ticker), FINANCIAL_STATEMENTS[statement])
+        if df is not None and not df.empty:
+            return df
+    except Exception:
+        pass
+    return pd.DataFrame()
 
-        # 재무제표
-        bs = stock.balance_sheet
-        if bs is not None and not bs.empty:
-            result["balance_sheet"] = bs
 
-        inc = stock.income_stmt
-        if inc is not None and not inc.empty:
-            result["income_stmt"] = inc
+class LazyFinancials:
+    """재무제표 묶음 — 항목에 처음 접근할 때 해당 재무제표만 다운로드 (종류별 개별 캐시)"""
 
-        cf = stock.cashflow
-        if cf is not None and not cf.empty:
-            result["cashflow"] = cf
+    def __init__(self, ticker):
+        self.ticker = ticker
 
-        # 분기 재무제표
-        qbs = stock.quarterly_balance_sheet
-        if qbs is not None and not qbs.empty:
-            result["q_balance_sheet"] = qbs
+    def get(self, statement, default=None):
+        df = fetch_financial_statement(self.ticker, statement)
+        return df if not df.empty else default
 
-        qinc = stock.quarterly_income_stmt
-        if qinc is not None and not qinc.empty:
-            result["q_income_stmt"] = qinc
+    def __getitem__(self, statement):
+        df = self.get(statement)
+        if df is None:
+            raise KeyError(statement)
+        return df
+
+    def __contains__(self, statement):
+        return self.get(statement) is not None
+
+    def prefetch(self, statements):
+        """여러 재무제표를 병렬로 미리 받아 캐시에 채움"""
+        return load_parallel({
+            s: functools.partial(fetch_financial_statement, self.ticker, s) for s in statements
+        })
+
+    def __repr__(self):
+        return f"LazyFinancials({self.ticker!r})"
 
-        return result
-    except Exception:
-        return {}
+
+def fetch_stock_financials(ticker):
+    """재무제표 지연 로딩 핸들 반환 — 실제 다운로드는 각 재무제표 접근 시"""
+    return LazyFinancials(ticker)
 
 
-@st.cache_data(ttl=300)
+@arrow_cache(ttl=300)
 def fetch_stock_history(ticker, period="1y"):
     """yfinance로 주가 히스토리"""
     try:
@@ -1723,7 +2015,44 @@ def fetch_stock_history(ticker, period="1y"):
         return pd.DataFrame()
 
 
-@st.cache_data(ttl=3600)
+@arrow_cache(ttl=3600)
+def fetch_price_panel(tickers, period="1y"):
+    """여러 종목 종가를 yf.download 한 번으로 → DataFrame(index: 날짜(tz 없음), columns: 티커)"""
+    tickers = sorted(set(tickers))
+    if not tickers:
+        return pd.DataFrame()
+    try:
+        data = yf.download(tickers, period=period, auto_adjust=True, progress=False, threads=True)
+    except Exception:
+        return pd.DataFrame()
+    if data is None or data.empty:
+        return pd.DataFrame()
+    if isinstance(data.columns, pd.MultiIndex):
+        close = data["Close"]
+    else:
+        close = data[["Close"]].set_axis(tickers[:1], axis=1)
+    close = close.dropna(axis=1, how="all").dropna(how="all")
+    if close.index.tz is not None:
+        close.index = close.index.tz_localize(None)
+    close.columns = [str(c) for c in close.columns]
+    return close.astype(float)
+
+
+@arrow_cache(ttl=86400)
+def fetch_peer_tickers(group, key):
+    """yfinance 섹터/산업 상위 기업 티커 목록 (group: 'sector' | 'industry')"""
+    try:
+        domain = yf.Industry(key) if group == "industry" else yf.Sector(key)
+        top = domain.top_companies
+        if top is not None and not top.empty:
+            symbols = top["symbol"] if "symbol" in top.columns else top.index
+            return [str(sym) for sym in symbols]
+    except Exception:
+        pass
+    return []
+
+
+@st.cache_data(ttl=3600, max_entries=256)
 def search_ticker(query):
     """종목 검색 (yfinance)"""
     try:
@@ -1743,7 +2072,7 @@ def search_ticker(query):
         return []
 
 
-@st.cache_data(ttl=3600)
+@arrow_cache(ttl=3600)
 def load_macro_data(start_date, end_date):
     """거시경제 데이터 일괄 로드"""
     data = {}
@@ -1755,8 +2084,11 @@ def load_macro_data(start_date, end_date):
         "미국CPI": "CPIAUCSL", "미국실업률": "UNRATE",
         "연준자산": "WALCL", "구리": "PCOPPUSDM",
     }
-    for name, code in fred_items.items():
-        df = fetch_fred(code, start_date, end_date)
+    fred_frames = load_parallel({
+        name: functools.partial(fetch_fred, code, start_date, end_date)
+        for name, code in fred_items.items()
+    })
+    for name, df in fred_frames.items():
         if not df.empty:
             data[name] = df.set_index("date")["value"]
 
@@ -1784,15 +2116,83 @@ def load_macro_data(start_date, end_date):
         pass
 
     if data:
-        result = pd.DataFrame(data).sort_index()
-        if "한국금리" in result.columns and "미국금리" in result.columns:
-            result["금리차"] = result["한국금리"] - result["미국금리"]
-        if "미국10Y" in result.columns and "미국2Y" in result.columns:
-            result["장단기스프레드"] = result["미국10Y"] - result["미국2Y"]
-        return result
+        return _add_macro_spreads(pd.DataFrame(data).sort_index())
     return pd.DataFrame()
 
 
+def _add_macro_spreads(result):
+    """금리차 · 장단기스프레드 파생 컬럼 (재정렬 후에도 원 지표에서 다시 계산)"""
+    if "한국금리" in result.columns and "미국금리" in result.columns:
+        result["금리차"] = result["한국금리"] - result["미국금리"]
+    if "미국10Y" in result.columns and "미국2Y" in result.columns:
+        result["장단기스프레드"] = result["미국10Y"] - result["미국2Y"]
+    return result
+
+
+def load_parallel(tasks, max_workers=None):
+    """페이지의 독립적인 fetch 호출을 동시에 실행. {이름: 무인자 함수} → {이름: 결과}"""
+    ctx = get_script_run_ctx()
+
+    def run(fn):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return fn()
+
+    with ThreadPoolExecutor(max_workers=max_workers or max(len(tasks), 1)) as pool:
+        futures = {name: pool.submit(run, fn) for name, fn in tasks.items()}
+        return {name: fut.result() for name, fut in futures.items()}
+
+
+@st.cache_resource
+def _get_process_pool():
+    """CPU 바운드 작업(백테스트 스윕)용 프로세스 풀 — 리런·세션 간 공유
+
+    spawn 워커는 이 스크립트가 아니라 streamlit에 의존하지 않는 backtest 모듈만 import한다.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max(1, min(4, os.cpu_count() or 1)),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+@arrow_cache(ttl=3600)
+def load_backtest_sweep(tickers, period, windows, lowers, uppers, entry, exit, cost_bps):
+    """종목 × RSI 윈도우 × 하한 × 상한 스윕 → 성과표 (종목별로 프로세스 풀에 분산)"""
+    closes = fetch_price_panel(tickers, period)
+    if closes.empty:
+        return pd.DataFrame()
+    spec = {"rsi_window": list(windows), "rsi_lower": list(lowers), "rsi_upper": list(uppers)}
+    rule = {"entry": list(entry), "exit": list(exit), "cost_bps": cost_bps}
+    try:
+        return backtest.sweep(closes, spec, rule, executor=_get_process_pool())
+    except BrokenProcessPool:
+        # 워커가 죽으면 풀을 버리고 이번 요청은 현재 프로세스에서 계산
+        _get_process_pool.clear()
+        return backtest.sweep(closes, spec, rule)
+
+
+@arrow_cache(ttl=3600)
+def load_grid_optimization(ticker, period, family, spec, n_splits, anchored, cost_bps):
+    """단일 종목 파라미터 그리드 최적화 + 워크포워드 검증 → {"top": 샤프순 전체 성과표, "folds", "summary", "equity"}
+
+    spec: ((파라미터, (값, ...)), ...) — 캐시 키로 쓰기 위해 튜플
+    """
+    hist = fetch_stock_history(ticker, period=period)
+    if hist.empty:
+        return {}
+    close = hist["Close"].dropna()
+    close.index = close.index.tz_localize(None) if close.index.tz is not None else close.index
+    spec = dict(spec)
+    top = backtest.grid_search(close.to_numpy(), family, spec, cost_bps)
+    wf = backtest.walk_forward(close, family, spec, n_splits, anchored, cost_bps=cost_bps)
+    if top.empty or wf["folds"].empty:
+        return {}
+    oos = wf["oos"]
+    equity = pd.DataFrame({"워크포워드": (1 + oos).cumprod(),
+                           "매수 후 보유": close.loc[oos.index] / close.shift(1).loc[oos.index[0]]})
+    return {"top": top, "folds": wf["folds"], "summary": wf["summary"], "equity": equity}
+
+
 # ══════════════════════════════════════════════
 #  FINANCIAL ANALYSIS FUNCTIONS
 # ══════════════════════════════════════════════
@@ -1918,13 +2318,804 @@ def calculate_historical_ratios(financials):
     return pd.DataFrame()
 
 
+# 비율 계산에 쓰는 재무제표 항목 (후보 행 이름은 앞쪽 우선)
+STATEMENT_LINE_ITEMS = {
+    "current_assets": ["Current Assets", "Total Current Assets"],
+    "current_liabilities": ["Current Liabilities", "Total Current Liabilities"],
+    "inventory": ["Inventory", "Inventories"],
+    "total_debt": ["Total Debt", "Long Term Debt And Capital Lease Obligation"],
+    "total_equity": ["Stockholders Equity", "Total Stockholders Equity", "Common Stock Equity", "Total Equity Gross Minority Interest"],
+    "total_assets": ["Total Assets"],
+    "revenue": ["Total Revenue", "Revenue"],
+    "operating_income": ["Operating Income", "EBIT"],
+    "net_income": ["Net Income", "Net Income Common Stockholders"],
+    "gross_profit": ["Gross Profit"],
+    "shares": ["Ordinary Shares Number", "Share Issued"],
+}
+_BALANCE_ITEMS = ["current_assets", "current_liabilities", "inventory", "total_debt", "total_equity", "total_assets", "shares"]
+_FLOW_ITEMS = ["revenue", "operating_income", "net_income", "gross_profit"]
+
+
+def statement_series(df, row_names):
+    """후보 행 중 열(기간)마다 처음으로 값이 있는 항목을 골라 날짜 오름차순 Series로 반환"""
+    if df is None or df.empty:
+        return pd.Series(dtype=float)
+    rows = [n for n in row_names if n in df.index]
+    if not rows:
+        return pd.Series(np.nan, index=pd.to_datetime(df.columns)).sort_index()
+    vals = df.loc[rows].apply(pd.to_numeric, errors="coerce").bfill().iloc[0]
+    vals.index = pd.to_datetime(vals.index)
+    return vals.sort_index()
+
+
+def statement_items(bs, inc):
+    """대차대조표/손익계산서 → 기간(오름차순) × 항목 DataFrame"""
+    items = {k: statement_series(bs, STATEMENT_LINE_ITEMS[k]) for k in _BALANCE_ITEMS}
+    items.update({k: statement_series(inc, STATEMENT_LINE_ITEMS[k]) for k in _FLOW_ITEMS})
+    return pd.DataFrame(items).sort_index()
+
+
+def ttm_flows(q):
+    """분기 항목 DataFrame의 손익 항목을 최근 4분기 합(TTM)으로 — 4개 분기가 연속일 때만
+
+    세 간격이 모두 한 분기(≤ 100일) 이내여야 연속으로 본다. 처음-끝 간격만 보면 한 분기가 빠진
+    네 행(다섯 분기에 걸친 구간)도 통과한다.
+    """
+    dates = q.index.to_series()
+    step_ok = ((dates - dates.shift(1)).dt.days <= 100).astype(float)
+    contiguous = step_ok.rolling(3, min_periods=3).sum() == 3
+    return q[_FLOW_ITEMS].rolling(4, min_periods=4).sum().where(contiguous, axis=0)
+
+
+def calculate_ttm_ratios(financials):
+    """분기 재무제표 기반 TTM(최근 4분기) 비율 추이 — 최신 분기가 맨 위"""
+    qbs = financials.get("q_balance_sheet")
+    qinc = financials.get("q_income_stmt")
+    if qbs is None or qinc is None:
+        return pd.DataFrame()
+
+    q = statement_items(qbs, qinc)
+    if q.empty:
+        return pd.DataFrame()
+
+    ttm = ttm_flows(q)
+    dates = q.index.to_series()
+    consecutive = (dates - dates.shift(1)).dt.days <= 100
+
+    def ratio(num, den, scale=1.0):
+        return num / den.where(den != 0) * scale
+
+    out = pd.DataFrame(index=q.index)
+    out["유동비율"] = ratio(q["current_assets"], q["current_liabilities"])
+    out["당좌비율"] = ratio(q["current_assets"] - q["inventory"].fillna(0), q["current_liabilities"])
+    out["부채비율"] = ratio(q["total_debt"], q["total_equity"])
+    out["ROE(%)"] = ratio(ttm["net_income"], q["total_equity"], 100)
+    out["ROA(%)"] = ratio(ttm["net_income"], q["total_assets"], 100)
+    out["영업이익률(%)"] = ratio(ttm["operating_income"], ttm["revenue"], 100)
+    out["순이익률(%)"] = ratio(ttm["net_income"], ttm["revenue"], 100)
+    out["매출총이익률(%)"] = ratio(ttm["gross_profit"], ttm["revenue"], 100)
+    out["분기 영업이익률(%)"] = ratio(q["operating_income"], q["revenue"], 100)
+    out["매출 QoQ(%)"] = (q["revenue"].pct_change(fill_method=None) * 100).where(consecutive)
+
+    out = out.dropna(how="all").dropna(axis=1, how="all")
+    out.index = out.index.strftime("%Y-%m-%d")
+    out.index.name = "분기"
+    return out.iloc[::-1]
+
+
+# ══════════════════════════════════════════════
+#  PEER RANKING (동종업계 백분위)
+# ══════════════════════════════════════════════
+
+# info 키 → (표시명, 낮을수록 유리, 양수만 유효, 비율(×100 표시))
+PEER_RATIO_FIELDS = {
+    "returnOnEquity": ("ROE", False, False, True),
+    "returnOnAssets": ("ROA", False, False, True),
+    "profitMargins": ("순이익률", False, False, True),
+    "operatingMargins": ("영업이익률", False, False, True),
+    "currentRatio": ("유동비율", False, False, False),
+    "debtToEquity": ("부채비율(%)", True, False, False),
+    "trailingPE": ("PER", True, True, False),
+    "priceToBook": ("PBR", True, True, False),
+    "enterpriseToEbitda": ("EV/EBITDA", True, True, False),
+    "revenueGrowth": ("매출 성장률", False, False, True),
+    "earningsGrowth": ("이익 성장률", False, False, True),
+    "healthScore": ("건전성 점수", False, False, False),  # info 필드가 아니라 HEALTH_SCORE_RULES로 채점한 총점
+}
+PEER_MIN_SAMPLES = 5
+
+
+def _domain_key(name):
+    """'Consumer Electronics' → 'consumer-electronics' (yfinance 섹터/산업 키 형식)"""
+    import re
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+@arrow_cache(ttl=86400)
+def build_peer_distribution(group, key):
+    """섹터/산업 동종기업의 비율 분포 — 항목별로 정렬된 배열을 미리 만들어 둠"""
+    tickers = fetch_peer_tickers(group, key)
+    if not tickers:
+        return {}
+    infos = load_parallel({t: functools.partial(fetch_stock_info, t) for t in tickers}, max_workers=8)
+    table = pd.DataFrame(
+        [[info.get(f) for f in PEER_RATIO_FIELDS] for info in infos.values()],
+        columns=list(PEER_RATIO_FIELDS)
+    ).apply(pd.to_numeric, errors="coerce")
+    table["healthScore"] = score_health_records(list(infos.values()))["total"].to_numpy(dtype=float)
+
+    dist = {}
+    for field, (_, _, positive_only, _) in PEER_RATIO_FIELDS.items():
+        vals = table[field].to_numpy(dtype=float)
+        vals = vals[np.isfinite(vals)]
+        if positive_only:
+            vals = vals[vals > 0]
+        if len(vals) >= PEER_MIN_SAMPLES:
+            dist[field] = np.sort(vals)
+    return {"group": group, "key": key, "tickers": tickers, "sorted": dist}
+
+
+def load_peer_distribution(info):
+    """info의 산업 → 섹터 순으로 비교 가능한 동종업계 분포를 찾음"""
+    candidates = [
+        ("industry", info.get("industryKey") or (info.get("industry") and _domain_key(info["industry"]))),
+        ("sector", info.get("sectorKey") or (info.get("sector") and _domain_key(info["sector"]))),
+    ]
+    for group, key in candidates:
+        if not key:
+            continue
+        dist = build_peer_distribution(group, key)
+        if len(dist.get("sorted", {})) >= 3:
+            return dist
+    return {}
+
+
+def percentile_rank(sorted_values, values):
+    """정렬 배열 기준 백분위 (동률은 중간 순위). values는 스칼라 또는 배열"""
+    v = np.asarray(values, dtype=float)
+    lo = np.searchsorted(sorted_values, v, side="left")
+    hi = np.searchsorted(sorted_values, v, side="right")
+    return (lo + hi) / 2 / len(sorted_values) * 100
+
+
+def rank_against_peers(info, dist):
+    """종목 비율의 동종업계 백분위 표. '유리 백분위'는 낮을수록 좋은 지표를 뒤집은 값"""
+    info = {**info, "healthScore": calculate_financial_health_score(info)[0]}
+    rows = []
+    for field, arr in dist.get("sorted", {}).items():
+        label, lower, positive_only, is_fraction = PEER_RATIO_FIELDS[field]
+        v = info.get(field)
+        if not isinstance(v, (int, float)) or not np.isfinite(v) or (positive_only and v <= 0):
+            continue
+        pct = float(percentile_rank(arr, v))
+        scale = 100 if is_fraction else 1
+        rows.append({
+            "지표": label,
+            "값": v * scale,
+            "업종 중앙값": float(np.median(arr)) * scale,
+            "백분위": pct,
+            "유리 백분위": 100 - pct if lower else pct,
+            "표본": len(arr),
+        })
+    return pd.DataFrame(rows)
+
+
+def peer_color_class(favorable_pct):
+    """동종업계 유리 백분위에 따른 색상 클래스 (상위/하위 1/3 기준)"""
+    if favorable_pct is None or pd.isna(favorable_pct):
+        return ""
+    if favorable_pct >= 200 / 3:
+        return "ratio-good"
+    if favorable_pct <= 100 / 3:
+        return "ratio-bad"
+    return "ratio-warn"
+
+
+# ══════════════════════════════════════════════
+#  MACRO ANALYTICS (상관 · 회귀 · 선후행)
+# ══════════════════════════════════════════════
+
+# 정렬 주기: 라벨 → (pandas 리샘플 규칙, 한 주기의 대략적 일수)
+MACRO_FREQUENCIES = {
+    "일간": ("B", 1.4),
+    "주간": ("W-FRI", 7),
+    "월간": ("ME", 30.4),
+}
+# 주기 안에서 값을 합치는 방법 (기본 last: 금리·가격·지수 등 수준 지표는 기말값)
+MACRO_AGGREGATION = {
+    "VIX": "mean",
+    "하이일드스프레드": "mean",
+}
+_DERIVED_MACRO_COLUMNS = ("금리차", "장단기스프레드")
+
+
+def align_macro_frame(df, freq="월간"):
+    """일간·주간·월간이 섞인 load_macro_data 결과를 하나의 주기로 정렬
+
+    각 지표를 자기 관측치만으로 리샘플(last/mean/sum)한 뒤, 목표 주기보다 드문 지표는
+    원래 발표 간격만큼만 직전 값을 이어 쓴다. 파생 스프레드는 정렬된 원 지표로 다시 계산.
+    """
+    rule, period_days = MACRO_FREQUENCIES[freq]
+    columns = {}
+    for col in df.columns:
+        if col in _DERIVED_MACRO_COLUMNS:
+            continue
+        s = df[col].dropna()
+        if s.empty:
+            continue
+        resampled = s.resample(rule).agg(MACRO_AGGREGATION.get(col, "last"))
+        if len(s) > 1:
+            native_days = float(np.median(np.diff(s.index.values)) / np.timedelta64(1, "D"))
+            if native_days > period_days * 1.5:
+                resampled = resampled.ffill(limit=int(np.ceil(native_days / period_days)))
+        columns[col] = resampled
+    if not columns:
+        return pd.DataFrame()
+    aligned = pd.DataFrame(columns).dropna(how="all")
+    return _add_macro_spreads(aligned)
+
+
+@arrow_cache(ttl=3600)
+def load_macro_frame(start_date, end_date, freq="월간"):
+    """주기별로 정렬된 거시 데이터 (주기마다 따로 캐시)"""
+    df = load_macro_data(start_date, end_date)
+    return align_macro_frame(df, freq) if not df.empty else df
+
+
+class RollingCorrelation:
+    """누적합 기반 롤링/확장 상관행렬 엔진
+
+    지표쌍마다 (공통 관측 수, Σx, Σx², Σxy)의 누적합을 (T+1, K, K) 배열로 들고 있어
+    임의 구간의 상관행렬이 누적합 두 개의 차이(O(K²))로 나온다. 결측은 쌍별로 제외
+    (pandas corr()와 동일)하고, 새 관측치가 붙으면 마지막 누적합에서 이어서 쌓는다.
+    """
+
+    def __init__(self, df):
+        values = df.to_numpy(dtype=float)
+        self.columns = list(df.columns)
+        # 누적합 자릿수 손실을 막기 위해 열별로 표준화 (상관계수는 평행이동·배율에 불변)
+        with np.errstate(invalid="ignore"):
+            self._shift = np.nan_to_num(np.nanmean(values, axis=0)) if len(values) else np.zeros(len(self.columns))
+            scale = np.nanstd(values, axis=0) if len(values) else np.ones(len(self.columns))
+        self._scale = np.where(np.isfinite(scale) & (scale > 0), scale, 1.0)
+        self.index = df.index[:0]
+        self._values = values[:0]
+        self._cum = np.zeros((4, 1, len(self.columns), len(self.columns)))
+        self.update(df)
+
+    def extends(self, df):
+        """df가 지금까지 누적한 구간을 그대로 포함하는지 (뒤에 행만 추가된 경우)"""
+        n = len(self.index)
+        return (list(df.columns) == self.columns and len(df) >= n
+                and df.index[:n].equals(self.index)
+                and np.array_equal(df.to_numpy(dtype=float)[:n], self._values, equal_nan=True))
+
+    def update(self, df):
+        """df에서 아직 누적하지 않은 뒤쪽 행만 누적합에 반영"""
+        new = df.iloc[len(self.index):]
+        if new.empty:
+            return self
+        x = (new.to_numpy(dtype=float) - self._shift) / self._scale
+        valid = ~np.isnan(x)
+        x = np.where(valid, x, 0.0)
+        m = valid.astype(float)
+        terms = np.stack([
+            m[:, :, None] * m[:, None, :],
+            x[:, :, None] * m[:, None, :],
+            (x * x)[:, :, None] * m[:, None, :],
+            x[:, :, None] * x[:, None, :],
+        ])
+        self._cum = np.concatenate([self._cum, self._cum[:, -1:] + np.cumsum(terms, axis=1)], axis=1)
+        self.index = self.index.append(new.index)
+        self._values = np.vstack([self._values, new.to_numpy(dtype=float)])
+        return self
+
+    @staticmethod
+    def _corr(sums, min_periods):
+        n, sx, sxx, sxy = sums
+        sy, syy = np.swapaxes(sx, -1, -2), np.swapaxes(sxx, -1, -2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = sxy - sx * sy / n
+            r = cov / np.sqrt((sxx - sx * sx / n) * (syy - sy * sy / n))
+        r[n < min_periods] = np.nan
+        return np.clip(r, -1.0, 1.0)
+
+    def _bounds(self, end, window):
+        hi = len(self.index) if end is None else int(end) + 1
+        lo = 0 if window is None else max(hi - int(window), 0)
+        return lo, hi
+
+    def matrix(self, end=None, window=None, min_periods=10):
+        """end(행 위치, 포함)까지 window개 관측치의 상관행렬 (window=None이면 처음부터 = 확장)"""
+        lo, hi = self._bounds(end, window)
+        r = self._corr(self._cum[:, hi] - self._cum[:, lo], min(min_periods, hi - lo) if window else min_periods)
+        return pd.DataFrame(r, index=self.columns, columns=self.columns)
+
+    def pair_series(self, a, b, window=None, min_periods=10):
+        """두 지표의 롤링(또는 확장) 상관계수 시계열 — 전 시점을 한 번에 계산"""
+        i, j = self.columns.index(a), self.columns.index(b)
+        hi = np.arange(1, len(self.index) + 1)
+        lo = np.zeros_like(hi) if window is None else np.maximum(hi - int(window), 0)
+        pair = self._cum[:, :, [i, j]][:, :, :, [i, j]]
+        r = self._corr(pair[:, hi] - pair[:, lo], min_periods)[:, 0, 1]
+        return pd.Series(r, index=self.index, name=f"{a} · {b}")
+
+
+ROLLING_CORR_MAX_ENGINES = 8
+
+
+@st.cache_resource
+def _get_rolling_corr_registry():
+    """(컬럼, 시작일)별 RollingCorrelation 엔진 보관소 — 리런·세션 간 공유"""
+    return {"engines": OrderedDict(), "lock": threading.Lock()}
+
+
+def rolling_correlation(df):
+    """df에 맞는 RollingCorrelation 반환. 이전 엔진이 df의 앞부분이면 새 행만 누적"""
+    registry = _get_rolling_corr_registry()
+    key = (tuple(df.columns), df.index[0] if len(df) else None)
+    with registry["lock"]:
+        engines = registry["engines"]
+        engine = engines.get(key)
+        if engine is not None and engine.extends(df):
+            engine.update(df)
+            engines.move_to_end(key)
+        else:
+            engine = RollingCorrelation(df)
+            engines[key] = engine
+            while len(engines) > ROLLING_CORR_MAX_ENGINES:
+                engines.popitem(last=False)
+        return engine
+
+
+def fit_ols(df, y, xs, lags=(0,)):
+    """다변량 OLS (np.linalg.lstsq) — y(t) ~ 상수 + Σ x(t − lag)
+
+    반환: {"coef": DataFrame(계수/표준오차/t값), "r2", "adj_r2", "n", "fitted", "resid"}.
+    관측치가 모수 개수 + 2 이하이면 None.
+    """
+    design = {}
+    for x in xs:
+        for lag in lags:
+            design[x if lag == 0 else f"{x}(t-{lag})"] = df[x].shift(lag)
+    frame = pd.concat([pd.DataFrame(design), df[y].rename("__y")], axis=1).dropna()
+    names = list(design)
+    n = len(frame)
+    if n <= len(names) + 2:
+        return None
+
+    X = np.column_stack([np.ones(n), frame[names].to_numpy(dtype=float)])
+    Y = frame["__y"].to_numpy(dtype=float)
+    beta, _, rank, _ = np.linalg.lstsq(X, Y, rcond=None)
+    fitted = X @ beta
+    resid = Y - fitted
+    dof = max(n - rank, 1)
+    rss = float(resid @ resid)
+    se = np.sqrt(np.clip(np.diag(np.linalg.pinv(X.T @ X)) * rss / dof, 0, None))
+    ss_tot = float(((Y - Y.mean()) ** 2).sum())
+    r2 = 1 - rss / ss_tot if ss_tot > 0 else np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        coef = pd.DataFrame({"계수": beta, "표준오차": se, "t값": beta / se}, index=["상수"] + names)
+    return {
+        "coef": coef,
+        "r2": r2,
+        "adj_r2": 1 - (1 - r2) * (n - 1) / dof if pd.notna(r2) else np.nan,
+        "n": n,
+        "fitted": pd.Series(fitted, index=frame.index, name="적합값"),
+        "resid": pd.Series(resid, index=frame.index, name="잔차"),
+    }
+
+
+def batch_ols_scan(df, lag=1, min_obs=12):
+    """모든 (X, Y) 쌍의 단순회귀 Y(t) ~ X(t − lag)를 한 번에 적합 → R² 순 정렬표
+
+    쌍별 공통 관측치의 Σx, Σy, Σx², Σy², Σxy를 행렬곱 다섯 번으로 구해
+    K² 개 회귀를 루프 없이 계산한다.
+    """
+    cols = list(df.columns)
+    y = df.to_numpy(dtype=float)
+    x = df.shift(lag).to_numpy(dtype=float) if lag else y
+    mx, my = ~np.isnan(x), ~np.isnan(y)
+    # 열별 표준화로 제곱합 자릿수 손실 방지 (기울기는 마지막에 원래 단위로 환산)
+    mu, sd = np.nanmean(y, axis=0), np.nanstd(y, axis=0)
+    sd = np.where(sd > 0, sd, 1.0)
+    xz = np.where(mx, (x - mu) / sd, 0.0)
+    yz = np.where(my, (y - mu) / sd, 0.0)
+    mxf, myf = mx.astype(float), my.astype(float)
+
+    n = mxf.T @ myf                      # [i, j]: X=i, Y=j 공통 관측 수
+    sx, sy = xz.T @ myf, mxf.T @ yz
+    sxx, syy = (xz * xz).T @ myf, mxf.T @ (yz * yz)
+    sxy = xz.T @ yz
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vx = sxx - sx * sx / n
+        vy = syy - sy * sy / n
+        cov = sxy - sx * sy / n
+        slope_z = cov / vx
+        r2 = np.clip(cov * cov / (vx * vy), 0.0, 1.0)
+        se_z = np.sqrt((1 - r2) * vy / vx / (n - 2))
+        t = slope_z / se_z  # lag=0이면 대각(자기 자신)의 표준오차가 0
+    scale = sd[None, :] / sd[:, None]  # z 기울기 → 원 단위 (Y 표준편차 / X 표준편차)
+
+    i, j = np.where((n >= min_obs) & np.isfinite(r2) & ~np.eye(len(cols), dtype=bool))
+    table = pd.DataFrame({
+        "X": [cols[k] for k in i],
+        "Y": [cols[k] for k in j],
+        "시차": lag,
+        "기울기": (slope_z * scale)[i, j],
+        "표준오차": (se_z * scale)[i, j],
+        "t값": t[i, j],
+        "R²": r2[i, j],
+        "관측수": n[i, j].astype(int),
+    })
+    return table.sort_values("R²", ascending=False, ignore_index=True)
+
+
+def rolling_beta(y, x, window=60, min_periods=None):
+    """누적합 기반 롤링 회귀 y = α + β·x — 창을 한 칸 옮길 때마다 O(1)
+
+    y는 Series 또는 여러 종목의 DataFrame(열별 회귀), x는 공통 설명변수 Series.
+    결측은 (y열, x) 쌍별로 제외. 반환: {"beta", "alpha", "r2"} — 각각 y와 같은 모양.
+    """
+    is_series = isinstance(y, pd.Series)
+    frame = y.to_frame() if is_series else y
+    xs = x.reindex(frame.index).to_numpy(dtype=float)
+    Y = frame.to_numpy(dtype=float)
+    min_periods = min_periods or max(window // 2, 3)
+
+    valid = ~np.isnan(Y) & ~np.isnan(xs)[:, None]
+    # 누적합 자릿수 손실을 막기 위해 평균을 빼고 누적 (절편은 마지막에 원래 좌표로 환산)
+    mx, my = np.nanmean(xs), np.nanmean(Y, axis=0)
+    xc = np.where(valid, (xs - mx)[:, None], 0.0)
+    yc = np.where(valid, Y - my, 0.0)
+
+    def window_sum(a):
+        c = np.cumsum(a, axis=0)
+        c[window:] -= c[:-window].copy()
+        return c
+
+    n = window_sum(valid.astype(float))
+    sx, sy = window_sum(xc), window_sum(yc)
+    vx, vy, cov = window_sum(xc * xc), window_sum(yc * yc), window_sum(xc * yc)
+    del xc, yc, valid
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # 제곱합 → 편차제곱합 (제자리 연산으로 T×N 임시 배열 수를 줄임)
+        vx -= sx * sx / n
+        vy -= sy * sy / n
+        cov -= sx * sy / n
+        beta = cov / vx
+        alpha = (sy - beta * sx) / n + my - beta * mx
+        cov *= cov
+        r2 = np.clip(cov / (vx * vy), 0.0, 1.0)
+    enough = n >= min_periods
+    out = {}
+    for name, arr in (("beta", beta), ("alpha", alpha), ("r2", r2)):
+        df = pd.DataFrame(np.where(enough, arr, np.nan), index=frame.index, columns=frame.columns)
+        out[name] = df.iloc[:, 0].rename(y.name) if is_series else df
+    return out
+
+
+def benchmark_ticker(ticker):
+    """베타 기준 지수 — 한국 상장 종목은 KOSPI, 그 외는 S&P500"""
+    return "^KS11" if ticker.upper().endswith((".KS", ".KQ")) else "^GSPC"
+
+
+def cross_correlation_matrix(df, max_lag=12):
+    """모든 지표쌍의 교차상관을 FFT로 한 번에 계산 → (ccf[i, j, l], lags, 공통 관측 수)
+
+    ccf[i, j, l] = corr(x_i(t), x_j(t + lags[l])) — 양의 시차에서 높으면 i가 j를 선행.
+    열별로 표준화한 뒤 결측을 0으로 채우고, 시차별 공통 관측 수(마스크의 교차상관)로 나눈다.
+    """
+    values = df.to_numpy(dtype=float)
+    T, K = values.shape
+    mask = ~np.isnan(values)
+    with np.errstate(invalid="ignore"):
+        z = (values - np.nanmean(values, axis=0)) / np.nanstd(values, axis=0)
+    z = np.where(mask & np.isfinite(z), z, 0.0)
+
+    nfft = 1 << int(np.ceil(np.log2(max(2 * T, 2))))
+    fz = np.fft.rfft(z, nfft, axis=0)
+    fm = np.fft.rfft(mask.astype(float), nfft, axis=0)
+    # irfft(conj(F_i)·F_j)[l] = Σ_t z_i(t)·z_j(t+l) — 음의 시차는 배열 끝에서 감아 돈다
+    num = np.fft.irfft(np.conj(fz)[:, :, None] * fz[:, None, :], nfft, axis=0)
+    cnt = np.fft.irfft(np.conj(fm)[:, :, None] * fm[:, None, :], nfft, axis=0)
+    lags = np.arange(-max_lag, max_lag + 1)
+    num, cnt = num[lags % nfft], np.rint(cnt[lags % nfft])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ccf = np.clip(num / cnt, -1.0, 1.0)
+    return np.moveaxis(ccf, 0, -1), lags, np.moveaxis(cnt, 0, -1).astype(int)
+
+
+def lead_lag_table(df, max_lag=12, min_obs=12):
+    """지표쌍별 |교차상관|이 가장 큰 시차 → 선행/후행 정리표 (|상관계수| 순)"""
+    cols = list(df.columns)
+    ccf, lags, cnt = cross_correlation_matrix(df, max_lag)
+    ccf = np.where(cnt >= min_obs, ccf, np.nan)
+    i, j = np.triu_indices(len(cols), k=1)
+    pair = ccf[i, j]
+    ok = ~np.all(np.isnan(pair), axis=1)
+    i, j, pair = i[ok], j[ok], pair[ok]
+    best = np.nanargmax(np.abs(pair), axis=1)
+    best_lag = lags[best]
+    lead_is_i = best_lag >= 0
+    zero = int(np.where(lags == 0)[0][0])
+    table = pd.DataFrame({
+        "선행": [cols[a] if f else cols[b] for a, b, f in zip(i, j, lead_is_i)],
+        "후행": [cols[b] if f else cols[a] for a, b, f in zip(i, j, lead_is_i)],
+        "시차": np.abs(best_lag),
+        "상관계수": pair[np.arange(len(best)), best],
+        "동시 상관": pair[:, zero],
+        "관측수": cnt[i, j, best],
+    })
+    table["|상관계수|"] = table["상관계수"].abs()
+    return table.sort_values("|상관계수|", ascending=False, ignore_index=True).drop(columns="|상관계수|")
+
+
+@arrow_cache(ttl=3600)
+def load_lead_lag(start_date, end_date, freq="월간", max_lag=12, use_changes=True):
+    """정렬된 거시 프레임의 선후행 스캔 결과 캐시 → {"table": 요약표, "ccf": 지표쌍·시차별 교차상관(long)}"""
+    df = load_macro_frame(start_date, end_date, freq)
+    if df.empty:
+        return {"table": pd.DataFrame(), "ccf": pd.DataFrame()}
+    df = df.diff() if use_changes else df
+    ccf, lags, cnt = cross_correlation_matrix(df, max_lag)
+    cols = list(df.columns)
+    K, L = len(cols), len(lags)
+    long = pd.DataFrame({
+        "X": np.repeat(cols, K * L),
+        "Y": np.tile(np.repeat(cols, L), K),
+        "시차": np.tile(lags, K * K),
+        "상관계수": ccf.reshape(-1),
+        "관측수": cnt.reshape(-1),
+    })
+    return {"table": lead_lag_table(df, max_lag), "ccf": long}
+
+
+EVENT_STUDY_BENCHMARK = "^GSPC"
+# FRED 관측일(월간·분기는 기간 첫날) → 시장이 값을 알 수 있는 날까지의 보수적 발표 지연 (일)
+# 월간: 다음 달 중순(CPI ≈ +43일), 분기: 분기 종료 약 한 달 뒤 속보치(GDP ≈ +115일)
+FRED_RELEASE_LAG_DAYS = {"일간": 1, "주간": 6, "월간": 45, "분기": 120}
+
+
+def series_frequency(series):
+    """관측 간격 중앙값으로 발표 주기 추정 (일간 · 주간 · 월간 · 분기)"""
+    index = series.dropna().index
+    if len(index) < 2:
+        return "일간"
+    gap = float(np.median(np.diff(index.values)) / np.timedelta64(1, "D"))
+    return "일간" if gap <= 4 else "주간" if gap <= 10 else "월간" if gap <= 40 else "분기"
+
+
+def release_dated(series):
+    """관측일 기준 FRED 시계열을 발표 시점 근사(관측일 + 주기별 지연) 기준으로 이동"""
+    s = series.dropna()
+    lag = pd.Timedelta(days=FRED_RELEASE_LAG_DAYS[series_frequency(s)])
+    return s.set_axis(s.index + lag)
+
+
+def detect_indicator_events(series, z=1.5, min_gap_days=20):
+    """지표의 큰 변동 → DataFrame(index: 날짜, change, direction ∈ {"up", "down"})
+
+    변화량이 표준편차의 z배 이상인 관측치를 이벤트로 보고, 앞 이벤트로부터
+    min_gap_days 이내의 후속 변동은 같은 국면으로 묶어 제외한다.
+    """
+    d = series.dropna().diff().dropna()
+    sd = d.std()
+    empty = pd.DataFrame({"change": pd.Series(dtype=float), "direction": pd.Series(dtype=str)})
+    if not sd > 0:
+        return empty
+    big = d[d.abs() >= z * sd]
+    keep, last = [], None
+    for date in big.index:
+        if last is None or (date - last).days >= min_gap_days:
+            keep.append(date)
+            last = date
+    if not keep:
+        return empty
+    change = big.loc[keep]
+    return pd.DataFrame({"change": change.values, "direction": np.where(change.values > 0, "up", "down")},
+                        index=pd.DatetimeIndex(keep, name="date"))
+
+
+def event_study(prices, event_dates, benchmark, horizon=5):
+    """이벤트 × 종목 누적 초과수익률(CAR, 시장조정 모형) → DataFrame(이벤트 날짜 × 티커)
+
+    초과수익 = 종목 로그수익률 − 기준지수 로그수익률. 이벤트일(당일 포함, 휴장이면 다음 거래일)부터
+    horizon 거래일 뒤까지의 합을 누적합 차이로 한 번에 구하고, 구간에 결측이 있으면 NaN.
+    """
+    dates = prices.index.values
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = np.diff(np.log(prices.to_numpy(dtype=float)), axis=0, prepend=np.nan)
+        b = np.log(benchmark.reindex(prices.index)).diff().to_numpy(dtype=float)
+    abnormal = r - b[:, None]
+    valid = np.isfinite(abnormal)
+    zero = np.zeros((1, abnormal.shape[1]))
+    cum = np.vstack([zero, np.cumsum(np.where(valid, abnormal, 0.0), axis=0)])
+    cum_n = np.vstack([zero, np.cumsum(valid, axis=0)])
+
+    pos = np.searchsorted(dates, pd.DatetimeIndex(event_dates).values, side="left")
+    ok = (pos >= 1) & (pos + horizon < len(dates))
+    lo, hi = pos[ok], pos[ok] + horizon + 1
+    car = cum[hi] - cum[lo]
+    car[(cum_n[hi] - cum_n[lo]) < horizon + 1] = np.nan
+    return pd.DataFrame(car, index=pd.DatetimeIndex(event_dates)[ok], columns=prices.columns)
+
+
+def summarize_event_study(car, events):
+    """방향(up/down)별 · 종목별 평균 CAR, t값, 양(+) 비율, 이벤트 수"""
+    rows = []
+    direction = events["direction"].reindex(car.index)
+    for dir_key in ("up", "down"):
+        sub = car[direction == dir_key].to_numpy()
+        if not len(sub):
+            continue
+        n = np.sum(np.isfinite(sub), axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nanmean(sub, axis=0)
+            t = mean / (np.nanstd(sub, axis=0, ddof=1) / np.sqrt(n))
+            hit = np.nansum(sub > 0, axis=0) / n
+        rows.append(pd.DataFrame({
+            "방향": dir_key, "티커": car.columns, "평균 CAR(%)": mean * 100,
+            "t값": t, "양(+) 비율(%)": hit * 100, "이벤트 수": n,
+        }))
+    return pd.concat(rows, ignore_index=True) if rows else pd.DataFrame()
+
+
+def impact_tickers(indicator_id):
+    """INDICATOR_IMPACT 카드에 나온 종목(FRED 시리즈 코드 제외)"""
+    impact = INDICATOR_IMPACT.get(indicator_id, {})
+    return sorted({
+        t for key in ("up_impact", "down_impact") for imp in impact.get(key, [])
+        for t in imp["tickers"] if t not in INDICATOR_IMPACT
+    })
+
+
+@arrow_cache(ttl=3600)
+def load_event_study(indicator_id, horizon=5, years=10):
+    """지표의 과거 급변 이벤트에 대한 관련 종목 반응 (summarize_event_study 표)"""
+    tickers = impact_tickers(indicator_id)
+    if not tickers:
+        return pd.DataFrame()
+    today = datetime.now()
+    loaded = load_parallel({
+        "series": lambda: fetch_fred(indicator_id, (today - timedelta(days=365 * years)).strftime("%Y-%m-%d"),
+                                     today.strftime("%Y-%m-%d")),
+        "prices": lambda: fetch_price_panel(tuple(tickers + [EVENT_STUDY_BENCHMARK]), f"{years}y"),
+    })
+    series, prices = loaded["series"], loaded["prices"]
+    if series.empty or prices.empty or EVENT_STUDY_BENCHMARK not in prices.columns:
+        return pd.DataFrame()
+    # 관측일이 아니라 발표 시점부터 반응을 재야 함 (월간 지표는 관측월 1일자로 기록됨)
+    values = release_dated(series.set_index("date")["value"])
+    events = detect_indicator_events(values, min_gap_days=max(20, horizon * 2))
+    if events.empty:
+        return pd.DataFrame()
+    stocks = prices.drop(columns=EVENT_STUDY_BENCHMARK)
+    car = event_study(stocks, events.index, prices[EVENT_STUDY_BENCHMARK], horizon)
+    return summarize_event_study(car, events)
+
+
+def estimate_sensitivities(prices, series, freq="ME"):
+    """종목 기간 로그수익률 ~ 지표 기간 변화량 단순회귀 (종목 전체를 한 번에)
+
+    반환: (DataFrame[beta, se, r2, n] (index: 티커), 잔차 DataFrame (기간 × 티커)).
+    """
+    rets = np.log(prices.resample(freq).last()).diff()
+    dx = series.resample(freq).last().diff().reindex(rets.index)
+    Y = rets.to_numpy(dtype=float)
+    x = dx.to_numpy(dtype=float)
+    valid = np.isfinite(Y) & np.isfinite(x)[:, None]
+    n = valid.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = np.where(valid, x[:, None], 0.0).sum(axis=0) / n
+        y_mean = np.where(valid, Y, 0.0).sum(axis=0) / n
+        xc = np.where(valid, x[:, None] - x_mean, 0.0)
+        yc = np.where(valid, Y - y_mean, 0.0)
+        sxx = (xc * xc).sum(axis=0)
+        beta = (xc * yc).sum(axis=0) / sxx
+        resid = np.where(valid, yc - beta * xc, np.nan)
+        rss = np.nansum(resid * resid, axis=0)
+        se = np.sqrt(rss / (n - 2) / sxx)
+        r2 = 1 - rss / (yc * yc).sum(axis=0)
+    enough = n >= 12
+    sens = pd.DataFrame({"beta": beta, "se": se, "r2": r2, "n": n}, index=prices.columns)[enough]
+    return sens, pd.DataFrame(resid, index=rets.index, columns=prices.columns).loc[:, enough]
+
+
+def _nearest_psd(cov):
+    """쌍별 추정 공분산의 음의 고유값을 0으로 잘라 양반정치로 보정"""
+    vals, vecs = np.linalg.eigh((cov + cov.T) / 2)
+    return (vecs * np.clip(vals, 0, None)) @ vecs.T
+
+
+def simulate_scenario(sens, resid_cov, shock, groups=None, n_paths=5000, seed=0):
+    """지표 충격의 종목/그룹 수익률 영향 몬테카를로 → 요약표 (중앙값 · 5% · 95%, 단순수익률 %)
+
+    경로마다 베타를 추정오차(se)만큼, 잔차를 종목 간 공분산(Cholesky)으로 함께 뽑아
+    (n_paths × 종목) 배열 한 번으로 계산한다. groups: {그룹명: [티커, ...]} → 동일가중 평균.
+    """
+    tickers = list(sens.index)
+    rng = np.random.default_rng(seed)
+    k = len(tickers)
+    cov = np.nan_to_num(resid_cov.loc[tickers, tickers].to_numpy(dtype=float))
+    chol = np.linalg.cholesky(_nearest_psd(cov) + np.eye(k) * 1e-12)
+    beta = sens["beta"].to_numpy() + sens["se"].to_numpy() * rng.standard_normal((n_paths, k))
+    log_ret = beta * shock + rng.standard_normal((n_paths, k)) @ chol.T
+    paths = {t: log_ret[:, i] for i, t in enumerate(tickers)}
+
+    columns = {t: np.expm1(v) for t, v in paths.items()}
+    for name, members in (groups or {}).items():
+        idx = [tickers.index(t) for t in members if t in tickers]
+        if idx:
+            columns[name] = np.expm1(log_ret[:, idx]).mean(axis=1)
+    names = list(columns)
+    sims = np.column_stack([columns[c] for c in names]) * 100
+    q5, q50, q95 = np.percentile(sims, [5, 50, 95], axis=0)
+    return pd.DataFrame({
+        "구분": ["종목" if c in paths else "그룹" for c in names],
+        "중앙값(%)": q50, "하단 5%": q5, "상단 95%": q95, "하락 확률(%)": (sims < 0).mean(axis=0) * 100,
+    }, index=pd.Index(names, name="대상"))
+
+
+def impact_groups(indicator_id):
+    """INDICATOR_IMPACT 카드의 섹터 → 종목 목록 (상승/하락 카드 합집합, FRED 코드 제외)"""
+    groups = {}
+    impact = INDICATOR_IMPACT.get(indicator_id, {})
+    for key in ("up_impact", "down_impact"):
+        for imp in impact.get(key, []):
+            members = groups.setdefault(imp["sector"], [])
+            members.extend(t for t in imp["tickers"] if t not in INDICATOR_IMPACT and t not in members)
+    return {name: members for name, members in groups.items() if members}
+
+
+@arrow_cache(ttl=3600)
+def load_scenario_inputs(indicator_id, years=10):
+    """시나리오 입력 → {"sens": 종목별 민감도, "cov": 잔차 공분산, "indicator": 월간 변화량 표준편차}"""
+    tickers = impact_tickers(indicator_id)
+    empty = {"sens": pd.DataFrame(), "cov": pd.DataFrame(), "indicator": pd.DataFrame()}
+    if not tickers:
+        return empty
+    today = datetime.now()
+    loaded = load_parallel({
+        "series": lambda: fetch_fred(indicator_id, (today - timedelta(days=365 * years)).strftime("%Y-%m-%d"),
+                                     today.strftime("%Y-%m-%d")),
+        "prices": lambda: fetch_price_panel(tuple(tickers + [EVENT_STUDY_BENCHMARK]), f"{years}y"),
+    })
+    series, prices = loaded["series"], loaded["prices"]
+    prices = prices.drop(columns=EVENT_STUDY_BENCHMARK, errors="ignore")
+    if series.empty or prices.empty:
+        return empty
+    level = series.set_index("date")["value"]
+    sens, resid = estimate_sensitivities(prices, level)
+    if sens.empty:
+        return empty
+    return {
+        "sens": sens,
+        "cov": resid.cov(min_periods=12),
+        "indicator": pd.DataFrame({"monthly_sd": [level.resample("ME").last().diff().std()]}),
+    }
+
+
 # ══════════════════════════════════════════════
 #  CHART FUNCTIONS
 # ══════════════════════════════════════════════
 
-def _chart_layout(title="", height=400):
-    """토스 스타일 공통 Plotly 레이아웃"""
-    return dict(
+# 한 차트의 라인 포인트 합계가 이 값을 넘으면 SVG(go.Scatter) 대신 WebGL(go.Scattergl)로 렌더링.
+# 단일 종목 일간 차트(수천 포인트)는 SVG로도 충분하므로 SVG로 두어 페이지당 WebGL 컨텍스트 수를 아끼고,
+# 여러 종목 · 장기 구간을 겹쳐 그리는 차트만 WebGL로 넘긴다.
+WEBGL_POINT_THRESHOLD = 15000
+
+
+def line_trace_type(*series):
+    """같은 차트에 그릴 시계열들의 포인트 합계에 맞는 트레이스 클래스 (한 차트 안에서는 한 종류로 통일)"""
+    n_points = sum(len(s) for s in series)
+    return go.Scattergl if n_points > WEBGL_POINT_THRESHOLD else go.Scatter
+
+
+def _chart_layout(title="", height=400, secondary_y=False):
+    """토스 스타일 공통 Plotly 레이아웃 (secondary_y: 보조 y축도 같은 스타일로, 격자는 주축만)"""
+    layout = dict(
         title=dict(text=title, font=dict(size=14, color="#191f28", family="Pretendard, sans-serif"), x=0.01, y=0.97),
         height=height,
         plot_bgcolor="#ffffff",
@@ -1941,10 +3132,13 @@ def _chart_layout(title="", height=400):
                         font=dict(family="Pretendard, sans-serif", size=12, color="#191f28")),
         margin=dict(l=50, r=20, t=44, b=40),
     )
+    if secondary_y:
+        layout["yaxis2"] = dict(layout["yaxis"], showgrid=False)
+    return layout
 
 
-def make_candlestick(hist, title=""):
-    """캔들스틱 차트"""
+def make_candlestick(hist, title="", sentiment=None):
+    """캔들스틱 차트 (sentiment: hist 인덱스에 맞춘 감성 지수 Series → 보조축 막대)"""
     if hist.empty:
         return go.Figure()
 
@@ -1967,6 +3161,14 @@ def make_candlestick(hist, title=""):
 
     layout = _chart_layout(title, 480)
     layout["xaxis_rangeslider_visible"] = False
+    if sentiment is not None and sentiment.notna().any():
+        fig.add_trace(go.Bar(
+            x=sentiment.index, y=sentiment.values, name="뉴스 감성", yaxis="y2", opacity=0.35,
+            marker_color=np.where(sentiment.fillna(0).values >= 0, "#00b386", "#f04452"),
+        ))
+        bound = max(float(np.nanmax(np.abs(sentiment.values))), 1.0)
+        layout["yaxis2"] = dict(overlaying="y", side="right", range=[-bound * 3, bound * 3],
+                                showgrid=False, zeroline=False, showticklabels=False)
     fig.update_layout(**layout)
     return fig
 
@@ -1996,7 +3198,7 @@ def make_line(series, title, color="#3182f6", height=350):
     """라인 차트"""
     fig = go.Figure()
     if not series.empty:
-        fig.add_trace(go.Scatter(
+        fig.add_trace(line_trace_type(series)(
             x=series.index, y=series.values,
             line=dict(color=color, width=2),
             fill="tozeroy",
@@ -2009,13 +3211,44 @@ def make_line(series, title, color="#3182f6", height=350):
 def make_dual_axis(s1, s2, name1, name2, title, c1="#ef5350", c2="#42a5f5"):
     """듀얼축 차트"""
     fig = make_subplots(specs=[[{"secondary_y": True}]])
+    trace = line_trace_type(s1, s2)
     if not s1.empty:
-        fig.add_trace(go.Scatter(x=s1.index, y=s1.values, name=name1,
-                                  line=dict(color=c1, width=2)), secondary_y=False)
+        fig.add_trace(trace(x=s1.index, y=s1.values, name=name1,
+                            line=dict(color=c1, width=2)), secondary_y=False)
     if not s2.empty:
-        fig.add_trace(go.Scatter(x=s2.index, y=s2.values, name=name2,
-                                  line=dict(color=c2, width=2)), secondary_y=True)
-    fig.update_layout(**_chart_layout(title, 400))
+        fig.add_trace(trace(x=s2.index, y=s2.values, name=name2,
+                            line=dict(color=c2, width=2)), secondary_y=True)
+    fig.update_layout(**_chart_layout(title, 400, secondary_y=True))
+    return fig
+
+
+COMPARE_COLORS = ["#3182f6", "#f04452", "#00b386", "#ff9f43", "#6c5ce7", "#00b8d9", "#e84393",
+                  "#8d6e63", "#4e5968", "#fdcb6e", "#0984e3", "#d63031", "#00cec9", "#a29bfe"]
+
+
+def make_comparison_chart(rebased, relative, benchmark):
+    """여러 종목 비교 — 상단 리베이스 성과, 하단 벤치마크 대비 상대강도 (종목별 범례 그룹)"""
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.06, row_heights=[0.62, 0.38])
+    trace = line_trace_type(*(rebased[c] for c in rebased.columns), *(relative[c] for c in relative.columns))
+    # 일간 데이터라 날짜 문자열로 한 번만 변환 (트레이스마다 타임스탬프 직렬화 방지)
+    dates = rebased.index.strftime("%Y-%m-%d")
+    for i, ticker in enumerate(rebased.columns):
+        color = COMPARE_COLORS[i % len(COMPARE_COLORS)]
+        line = dict(color=color, width=2.2 if ticker == benchmark else 1.6)
+        fig.add_trace(trace(x=dates, y=rebased[ticker].to_numpy(), name=ticker,
+                            legendgroup=ticker, line=line), row=1, col=1)
+        if ticker != benchmark and ticker in relative.columns:
+            fig.add_trace(trace(x=dates, y=relative[ticker].to_numpy(), name=ticker,
+                                legendgroup=ticker, showlegend=False, line=line), row=2, col=1)
+    fig.add_hline(y=100, line_dash="dot", line_color="#b0b8c1", row=2, col=1)
+    layout = _chart_layout("누적 성과 (시작 = 100)", 640)
+    if rebased.shape[1] > 6:
+        layout["hovermode"] = "closest"
+    fig.update_layout(**layout)
+    axis_style = {k: layout["yaxis"][k] for k in ("gridcolor", "zeroline", "linecolor", "tickfont")}
+    fig.update_xaxes(**axis_style)
+    fig.update_yaxes(**axis_style)
+    fig.update_yaxes(title_text=f"{benchmark} 대비 상대강도", title_font=dict(size=11, color="#8b95a1"), row=2, col=1)
     return fig
 
 
@@ -2184,8 +3417,8 @@ def render_ratio_analysis(ratio_name, value, hist_values=None):
             st.caption(f"전기 대비: {change:+.2f} ({direction})")
 
 
-def render_impact_analysis(indicator_id, direction="up"):
-    """경제지표 변동에 따른 섹터/종목 영향 분석 렌더링"""
+def render_impact_analysis(indicator_id, direction="up", measured=None, horizon=None):
+    """경제지표 변동에 따른 섹터/종목 영향 분석 렌더링 (measured: load_event_study 결과 → 카드별 실측 반응)"""
     impact_data = INDICATOR_IMPACT.get(indicator_id)
     if not impact_data:
         st.info("이 지표에 대한 영향 분석 데이터가 없습니다.")
@@ -2210,6 +3443,21 @@ def render_impact_analysis(indicator_id, direction="up"):
 
         tickers_str = ", ".join(imp["tickers"][:6])
 
+        measured_html = ""
+        if measured is not None and not measured.empty:
+            sub = measured[(measured["방향"] == direction) & measured["티커"].isin(imp["tickers"])]
+            sub = sub[sub["이벤트 수"] > 0]
+            if not sub.empty:
+                avg = sub["평균 CAR(%)"].mean()
+                expected = {"positive": 1, "negative": -1}.get(imp["direction"])
+                verdict = "" if expected is None else (" · 예상과 일치" if np.sign(avg) == expected else " · 예상과 반대")
+                per_ticker = ", ".join(f"{r['티커']} {r['평균 CAR(%)']:+.1f}%" for _, r in sub.head(6).iterrows())
+                measured_html = (
+                    f'<p style="margin:6px 0;color:#3182f6;font-size:0.8rem;">📏 실측: 과거 {int(sub["이벤트 수"].max())}회 '
+                    f'{"상승" if direction == "up" else "하락"} 이벤트 후 {horizon}거래일 초과수익 평균 <b>{avg:+.2f}%</b>'
+                    f'{verdict} <span style="color:#8b95a1;">({per_ticker})</span></p>'
+                )
+
         dir_color = {"positive": "#00b386", "negative": "#f04452", "mixed": "#ff9f43"}.get(imp["direction"], "#8b95a1")
         st.html(f"""
         <div style="background:#ffffff;border-radius:14px;padding:18px 22px;margin:6px 0;box-shadow:0 1px 4px rgba(0,0,0,0.04);
@@ -2220,6 +3468,7 @@ def render_impact_analysis(indicator_id, direction="up"):
             </div>
             <p style="margin:6px 0;color:#8b95a1;font-size:0.84rem;">📌 {tickers_str}</p>
             <p style="margin:6px 0;color:#4e5968;font-size:0.86rem;line-height:1.7;">{imp['reason']}</p>
+            {measured_html}
         </div>
         """)
 
@@ -2250,7 +3499,7 @@ def main():
         # Navigation
         page = st.radio(
             "nav",
-            ["📊  대시보드", "🔍  종목 분석", "📋  재무 분석", "🧠  펀더멘탈 분석", "🌐  경제지표 영향", "📈  매크로 분석"],
+            ["📊  대시보드", "🔍  종목 분석", "📋  재무 분석", "🧠  펀더멘탈 분석", "🌐  경제지표 영향", "📈  매크로 분석", "💼  포트폴리오", "⚖️  종목 비교"],
             label_visibility="collapsed"
         )
 
@@ -2275,8 +3524,20 @@ def main():
 
         if st.button("🔄  새로고침", use_container_width=True):
             st.cache_data.clear()
+            _get_arrow_cache().clear()
             st.rerun()
 
+        with st.expander("⚙️ 캐시 상태"):
+            used, budget, n_entries = _get_arrow_cache().usage()
+            st.caption(f"{n_entries}개 항목 · {used / 1024**2:.1f} / {budget / 1024**2:.0f} MB")
+            cache_df = _get_arrow_cache().report()
+            if not cache_df.empty:
+                st.dataframe(cache_df.round(1), use_container_width=True, hide_index=True)
+            else:
+                st.caption("캐시된 데이터가 없습니다.")
+            n_articles, n_links = _get_news_store().usage()
+            st.caption(f"뉴스 저장소: 기사 {n_articles}건 · 종목 연결 {n_links}건")
+
         # Footer
         st.markdown("---")
         st.markdown(f"""
@@ -2300,6 +3561,10 @@ def main():
         render_impact_page()
     elif "매크로" in page:
         render_macro_analysis(start_str, end_str)
+    elif "포트폴리오" in page:
+        render_portfolio()
+    elif "종목 비교" in page:
+        render_compare()
 
 
 # ══════════════════════════════════════════════
@@ -2374,17 +3639,18 @@ def render_dashboard(start_str, end_str):
     with tabs[0]:
         # 한미 금리 비교
         fig = make_subplots(specs=[[{"secondary_y": True}]])
+        trace = line_trace_type(*(df[c].dropna() for c in ("한국금리", "미국금리") if c in df.columns))
         if "한국금리" in df.columns:
             s = df["한국금리"].dropna()
-            fig.add_trace(go.Scatter(x=s.index, y=s.values, name="한국", line=dict(color="#ef5350", width=3)), secondary_y=False)
+            fig.add_trace(trace(x=s.index, y=s.values, name="한국", line=dict(color="#ef5350", width=3)), secondary_y=False)
         if "미국금리" in df.columns:
             s = df["미국금리"].dropna()
-            fig.add_trace(go.Scatter(x=s.index, y=s.values, name="미국", line=dict(color="#42a5f5", width=3)), secondary_y=False)
+            fig.add_trace(trace(x=s.index, y=s.values, name="미국", line=dict(color="#42a5f5", width=3)), secondary_y=False)
         if "금리차" in df.columns:
             s = df["금리차"].dropna()
             colors = ["#26a69a" if v >= 0 else "#ef5350" for v in s.values]
             fig.add_trace(go.Bar(x=s.index, y=s.values, name="금리차", marker_color=colors, opacity=0.4), secondary_y=True)
-        fig.update_layout(**_chart_layout("한미 기준금리 비교", 450))
+        fig.update_layout(**_chart_layout("한미 기준금리 비교", 450, secondary_y=True))
         st.plotly_chart(fig, use_container_width=True)
 
         c1, c2 = st.columns(2)
@@ -2426,7 +3692,7 @@ def render_dashboard(start_str, end_str):
             btc = fetch_coingecko_chart("bitcoin", 90)
             if not btc.empty:
                 fig = go.Figure()
-                fig.add_trace(go.Scatter(x=btc["date"], y=btc["price"], line=dict(color="#f7931a", width=2), fill="tozeroy", fillcolor="rgba(247,147,26,0.1)"))
+                fig.add_trace(line_trace_type(btc)(x=btc["date"], y=btc["price"], line=dict(color="#f7931a", width=2), fill="tozeroy", fillcolor="rgba(247,147,26,0.1)"))
                 fig.update_layout(**_chart_layout("Bitcoin (90D)", 350))
                 st.plotly_chart(fig, use_container_width=True)
 
@@ -2526,8 +3792,11 @@ def render_stock_analysis():
 
     # ─── 종목 데이터 로드 ───
     with st.spinner(f"📡 {current_ticker} 데이터 로딩..."):
-        info = fetch_stock_info(current_ticker)
-        hist = fetch_stock_history(current_ticker, period=chart_period)
+        loaded = load_parallel({
+            "info": lambda: fetch_stock_info(current_ticker),
+            "hist": lambda: fetch_stock_history(current_ticker, period=chart_period),
+        })
+        info, hist = loaded["info"], loaded["hist"]
 
     if not info and hist.empty:
         st.error(f"'{current_ticker}' 데이터를 찾을 수 없습니다. 티커를 확인하세요.")
@@ -2575,11 +3844,19 @@ def render_stock_analysis():
 
     # ─── 차트 ───
     if not hist.empty:
-        st.plotly_chart(make_candlestick(hist, f"{name} 주가 차트"), use_container_width=True)
+        sentiment = None
+        if st.toggle("뉴스 감성 오버레이", key="sa_sentiment_overlay",
+                     help="조회할 때마다 새 뉴스만 분석해 일별 감성 지수(최근 5거래일 평균)를 누적합니다."):
+            ingest_news(current_ticker, fetch_news_data(current_ticker))
+            overlay = sentiment_index(hist, _get_news_store().daily_sentiment(current_ticker))
+            sentiment = overlay["감성 지수"]
+            if sentiment.isna().all():
+                st.caption("차트 기간에 해당하는 누적 뉴스가 없습니다.")
+        st.plotly_chart(make_candlestick(hist, f"{name} 주가 차트", sentiment), use_container_width=True)
         st.plotly_chart(make_volume_chart(hist), use_container_width=True)
 
     # ─── 추가 정보 탭 ───
-    info_tabs = st.tabs(["📊 기본 정보", "📈 기술 지표", "💰 밸류에이션"])
+    info_tabs = st.tabs(["📊 기본 정보", "📈 기술 지표", "💰 밸류에이션", "📉 롤링 베타", "🧪 백테스트"])
 
     with info_tabs[0]:
         c1, c2, c3 = st.columns(3)
@@ -2646,7 +3923,7 @@ def render_stock_analysis():
 
             # RSI 차트
             fig = go.Figure()
-            fig.add_trace(go.Scatter(x=rsi.index, y=rsi.values, line=dict(color="#bb86fc", width=2), name="RSI"))
+            fig.add_trace(line_trace_type(rsi)(x=rsi.index, y=rsi.values, line=dict(color="#bb86fc", width=2), name="RSI"))
             fig.add_hline(y=70, line_dash="dash", line_color="#ef5350", annotation_text="과매수")
             fig.add_hline(y=30, line_dash="dash", line_color="#26a69a", annotation_text="과매도")
             layout = _chart_layout("RSI (14)", 300)
@@ -2683,6 +3960,193 @@ def render_stock_analysis():
         for k, v in div_data.items():
             st.write(f"- {k}: {v}")
 
+    with info_tabs[3]:
+        bench = benchmark_ticker(current_ticker)
+        bench_name = "KOSPI" if bench == "^KS11" else "S&P500"
+        c1, c2 = st.columns([1, 2])
+        with c1:
+            load_beta = st.toggle(f"{bench_name} 대비 롤링 베타 계산", key="sa_rolling_beta")
+        with c2:
+            beta_window = st.select_slider("윈도우 (거래일)", [20, 60, 120, 250], value=60, key="sa_beta_window")
+        if load_beta and not hist.empty:
+            bench_hist = fetch_stock_history(bench, period=chart_period)
+            if bench_hist.empty:
+                st.info(f"{bench_name} 데이터를 불러올 수 없습니다.")
+            else:
+                # 거래 시간대가 다른 지수와도 날짜 단위로 맞춰 일간 수익률 회귀
+                close = hist["Close"].set_axis(hist.index.tz_localize(None).normalize())
+                bench_close = bench_hist["Close"].set_axis(bench_hist.index.tz_localize(None).normalize())
+                rets = pd.concat([close, bench_close], axis=1, keys=["stock", "bench"]).pct_change(fill_method=None)
+                fit = rolling_beta(rets["stock"], rets["bench"], window=beta_window)
+                beta_series = fit["beta"].dropna()
+                if beta_series.empty:
+                    st.info("베타를 계산하기에 데이터가 부족합니다.")
+                else:
+                    c1, c2, c3 = st.columns(3)
+                    with c1:
+                        st.metric(f"롤링 베타 ({beta_window}일)", f"{beta_series.iloc[-1]:.2f}")
+                    with c2:
+                        st.metric("R²", f"{fit['r2'].dropna().iloc[-1]:.2f}")
+                    with c3:
+                        static_beta = info.get("beta")
+                        st.metric("Yahoo 베타", f"{static_beta:.2f}" if static_beta else "--")
+                    fig = make_line(beta_series, f"{bench_name} 대비 롤링 베타 ({beta_window}일)", color="#6c5ce7", height=320)
+                    fig.add_hline(y=1.0, line_dash="dash", line_color="#b0b8c1")
+                    st.plotly_chart(fig, use_container_width=True)
+
+    with info_tabs[4]:
+        render_backtest(current_ticker, hist)
+
+
+BACKTEST_GRID_LABELS = {
+    "rsi_window": "RSI 기간", "rsi_lower": "RSI 하한", "rsi_upper": "RSI 상한",
+    "ma_fast": "단기 MA", "ma_slow": "장기 MA",
+    "macd_fast": "MACD 단기", "macd_slow": "MACD 장기", "macd_signal": "시그널",
+}
+BACKTEST_GRID_DEFAULTS = {
+    "rsi_window": "5-30", "rsi_lower": "15-40/2", "rsi_upper": "60-85/2",
+    "ma_fast": "5-50/5", "ma_slow": "20-200/10",
+    "macd_fast": "6-16/2", "macd_slow": "20-40/4", "macd_signal": "5-12",
+}
+
+
+def _parse_int_list(text):
+    """'7, 14, 21' · '5-30' · '15-40/5' → 정수 목록 (숫자가 아닌 항목은 무시)"""
+    import re
+    values = set()
+    for start, stop, step in re.findall(r"(\d+)(?:\s*-\s*(\d+)(?:\s*/\s*(\d+))?)?", text or ""):
+        if stop:
+            values.update(range(int(start), int(stop) + 1, max(int(step or 1), 1)))
+        else:
+            values.add(int(start))
+    return sorted(values)
+
+
+def render_backtest(current_ticker, hist):
+    """기술 지표 상태 조합 전략 백테스트 + 여러 종목 RSI 파라미터 스윕"""
+    if hist.empty or len(hist) < 60:
+        st.info("백테스트를 하기에 데이터가 부족합니다. 차트 기간을 늘려 보세요.")
+        return
+
+    c1, c2, c3, c4 = st.columns([2, 1, 2, 1])
+    with c1:
+        entry = st.multiselect("진입 조건", backtest.STATE_NAMES, default=["과매도"], key="bt_entry")
+    with c2:
+        entry_how = st.radio("진입 결합", ["AND", "OR"], horizontal=True, key="bt_entry_how")
+    with c3:
+        exit_ = st.multiselect("청산 조건", backtest.STATE_NAMES, default=["과매수"], key="bt_exit")
+    with c4:
+        exit_how = st.radio("청산 결합", ["OR", "AND"], horizontal=True, key="bt_exit_how")
+    c1, c2, c3, c4, c5 = st.columns(5)
+    with c1:
+        rsi_window = st.number_input("RSI 기간", 2, 100, 14, key="bt_rsi_window")
+    with c2:
+        rsi_lower = st.number_input("RSI 하한", 1, 99, 30, key="bt_rsi_lower")
+    with c3:
+        rsi_upper = st.number_input("RSI 상한", 1, 99, 70, key="bt_rsi_upper")
+    with c4:
+        ma_window = st.number_input("MA 기간", 2, 250, 20, key="bt_ma_window")
+    with c5:
+        cost_bps = st.number_input("거래비용 (bp, 편도)", 0.0, 100.0, 10.0, step=1.0, key="bt_cost")
+
+    if not entry:
+        st.info("진입 조건을 하나 이상 선택하세요.")
+        return
+    result = backtest.backtest_rules(
+        hist["Close"].dropna(), entry, exit_, entry_how.lower(), exit_how.lower(), cost_bps,
+        rsi_window=rsi_window, rsi_lower=rsi_lower, rsi_upper=rsi_upper, ma_window=ma_window,
+    )
+    m = result["metrics"]
+    c1, c2, c3, c4 = st.columns(4)
+    for col, metric, fmt in [(c1, "총수익률(%)", "{:+.1f}%"), (c2, "샤프", "{:.2f}"),
+                             (c3, "최대낙폭(%)", "{:.1f}%"), (c4, "매매 횟수", "{:.0f}")]:
+        with col:
+            strat, bh = m.loc["전략", metric], m.loc["매수 후 보유", metric]
+            delta = f"보유 대비 {strat - bh:+.2f}" if metric != "매매 횟수" and pd.notna(strat - bh) else None
+            st.metric(metric.replace("(%)", ""), fmt.format(strat) if pd.notna(strat) else "--", delta)
+
+    fig = go.Figure()
+    trace = line_trace_type(result["equity"], result["buy_hold"])
+    fig.add_trace(trace(x=result["equity"].index, y=result["equity"].values,
+                        name="전략", line=dict(color="#3182f6", width=2)))
+    fig.add_trace(trace(x=result["buy_hold"].index, y=result["buy_hold"].values,
+                        name="매수 후 보유", line=dict(color="#b0b8c1", width=1.5)))
+    fig.update_layout(**_chart_layout(f"{current_ticker} 자산 곡선 (시작 = 1)", 360))
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(m.style.format("{:.2f}"), use_container_width=True)
+    st.caption("종가 기준 신호를 다음 거래일 수익률에 적용하며, 포지션이 바뀔 때마다 거래비용을 차감합니다.")
+
+    st.markdown("**🧮 파라미터 그리드 최적화 (워크포워드 검증)**")
+    c1, c2, c3 = st.columns([2, 1, 1])
+    with c1:
+        family = st.radio("전략군", list(backtest.GRID_FAMILIES), horizontal=True, key="bt_grid_family")
+    with c2:
+        n_splits = st.number_input("검증 구간 수", 2, 10, 4, key="bt_grid_splits")
+    with c3:
+        anchored = st.toggle("누적 학습 구간", key="bt_grid_anchored")
+    param_cols = st.columns(len(backtest.GRID_FAMILIES[family]))
+    spec = []
+    for col, name in zip(param_cols, backtest.GRID_FAMILIES[family]):
+        with col:
+            text = st.text_input(BACKTEST_GRID_LABELS[name], BACKTEST_GRID_DEFAULTS[name], key=f"bt_grid_{name}")
+            spec.append((name, tuple(_parse_int_list(text))))
+    st.caption("값은 쉼표로 나열하거나 '5-30', '15-40/2'(간격)처럼 범위로 입력합니다.")
+    if st.button("그리드 최적화 실행", key="bt_grid_run"):
+        if not all(values for _, values in spec):
+            st.info("모든 파라미터에 값을 입력하세요.")
+        else:
+            with st.spinner(f"{np.prod([len(v) for _, v in spec]):,}개 조합 계산 중..."):
+                opt = load_grid_optimization(current_ticker, "5y", family, tuple(spec), n_splits, anchored, cost_bps)
+            if not opt:
+                st.info("최적화할 데이터가 부족합니다.")
+            else:
+                top = opt["top"]
+                float_fmt = lambda df: {c: "{:.2f}" for c in df.columns if df[c].dtype.kind == "f"}
+                st.markdown(f"전체 기간 상위 조합 (총 {len(top):,}개)")
+                st.dataframe(top.head(10).style.format(float_fmt(top)), use_container_width=True, hide_index=True)
+                st.markdown("구간별 선택 파라미터")
+                folds = opt["folds"]
+                st.dataframe(folds.style.format(float_fmt(folds)), use_container_width=True, hide_index=True)
+                st.dataframe(opt["summary"].style.format("{:.2f}"), use_container_width=True)
+                equity = opt["equity"]
+                fig = go.Figure()
+                trace = line_trace_type(*(equity[c] for c in equity.columns))
+                for name, color in [("워크포워드", "#3182f6"), ("매수 후 보유", "#b0b8c1")]:
+                    fig.add_trace(trace(x=equity.index, y=equity[name].values, name=name,
+                                        line=dict(color=color, width=2 if name == "워크포워드" else 1.5)))
+                fig.update_layout(**_chart_layout("검증 구간 자산 곡선 (시작 = 1)", 320))
+                st.plotly_chart(fig, use_container_width=True)
+                st.caption("각 구간에서 직전 학습 구간의 샤프 최고 조합만 사용합니다. "
+                           "'전체 기간 최적(사후)'과의 차이가 클수록 과최적화 가능성이 큽니다.")
+
+    st.markdown("**📋 RSI 파라미터 스윕 (여러 종목)**")
+    c1, c2, c3, c4 = st.columns([3, 1, 1, 1])
+    with c1:
+        sweep_input = st.text_input("종목 (쉼표 구분)", value=current_ticker, key="bt_sweep_tickers")
+    with c2:
+        windows = st.text_input("RSI 기간들", "7, 14, 21", key="bt_sweep_windows")
+    with c3:
+        lowers = st.text_input("하한들", "20, 25, 30, 35", key="bt_sweep_lowers")
+    with c4:
+        uppers = st.text_input("상한들", "65, 70, 75, 80", key="bt_sweep_uppers")
+    if st.button("스윕 실행", key="bt_sweep_run"):
+        tickers = tuple(sorted({resolve_ticker(t.strip()) for t in sweep_input.split(",") if t.strip()}))
+        grid_dims = tuple(tuple(_parse_int_list(v)) for v in (windows, lowers, uppers))
+        if not tickers or not all(grid_dims):
+            st.info("종목과 파라미터를 입력하세요.")
+            return
+        with st.spinner(f"{len(tickers)}개 종목 스윕 중..."):
+            table = load_backtest_sweep(tickers, "5y", *grid_dims, tuple(entry), tuple(exit_), cost_bps)
+        if table.empty:
+            st.info("가격 데이터를 불러올 수 없습니다.")
+            return
+        st.dataframe(
+            table.sort_values("샤프", ascending=False).reset_index(drop=True)
+            .style.format({c: "{:.2f}" for c in table.columns if table[c].dtype.kind == "f"}),
+            use_container_width=True, hide_index=True,
+        )
+        st.caption(f"최근 5년 · {len(table)}개 조합 · 진입/청산 조건은 위 설정을 따르고 RSI 파라미터만 바꿉니다.")
+
 
 # ══════════════════════════════════════════════
 #  PAGE: FINANCIAL ANALYSIS (재무 분석)
@@ -2735,10 +4199,14 @@ def render_financial_analysis():
 
     # 데이터 로드
     with st.spinner(f"📡 {current_ticker} 재무제표 로딩..."):
-        info = fetch_stock_info(current_ticker)
         financials = fetch_stock_financials(current_ticker)
+        loaded = load_parallel({
+            "info": lambda: fetch_stock_info(current_ticker),
+            "annual": lambda: financials.prefetch(["balance_sheet", "income_stmt"]),
+        })
+        info = loaded["info"]
 
-    if not financials:
+    if all(df.empty for df in loaded["annual"].values()):
         st.error(f"'{current_ticker}'의 재무제표를 가져올 수 없습니다.")
         return
 
@@ -2807,7 +4275,7 @@ def render_financial_analysis():
     st.divider()
 
     # ─── 상세 분석 탭 ───
-    analysis_tabs = st.tabs(["📊 안정성", "💰 수익성", "📈 밸류에이션", "📉 추이", "📋 재무제표"])
+    analysis_tabs = st.tabs(["📊 안정성", "💰 수익성", "📈 밸류에이션", "📉 추이", "📋 재무제표", "🏭 동종업계"])
 
     with analysis_tabs[0]:
         st.markdown('<div class="section-header">안정성 분석 (Stability)</div>', unsafe_allow_html=True)
@@ -2883,6 +4351,28 @@ def render_financial_analysis():
         else:
             st.info("연도별 추이 데이터를 계산할 수 없습니다.")
 
+        st.markdown('<div class="section-header">분기별 TTM 비율 추이</div>', unsafe_allow_html=True)
+        if st.toggle("분기 재무제표로 TTM 추이 계산", key="fin_load_ttm"):
+            ttm_ratios = calculate_ttm_ratios(financials)
+            if not ttm_ratios.empty:
+                st.caption("손익 항목은 최근 4개 분기 합산(TTM), 재무상태 항목은 분기말 기준입니다.")
+                st.dataframe(ttm_ratios.round(2), use_container_width=True)
+
+                ttm_cols = [c for c in ["ROE(%)", "ROA(%)", "영업이익률(%)", "순이익률(%)"] if c in ttm_ratios.columns]
+                if ttm_cols:
+                    st.plotly_chart(
+                        make_ratio_chart(ttm_ratios, ttm_cols, "TTM 수익성 추이"),
+                        use_container_width=True
+                    )
+                qoq_cols = [c for c in ["분기 영업이익률(%)", "매출 QoQ(%)"] if c in ttm_ratios.columns]
+                if qoq_cols:
+                    st.plotly_chart(
+                        make_ratio_chart(ttm_ratios, qoq_cols, "분기별 마진 · 매출 성장 (QoQ)"),
+                        use_container_width=True
+                    )
+            else:
+                st.info("분기 재무제표가 부족해 TTM 추이를 계산할 수 없습니다.")
+
     with analysis_tabs[4]:
         st.markdown('<div class="section-header">재무제표 원본</div>', unsafe_allow_html=True)
 
@@ -2903,11 +4393,51 @@ def render_financial_analysis():
                 st.info("손익계산서 데이터가 없습니다.")
 
         with fs_tabs[2]:
-            cf = financials.get("cashflow")
-            if cf is not None and not cf.empty:
-                st.dataframe(cf, use_container_width=True)
+            if st.toggle("현금흐름표 불러오기", key="fin_load_cashflow"):
+                cf = financials.get("cashflow")
+                if cf is not None and not cf.empty:
+                    st.dataframe(cf, use_container_width=True)
+                else:
+                    st.info("현금흐름표 데이터가 없습니다.")
+
+    with analysis_tabs[5]:
+        st.markdown('<div class="section-header">동종업계 백분위 비교</div>', unsafe_allow_html=True)
+
+        if not (info.get("industry") or info.get("sector")):
+            st.info("섹터/산업 정보가 없어 동종업계 비교를 할 수 없습니다.")
+        elif st.toggle("동종업계 분포 불러오기", key="fin_load_peers"):
+            with st.spinner("동종업계 데이터 수집중..."):
+                dist = load_peer_distribution(info)
+            peer_df = rank_against_peers(info, dist) if dist else pd.DataFrame()
+
+            if peer_df.empty:
+                st.info("비교 가능한 동종업계 데이터가 부족합니다.")
             else:
-                st.info("현금흐름표 데이터가 없습니다.")
+                group_name = "산업" if dist["group"] == "industry" else "섹터"
+                st.caption(f"{group_name} `{dist['key']}` 상위 {len(dist['tickers'])}개 기업 기준 · 유리 백분위가 높을수록 업종 내 상위")
+
+                color_map = {"ratio-good": "#00b386", "ratio-warn": "#ff9f43", "ratio-bad": "#f04452"}
+                peer_rows = peer_df.to_dict("records")
+                for row_start in range(0, len(peer_rows), 4):
+                    cols = st.columns(4)
+                    for i, row in enumerate(peer_rows[row_start:row_start+4]):
+                        with cols[i]:
+                            vc = color_map.get(peer_color_class(row["유리 백분위"]), "#191f28")
+                            st.html(f"""
+                            <div style="background:#ffffff;border-radius:14px;padding:16px 12px;text-align:center;box-shadow:0 1px 4px rgba(0,0,0,0.04);
+                                        font-family:'Pretendard',-apple-system,BlinkMacSystemFont,system-ui,sans-serif;">
+                                <p style="color:#8b95a1;font-size:0.8rem;margin:0;">{row['지표']}</p>
+                                <p style="color:{vc};font-size:1.6rem;font-weight:bold;margin:4px 0;">상위 {100 - row['유리 백분위']:.0f}%</p>
+                                <p style="color:#b0b8c1;font-size:0.75rem;margin:0;">{row['값']:.2f} · 중앙값 {row['업종 중앙값']:.2f}</p>
+                            </div>
+                            """)
+
+                st.dataframe(
+                    peer_df.round(2), use_container_width=True, hide_index=True,
+                    column_config={
+                        "유리 백분위": st.column_config.ProgressColumn(min_value=0, max_value=100, format="%.0f"),
+                    }
+                )
 
 
 # ══════════════════════════════════════════════
@@ -2948,7 +4478,62 @@ def render_impact_page():
     st.divider()
 
     dir_key = "up" if "상승" in direction else "down"
-    render_impact_analysis(selected_id, dir_key)
+
+    c1, c2 = st.columns([2, 1])
+    with c1:
+        verify = st.toggle("과거 이벤트로 검증 (10년)", key="impact_event_study",
+                           help="지표가 크게 움직인 날 이후 관련 종목의 S&P500 대비 초과수익을 측정합니다.")
+    with c2:
+        horizon = st.select_slider("측정 구간 (거래일)", [1, 5, 10, 20], value=5, key="impact_event_horizon")
+    measured = None
+    if verify:
+        with st.spinner("과거 이벤트 분석중..."):
+            measured = load_event_study(selected_id, horizon)
+        if measured.empty:
+            st.caption("이벤트 분석에 필요한 데이터를 불러올 수 없습니다.")
+        else:
+            lags = " · ".join(f"{k} +{v}일" for k, v in FRED_RELEASE_LAG_DAYS.items())
+            st.caption(f"이벤트일은 FRED 관측일이 아닌 추정 발표일({lags})로 옮겨 측정합니다. "
+                       "발표가 이보다 빠른 지표는 반응 일부를 놓칠 수 있습니다.")
+    render_impact_analysis(selected_id, dir_key, measured, horizon)
+
+    st.divider()
+
+    # 시나리오 시뮬레이션
+    st.markdown("### 🎯 시나리오 시뮬레이션")
+    if st.toggle("지표 충격 시뮬레이션", key="impact_scenario",
+                 help="최근 10년 월간 회귀로 추정한 종목별 민감도에 충격을 가해 1개월 수익률 분포를 몬테카를로로 계산합니다."):
+        with st.spinner("민감도 추정중..."):
+            inputs = load_scenario_inputs(selected_id)
+        sens = inputs["sens"]
+        if sens.empty:
+            st.info("민감도를 추정할 데이터를 불러올 수 없습니다.")
+        else:
+            monthly_sd = float(inputs["indicator"]["monthly_sd"].iloc[0])
+            shock = st.number_input(
+                "충격 크기 (지표 단위)", value=round(monthly_sd * (1 if dir_key == "up" else -1), 3),
+                step=max(round(monthly_sd / 4, 3), 0.001), format="%.3f", key=f"impact_shock_{selected_id}_{dir_key}",
+                help=f"최근 10년 월간 변화량 표준편차: {monthly_sd:.3f} (예: 금리 +0.5 = +50bp)",
+            )
+            groups = impact_groups(selected_id)
+            groups["전체 (동일가중)"] = list(sens.index)
+            result = simulate_scenario(sens, inputs["cov"], shock, groups)
+
+            grp = result[result["구분"] == "그룹"]
+            fig = go.Figure(go.Bar(
+                x=grp.index, y=grp["중앙값(%)"],
+                marker_color=np.where(grp["중앙값(%)"] >= 0, "#00b386", "#f04452"),
+                error_y=dict(type="data", symmetric=False, color="#8b95a1",
+                             array=grp["상단 95%"] - grp["중앙값(%)"], arrayminus=grp["중앙값(%)"] - grp["하단 5%"]),
+            ))
+            fig.update_layout(**_chart_layout(f"충격 {shock:+.3f} 시 섹터별 1개월 예상 수익률 (중앙값 · 90% 구간)", 380),
+                              yaxis_title="%")
+            st.plotly_chart(fig, use_container_width=True)
+
+            table = result[result["구분"] == "종목"].join(sens[["beta", "r2", "n"]].rename(
+                columns={"beta": "민감도(β)", "r2": "R²", "n": "관측월"}))
+            st.dataframe(table.drop(columns="구분").round(3), use_container_width=True)
+            st.caption("5,000개 경로 · 베타 추정오차와 종목 간 잔차 상관을 함께 반영. 과거 관계가 유지된다는 가정의 추정치입니다.")
 
     st.divider()
 
@@ -2976,7 +4561,7 @@ def render_impact_page():
 
         # 차트
         fig = go.Figure()
-        fig.add_trace(go.Scatter(
+        fig.add_trace(line_trace_type(df)(
             x=df["date"], y=df["value"],
             line=dict(color="#3182f6", width=2),
             fill="tozeroy", fillcolor="rgba(49,130,246,0.08)"
@@ -3002,32 +4587,62 @@ def render_macro_analysis(start_str, end_str):
     </div>
     """, unsafe_allow_html=True)
 
+    macro_freq = st.radio("정렬 주기", list(MACRO_FREQUENCIES), index=2, horizontal=True, key="macro_freq",
+                          help="발표 주기가 다른 지표를 같은 주기로 맞춘 뒤 분석합니다 (월간: 월말 기준).")
     with st.spinner("📡 데이터 로딩..."):
-        df = load_macro_data(start_str, end_str)
+        df = load_macro_frame(start_str, end_str, macro_freq)
 
     if df.empty:
         st.error("데이터를 로드할 수 없습니다.")
         return
 
-    tabs = st.tabs(["🔥 상관관계", "📊 수익률", "📐 회귀분석", "📋 통계", "📥 데이터"])
+    tabs = st.tabs(["🔥 상관관계", "📊 수익률", "📐 회귀분석", "⏱️ 선후행", "📋 통계", "📥 데이터"])
 
     with tabs[0]:
         st.markdown("### 지표 간 상관관계 히트맵")
         numeric_cols = df.select_dtypes(include=[np.number]).columns
-        corr = df[numeric_cols].corr()
+        corr_engine = rolling_correlation(df[numeric_cols])
+        n_obs = len(corr_engine.index)
+        corr_mode = st.radio("구간", ["전체", "롤링", "확장"], horizontal=True, key="macro_corr_mode",
+                             help="롤링: 기준 시점까지 최근 N개 관측치 · 확장: 처음부터 기준 시점까지")
+        corr_window = None
+        if corr_mode == "전체" or n_obs < 2:
+            corr = corr_engine.matrix()
+        else:
+            c1, c2 = st.columns([1, 2])
+            if corr_mode == "롤링":
+                with c1:
+                    corr_window = st.slider("윈도우 (관측치)", 10, max(11, n_obs), min(120, max(10, n_obs // 4)),
+                                            key="macro_corr_window")
+            with c2:
+                labels = corr_engine.index.strftime("%Y-%m-%d")
+                end_label = st.select_slider("기준 시점", options=list(labels), value=labels[-1], key="macro_corr_end")
+            corr = corr_engine.matrix(end=labels.get_loc(end_label), window=corr_window)
         st.plotly_chart(make_heatmap(corr), use_container_width=True)
 
+        if corr_mode != "전체" and len(numeric_cols) > 1:
+            st.markdown("#### 지표쌍 상관계수 추이")
+            c1, c2 = st.columns(2)
+            with c1:
+                pair_a = st.selectbox("지표 A", list(numeric_cols), index=0, key="macro_corr_pair_a")
+            with c2:
+                pair_b = st.selectbox("지표 B", list(numeric_cols), index=1, key="macro_corr_pair_b")
+            if pair_a != pair_b:
+                pair = corr_engine.pair_series(pair_a, pair_b, window=corr_window).dropna()
+                st.plotly_chart(make_line(pair, f"{pair_a} · {pair_b} {corr_mode} 상관계수"), use_container_width=True)
+
     with tabs[1]:
         st.markdown("### 기간별 수익률 비교")
         returns = {}
         for col in df.columns:
-            if df[col].notna().sum() > 12:
+            s = df[col].dropna()
+            if len(s) > 12:
                 returns[col] = {}
                 for p in [1, 3, 6, 12]:
-                    s = df[col].dropna()
-                    if len(s) > p:
+                    # 정렬 주기와 무관하게 p개월 전 시점의 값과 비교
+                    past = s.asof(s.index[-1] - pd.DateOffset(months=p))
+                    if pd.notna(past):
                         curr = s.iloc[-1]
-                        past = s.iloc[-p-1] if len(s) > p else s.iloc[0]
                         returns[col][f"{p}M"] = ((curr - past) / abs(past)) * 100 if past != 0 else 0
         returns_df = pd.DataFrame(returns).T
         if not returns_df.empty:
@@ -3042,25 +4657,24 @@ def render_macro_analysis(start_str, end_str):
     with tabs[2]:
         st.markdown("### 금리차 → 환율 회귀분석")
         if "금리차" in df.columns and "원달러" in df.columns:
-            clean = df[["금리차", "원달러"]].dropna()
-            if len(clean) > 10:
-                corr_val = clean["금리차"].corr(clean["원달러"])
-                x = clean["금리차"]
-                y = clean["원달러"]
-                slope = np.cov(x, y)[0, 1] / np.var(x) if np.var(x) != 0 else 0
-                intercept = y.mean() - slope * x.mean()
+            fit = fit_ols(df, "원달러", ["금리차"])
+            if fit is not None and fit["n"] > 10:
+                slope, intercept = fit["coef"].loc["금리차", "계수"], fit["coef"].loc["상수", "계수"]
+                corr_val = np.sign(slope) * np.sqrt(fit["r2"])
 
                 c1, c2, c3 = st.columns(3)
                 with c1:
                     st.metric("상관계수", f"{corr_val:.3f}")
                 with c2:
-                    st.metric("기울기", f"{slope:.2f}")
+                    st.metric("기울기", f"{slope:.2f}", help=f"표준오차 {fit['coef'].loc['금리차', '표준오차']:.2f}")
                 with c3:
-                    st.metric("R²", f"{corr_val**2:.3f}")
+                    st.metric("R²", f"{fit['r2']:.3f}")
 
                 st.markdown(f"**회귀식:** 원달러 = {intercept:.2f} + ({slope:.2f}) × 금리차")
-                st.markdown(f"**해석:** 금리차가 1%p 하락하면 원달러 약 {abs(slope):.0f}원 상승")
+                st.markdown(f"**해석:** 금리차가 1%p 하락하면 원달러 약 {abs(slope):.0f}원 {'상승' if slope < 0 else '하락'}")
 
+                clean = df.loc[fit["fitted"].index, ["금리차", "원달러"]]
+                x, y = clean["금리차"], clean["원달러"]
                 fig = go.Figure()
                 fig.add_trace(go.Scatter(x=x, y=y, mode="markers", marker=dict(color="#3182f6", size=6, opacity=0.6), name="데이터"))
                 x_line = np.linspace(x.min(), x.max(), 100)
@@ -3074,30 +4688,110 @@ def render_macro_analysis(start_str, end_str):
         # 추가 회귀분석
         st.markdown("### 커스텀 회귀분석")
         numeric_cols = [c for c in df.columns if df[c].notna().sum() > 10]
-        c1, c2 = st.columns(2)
+        c1, c2, c3 = st.columns([2, 1, 1])
         with c1:
-            x_col = st.selectbox("X축 (독립변수)", numeric_cols, index=0)
+            x_cols = st.multiselect("X (독립변수)", numeric_cols, default=numeric_cols[:1], key="macro_ols_x")
         with c2:
-            y_col = st.selectbox("Y축 (종속변수)", numeric_cols, index=min(1, len(numeric_cols)-1))
+            y_col = st.selectbox("Y (종속변수)", numeric_cols, index=min(1, len(numeric_cols)-1), key="macro_ols_y")
+        with c3:
+            max_lag = st.slider("최대 시차", 0, 12, 0, key="macro_ols_lag",
+                                help="X의 0~N기 전 값을 모두 설명변수로 넣습니다.")
 
-        if x_col and y_col and x_col != y_col:
-            clean = df[[x_col, y_col]].dropna()
-            if len(clean) > 5:
-                corr_v = clean[x_col].corr(clean[y_col])
-                st.metric("상관계수", f"{corr_v:.3f}")
+        x_cols = [c for c in x_cols if c != y_col]
+        if x_cols and y_col:
+            fit = fit_ols(df, y_col, x_cols, lags=range(max_lag + 1))
+            if fit is not None:
+                c1, c2, c3 = st.columns(3)
+                with c1:
+                    st.metric("R²", f"{fit['r2']:.3f}")
+                with c2:
+                    st.metric("조정 R²", f"{fit['adj_r2']:.3f}")
+                with c3:
+                    st.metric("관측수", f"{fit['n']}")
+                st.dataframe(fit["coef"].round(4), use_container_width=True)
 
                 fig = go.Figure()
-                fig.add_trace(go.Scatter(x=clean[x_col], y=clean[y_col], mode="markers",
-                                          marker=dict(color="#3182f6", size=6, opacity=0.6)))
-                fig.update_layout(**_chart_layout(f"{x_col} vs {y_col}", 400), xaxis_title=x_col, yaxis_title=y_col)
+                if len(x_cols) == 1 and max_lag == 0:
+                    clean = df.loc[fit["fitted"].index]
+                    fig.add_trace(go.Scatter(x=clean[x_cols[0]], y=clean[y_col], mode="markers",
+                                              marker=dict(color="#3182f6", size=6, opacity=0.6)))
+                    fig.update_layout(**_chart_layout(f"{x_cols[0]} vs {y_col}", 400), xaxis_title=x_cols[0], yaxis_title=y_col)
+                else:
+                    actual = df.loc[fit["fitted"].index, y_col]
+                    trace = line_trace_type(actual, fit["fitted"])
+                    fig.add_trace(trace(x=actual.index, y=actual.values, name="실제", line=dict(color="#3182f6", width=2)))
+                    fig.add_trace(trace(x=fit["fitted"].index, y=fit["fitted"].values, name="적합값",
+                                        line=dict(color="#f04452", width=2, dash="dash")))
+                    fig.update_layout(**_chart_layout(f"{y_col} 실제 vs 적합값", 400))
                 st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.info("관측치가 부족합니다. 변수나 시차를 줄여 보세요.")
+
+        st.markdown("### 롤링 민감도")
+        st.caption("Y의 기간별 변화량을 X의 변화량에 롤링 회귀한 기울기 — 관계가 시기별로 어떻게 바뀌었는지 봅니다.")
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            sens_x = st.selectbox("X", numeric_cols, index=0, key="macro_sens_x")
+        with c2:
+            sens_y = st.selectbox("Y", numeric_cols, index=min(1, len(numeric_cols)-1), key="macro_sens_y")
+        with c3:
+            sens_window = st.slider("윈도우 (관측치)", 6, max(7, min(250, len(df) // 2)), min(24, max(6, len(df) // 4)),
+                                    key="macro_sens_window")
+        if sens_x != sens_y:
+            sens = rolling_beta(df[sens_y].diff(), df[sens_x].diff(), window=sens_window)["beta"].dropna()
+            if not sens.empty:
+                st.plotly_chart(make_line(sens, f"{sens_x} → {sens_y} 롤링 민감도 ({sens_window})", color="#6c5ce7", height=320),
+                                use_container_width=True)
+
+        st.markdown("### 예측력 스캔")
+        st.caption("모든 지표쌍에 대해 Y(t) ~ X(t−시차) 단순회귀를 한 번에 적합해 R² 순으로 정렬합니다.")
+        scan_lag = st.slider("시차 (기)", 0, 12, 1, key="macro_scan_lag")
+        scan = batch_ols_scan(df[numeric_cols], lag=scan_lag)
+        if not scan.empty:
+            st.dataframe(scan.head(20).round(4), use_container_width=True, hide_index=True)
 
     with tabs[3]:
+        st.markdown("### 지표 간 선행 · 후행 관계")
+        st.caption("모든 지표쌍의 교차상관을 시차별로 계산해, 상관이 가장 큰 시차로 어느 지표가 먼저 움직이는지 보여줍니다.")
+        c1, c2 = st.columns(2)
+        with c1:
+            ll_changes = st.radio("기준", ["변화량", "수준"], horizontal=True, key="macro_ll_basis",
+                                  help="수준(레벨)끼리는 추세 때문에 허위 상관이 생기기 쉬워 변화량을 권장합니다.") == "변화량"
+        with c2:
+            ll_max_lag = st.slider("최대 시차 (기)", 1, 24, 12, key="macro_ll_max_lag")
+        lead_lag = load_lead_lag(start_str, end_str, macro_freq, ll_max_lag, ll_changes)
+        ll_table = lead_lag["table"]
+        if ll_table.empty:
+            st.info("선후행 분석에 필요한 데이터가 부족합니다.")
+        else:
+            st.dataframe(ll_table.head(20).round(3), use_container_width=True, hide_index=True)
+
+            st.markdown("#### 교차상관 함수")
+            c1, c2 = st.columns(2)
+            with c1:
+                ll_x = st.selectbox("X (선행 후보)", list(df.columns), index=0, key="macro_ll_x")
+            with c2:
+                ll_y = st.selectbox("Y", list(df.columns), index=min(1, len(df.columns)-1), key="macro_ll_y")
+            ccf = lead_lag["ccf"]
+            pair = ccf[(ccf["X"] == ll_x) & (ccf["Y"] == ll_y)]
+            if ll_x != ll_y and not pair.empty and pair["상관계수"].notna().any():
+                band = 2 / np.sqrt(max(int(pair["관측수"].max()), 1))
+                fig = go.Figure(go.Bar(
+                    x=pair["시차"], y=pair["상관계수"],
+                    marker_color=np.where(pair["상관계수"].abs() > band, "#3182f6", "#d1d6db"),
+                ))
+                fig.add_hline(y=band, line_dash="dot", line_color="#b0b8c1")
+                fig.add_hline(y=-band, line_dash="dot", line_color="#b0b8c1")
+                fig.update_layout(**_chart_layout(f"corr({ll_x}(t), {ll_y}(t+시차))", 360),
+                                  xaxis_title="시차 (+: X가 선행)", yaxis_title="상관계수")
+                st.plotly_chart(fig, use_container_width=True)
+
+    with tabs[4]:
         st.markdown("### 기술통계량")
         desc = df.describe().T
         st.dataframe(desc.round(2), use_container_width=True)
 
-    with tabs[4]:
+    with tabs[5]:
         st.markdown("### 데이터 다운로드")
         csv = df.to_csv().encode("utf-8-sig")
         st.download_button("📥 전체 데이터 CSV", csv, "yw_finance_data.csv", "text/csv", use_container_width=True)
@@ -3108,48 +4802,166 @@ def render_macro_analysis(start_str, end_str):
 #  PAGE: FUNDAMENTAL ANALYSIS (펀더멘탈 분석)
 # ══════════════════════════════════════════════
 
-@st.cache_data(ttl=300)
+class NewsRecord(NamedTuple):
+    """정규화된 뉴스 1건 — fetch_news_data가 캐시 시점에 한 번만 만든다"""
+    id: str
+    title: str
+    summary: str
+    publisher: str
+    link: str
+    published: Optional[int]  # epoch 초 (UTC)
+
+    @property
+    def published_label(self):
+        """표시용 발행 시각 (로컬 시간, 없으면 빈 문자열)"""
+        return datetime.fromtimestamp(self.published).strftime("%Y-%m-%d %H:%M") if self.published else ""
+
+
+def _news_timestamp(value):
+    """epoch 초 / ISO 문자열 → epoch 초 (실패 시 None)"""
+    if value is None or value == "":
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            return int(value)
+        ts = pd.Timestamp(value)
+        if ts.tzinfo is None:
+            ts = ts.tz_localize("UTC")
+        return int(ts.timestamp())
+    except Exception:
+        return None
+
+
+def parse_news_item(item):
+    """yfinance 뉴스 항목(버전별 구조 상이) → NewsRecord (제목이 없으면 None)"""
+    title = item.get("title", "")
+    publisher = item.get("publisher", "")
+    link = item.get("link", "")
+    summary = item.get("summary", "") if isinstance(item.get("summary"), str) else ""
+    published = _news_timestamp(item.get("providerPublishTime", item.get("publishedDate")))
+    article_id = item.get("uuid") or item.get("id") or ""
+
+    # Newer yfinance versions may nest data differently
+    content = item.get("content")
+    if not title and isinstance(content, dict):
+        title = content.get("title", "")
+        publisher = content.get("provider", {}).get("displayName", "") if isinstance(content.get("provider"), dict) else ""
+        link = content.get("canonicalUrl", {}).get("url", "") if isinstance(content.get("canonicalUrl"), dict) else ""
+        summary = content.get("summary") or content.get("description") or ""
+        published = _news_timestamp(content.get("pubDate"))
+        article_id = article_id or content.get("id", "")
+
+    if not title:
+        return None
+    if not article_id:
+        # id가 없는 소스는 URL(없으면 제목)로 식별
+        article_id = "url:" + hashlib.sha1((link or title).encode("utf-8")).hexdigest()
+    return NewsRecord(str(article_id), title, summary or "", publisher or "", link or "", published)
+
+
+@arrow_cache(ttl=300)
 def fetch_news_data(ticker):
-    """yfinance에서 뉴스 데이터 가져오기"""
+    """yfinance에서 뉴스 데이터 가져오기 → NewsRecord 튜플"""
     try:
         stock = yf.Ticker(ticker)
-        news = stock.news
-        if news:
-            return news
-        return []
+        records = (parse_news_item(item) for item in stock.news or [])
+        return tuple(r for r in records if r)
     except Exception:
-        return []
+        return ()
+
+
+NEWS_POSITIVE_KEYWORDS = [
+    "surge", "beat", "growth", "record", "upgrade", "rally", "gain",
+    "profit", "revenue up", "outperform", "bullish", "breakthrough",
+    "innovation", "strong", "expand", "raise", "exceed", "optimism",
+    "상승", "호실적", "성장", "신고가", "매수", "흑자", "개선", "호조",
+    "돌파", "최고", "확대", "상향", "수혜", "기대", "반등"
+]
+NEWS_NEGATIVE_KEYWORDS = [
+    "decline", "miss", "cut", "downgrade", "layoff", "loss", "drop",
+    "fall", "crash", "bear", "recession", "weak", "risk", "warning",
+    "lawsuit", "fraud", "investigation", "bankruptcy", "debt",
+    "하락", "적자", "감소", "매도", "리스크", "손실", "하향", "위기",
+    "부진", "축소", "경고", "소송", "파산", "부채"
+]
+# 굴절형(-s/-ed/-ing ...)으로 만들 수 없는 영문 파생어 — 같은 키워드로 집계
+_ENGLISH_DERIVED_FORMS = {
+    "beat": {"beaten"},
+    "profit": {"profitable", "profitability", "profitably"},
+    "strong": {"strongest"},
+    "fall": {"fallen"},
+    "bear": {"bearish"},
+    "weak": {"weakness", "weaken", "weakened", "weakening", "weakens", "weakest"},
+    "risk": {"risky", "riskier", "riskiest"},
+    "fraud": {"fraudulent", "fraudulently"},
+    "recession": {"recessionary"},
+}
+# 영문 키워드의 굴절형 중 다른 단어가 되는 형태 (interest-bearing의 bearing, "recorded a loss"의 recorded 등)
+_ENGLISH_KEYWORD_EXCLUDE = {
+    "bear": {"bearing", "bearings", "bearer", "bearers"},
+    "record": {"recorded", "recording", "recordings", "recorder", "recorders"},
+}
+# 한글 키워드가 복합어 일부로 쓰여 뜻이 달라지는 경우 (최고경영자, 기대 이하 등)
+_KO_KEYWORD_EXCLUDE = {
+    "최고": r"경영|재무|기술|운영",
+    "기대": r"\s*이하|에\s*못|치\s*하회",
+}
 
 
-def analyze_news_sentiment(news_item):
-    """키워드 기반 뉴스 감성 분석"""
-    positive_keywords = [
-        "surge", "beat", "growth", "record", "upgrade", "rally", "gain",
-        "profit", "revenue up", "outperform", "bullish", "breakthrough",
-        "innovation", "strong", "expand", "raise", "exceed", "optimism",
-        "상승", "호실적", "성장", "신고가", "매수", "흑자", "개선", "호조",
-        "돌파", "최고", "확대", "상향", "수혜", "기대", "반등"
-    ]
-    negative_keywords = [
-        "decline", "miss", "cut", "downgrade", "layoff", "loss", "drop",
-        "fall", "crash", "bear", "recession", "weak", "risk", "warning",
-        "lawsuit", "fraud", "investigation", "bankruptcy", "debt",
-        "하락", "적자", "감소", "매도", "리스크", "손실", "하향", "위기",
-        "부진", "축소", "경고", "소송", "파산", "부채"
-    ]
+def _english_keyword_forms(kw):
+    """영문 키워드의 굴절형 + 파생어 집합 (surge → surges/surged/surging, rally → rallies, weak → weakness ...)"""
+    derived = _ENGLISH_DERIVED_FORMS.get(kw, set())
+    if kw.endswith("e"):
+        stem = kw[:-1]
+        forms = {kw, stem + "es", stem + "ed", stem + "ing", stem + "er", stem + "ers"}
+    else:
+        forms = {kw + suffix for suffix in ("", "s", "es", "ed", "ing", "er", "ers", "ly")}
+        forms |= {kw + kw[-1] + suffix for suffix in ("ed", "ing", "er")}
+        if kw.endswith("y") and kw[-2:-1] not in "aeiou":
+            forms |= {kw[:-1] + "ies", kw[:-1] + "ied"}
+    return (forms | derived) - _ENGLISH_KEYWORD_EXCLUDE.get(kw, set())
+
+
+def _build_sentiment_matcher():
+    """키워드 매처를 한 번만 구성 → (영문 토크나이저, 단어표, 구문표, 한글 정규식, 한글 인덱스, 극성)
 
-    title = news_item.get("title", "").lower()
-    # Some news structures use 'relatedTickers' or 'summary'
-    summary = ""
-    if isinstance(news_item.get("summary"), str):
-        summary = news_item["summary"].lower()
-    elif isinstance(news_item.get("description"), str):
-        summary = news_item["description"].lower()
+    영문은 단어 단위로만 매칭해 "executive"의 cut, "against"의 gain 같은 오탐을 막고,
+    한글은 조사가 붙으므로 부분 문자열로 매칭한다.
+    """
+    import re
+    keywords = [(kw.lower(), 1) for kw in NEWS_POSITIVE_KEYWORDS] + [(kw.lower(), -1) for kw in NEWS_NEGATIVE_KEYWORDS]
+    words, phrases, korean = {}, {}, {}
+    for i, (kw, _) in enumerate(keywords):
+        if not kw.isascii():
+            korean[kw] = i
+        elif " " in kw:
+            phrases[tuple(kw.split())] = i
+        else:
+            for form in _english_keyword_forms(kw):
+                words.setdefault(form, i)
+    korean_pattern = re.compile("|".join(
+        re.escape(kw) + (f"(?!{_KO_KEYWORD_EXCLUDE[kw]})" if kw in _KO_KEYWORD_EXCLUDE else "")
+        for kw in sorted(korean, key=len, reverse=True)
+    ))
+    polarity = [p for _, p in keywords]
+    return re.compile(r"[a-z]+"), words, phrases, korean_pattern, korean, polarity
 
-    text = title + " " + summary
 
-    pos_count = sum(1 for kw in positive_keywords if kw.lower() in text)
-    neg_count = sum(1 for kw in negative_keywords if kw.lower() in text)
+(_SENTIMENT_TOKEN, _SENTIMENT_WORDS, _SENTIMENT_PHRASES, _SENTIMENT_KO_PATTERN,
+ _SENTIMENT_KO_INDEX, _SENTIMENT_POLARITY) = _build_sentiment_matcher()
+
+
+def score_headline(text):
+    """텍스트 1건 감성 — 매칭된 (서로 다른) 긍정/부정 키워드 수 비교"""
+    text = text.lower()
+    tokens = _SENTIMENT_TOKEN.findall(text)
+    matched = {_SENTIMENT_WORDS[t] for t in tokens if t in _SENTIMENT_WORDS}
+    if _SENTIMENT_PHRASES:
+        matched.update(_SENTIMENT_PHRASES[p] for p in zip(tokens, tokens[1:]) if p in _SENTIMENT_PHRASES)
+    if not text.isascii():
+        matched.update(_SENTIMENT_KO_INDEX[m] for m in _SENTIMENT_KO_PATTERN.findall(text))
+    pos_count = sum(1 for i in matched if _SENTIMENT_POLARITY[i] > 0)
+    neg_count = len(matched) - pos_count
 
     if pos_count > neg_count:
         return "positive", pos_count - neg_count
@@ -3159,153 +4971,322 @@ def analyze_news_sentiment(news_item):
         return "neutral", 0
 
 
-def calculate_financial_health_score(info):
-    """재무 건전성 점수 계산 (0-100)"""
-    score = 0
-    details = {"profitability": 0, "stability": 0, "valuation": 0, "growth": 0}
+def score_headlines(texts):
+    """여러 헤드라인 일괄 감성 분석 → [(sentiment, strength), ...]"""
+    return [score_headline(t) for t in texts]
 
-    # ─── 수익성 (25점) ───
-    prof_score = 0
-    roe = info.get("returnOnEquity")
-    if roe is not None:
-        if roe > 0.20:
-            prof_score += 8
-        elif roe > 0.15:
-            prof_score += 7
-        elif roe > 0.10:
-            prof_score += 5
-        elif roe > 0.05:
-            prof_score += 3
-        elif roe > 0:
-            prof_score += 1
 
-    roa = info.get("returnOnAssets")
-    if roa is not None:
-        if roa > 0.10:
-            prof_score += 7
-        elif roa > 0.07:
-            prof_score += 6
-        elif roa > 0.05:
-            prof_score += 4
-        elif roa > 0.02:
-            prof_score += 2
-        elif roa > 0:
-            prof_score += 1
+# ──────────────────────────────────────────────
+#  뉴스 감성 저장소 (SQLite) — 기사당 1회만 감성 분석
+# ──────────────────────────────────────────────
 
-    margin = info.get("profitMargins")
-    if margin is not None:
-        if margin > 0.25:
-            prof_score += 10
-        elif margin > 0.15:
-            prof_score += 8
-        elif margin > 0.10:
-            prof_score += 6
-        elif margin > 0.05:
-            prof_score += 4
-        elif margin > 0:
-            prof_score += 2
-
-    details["profitability"] = min(prof_score, 25)
-
-    # ─── 안정성 (25점) ───
-    stab_score = 0
-    current_ratio = info.get("currentRatio")
-    if current_ratio is not None:
-        if current_ratio >= 2.0:
-            stab_score += 13
-        elif current_ratio >= 1.5:
-            stab_score += 10
-        elif current_ratio >= 1.0:
-            stab_score += 7
-        elif current_ratio >= 0.5:
-            stab_score += 3
+LOCAL_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".ywlab")
+NEWS_DB_PATH = os.path.join(LOCAL_DATA_DIR, "news.sqlite3")
 
-    dte = info.get("debtToEquity")
-    if dte is not None:
-        if dte < 30:
-            stab_score += 12
-        elif dte < 50:
-            stab_score += 10
-        elif dte < 100:
-            stab_score += 7
-        elif dte < 150:
-            stab_score += 4
-        elif dte < 200:
-            stab_score += 2
 
-    details["stability"] = min(stab_score, 25)
+class _NewsStore:
+    """기사 id/URL 기준 중복 제거 + 감성 결과 영구 저장. 이미 저장된 기사는 재분석하지 않음"""
 
-    # ─── 밸류에이션 (25점) ───
-    val_score = 0
-    pe = info.get("trailingPE")
-    if pe is not None and pe > 0:
-        if pe < 10:
-            val_score += 10
-        elif pe < 15:
-            val_score += 8
-        elif pe < 22:
-            val_score += 6
-        elif pe < 30:
-            val_score += 4
-        elif pe < 50:
-            val_score += 2
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS articles (
+            id TEXT PRIMARY KEY, title TEXT NOT NULL, publisher TEXT, link TEXT,
+            published INTEGER, sentiment TEXT NOT NULL, strength INTEGER NOT NULL,
+            ingested INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS article_tickers (
+            id TEXT NOT NULL, ticker TEXT NOT NULL, PRIMARY KEY (id, ticker)
+        );
+        CREATE INDEX IF NOT EXISTS idx_article_tickers_ticker ON article_tickers (ticker);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_link ON articles (link) WHERE link != '';
+        CREATE TABLE IF NOT EXISTS sentiment_daily (
+            ticker TEXT NOT NULL, day TEXT NOT NULL, positive INTEGER NOT NULL,
+            negative INTEGER NOT NULL, neutral INTEGER NOT NULL, net INTEGER NOT NULL,
+            PRIMARY KEY (ticker, day)
+        );
+    """
+    _COLUMNS = ["id", "title", "publisher", "link", "published", "sentiment", "strength"]
+    # 종목-기사 연결을 (UTC) 일자별로 집계해 누적 — 새로 연결된 기사만 넘겨 증분 갱신
+    _DAILY_UPSERT = """
+        INSERT INTO sentiment_daily (ticker, day, positive, negative, neutral, net)
+        SELECT t.ticker, date(COALESCE(a.published, a.ingested), 'unixepoch'),
+               SUM(a.sentiment = 'positive'), SUM(a.sentiment = 'negative'), SUM(a.sentiment = 'neutral'),
+               SUM(CASE a.sentiment WHEN 'positive' THEN a.strength WHEN 'negative' THEN -a.strength ELSE 0 END)
+        FROM articles a JOIN article_tickers t ON t.id = a.id
+        WHERE {where}
+        GROUP BY 1, 2
+        ON CONFLICT (ticker, day) DO UPDATE SET
+            positive = positive + excluded.positive, negative = negative + excluded.negative,
+            neutral = neutral + excluded.neutral, net = net + excluded.net
+    """
 
-    pb = info.get("priceToBook")
-    if pb is not None and pb > 0:
-        if pb < 1.0:
-            val_score += 8
-        elif pb < 2.0:
-            val_score += 6
-        elif pb < 4.0:
-            val_score += 4
-        elif pb < 7.0:
-            val_score += 2
+    def __init__(self, path):
+        import sqlite3
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(self._SCHEMA)
+        if self._conn.execute("SELECT NOT EXISTS (SELECT 1 FROM sentiment_daily)").fetchone()[0]:
+            # 일별 집계 도입 이전에 저장된 기사 백필
+            self._conn.execute(self._DAILY_UPSERT.format(where="1"))
+            self._conn.commit()
+        self._lock = threading.Lock()
+
+    def _scores(self, ids):
+        placeholders = ",".join("?" * len(ids))
+        cur = self._conn.execute(f"SELECT id, sentiment, strength FROM articles WHERE id IN ({placeholders})", ids)
+        return {row[0]: (row[1], row[2]) for row in cur}
+
+    def ingest(self, ticker, articles):
+        """NewsRecord 목록 저장 → [(record, (sentiment, strength)), ...] (중복 제거 후 입력 순서, 신규만 분석)"""
+        if not articles:
+            return []
+        with self._lock:
+            # 같은 URL이 다른 id로 들어오면 (피드·종목이 달라도) 먼저 저장된 id로 통일
+            links = [a.link for a in articles if a.link]
+            canonical = dict(self._conn.execute(
+                f"SELECT link, id FROM articles WHERE link IN ({','.join('?' * len(links))})", links
+            )) if links else {}
+            unique = {}
+            for a in articles:
+                if a.link:
+                    canonical.setdefault(a.link, a.id)
+                    a = a._replace(id=canonical[a.link])
+                unique.setdefault(a.id, a)
+            articles = list(unique.values())
+            ids = list(unique)
+            known = self._scores(ids)
+            fresh = [a for a in articles if a.id not in known]
+            if fresh:
+                scores = score_headlines(a.title + " " + a.summary for a in fresh)
+                now = int(time.time())
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(a.id, a.title, a.publisher, a.link, a.published, s, n, now)
+                     for a, (s, n) in zip(fresh, scores)],
+                )
+                known.update((a.id, score) for a, score in zip(fresh, scores))
+            placeholders = ",".join("?" * len(ids))
+            linked = {row[0] for row in self._conn.execute(
+                f"SELECT id FROM article_tickers WHERE ticker = ? AND id IN ({placeholders})", [ticker, *ids]
+            )}
+            new_links = [i for i in ids if i not in linked]
+            if new_links:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO article_tickers VALUES (?, ?)", [(i, ticker) for i in new_links]
+                )
+                self._conn.execute(
+                    self._DAILY_UPSERT.format(where=f"t.ticker = ? AND t.id IN ({','.join('?' * len(new_links))})"),
+                    [ticker, *new_links],
+                )
+            self._conn.commit()
+        return [(a, known[a.id]) for a in articles]
+
+    def articles_for(self, tickers, since=None):
+        """종목(들)의 저장된 기사 → DataFrame (최신순, 여러 종목에 걸친 기사는 1행에 종목을 tickers로 묶음)"""
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        if not tickers:
+            return pd.DataFrame(columns=self._COLUMNS + ["tickers"])
+        query = (
+            f"SELECT {', '.join('a.' + c for c in self._COLUMNS)}, group_concat(t.ticker, ', ') AS tickers "
+            f"FROM articles a JOIN article_tickers t ON t.id = a.id "
+            f"WHERE t.ticker IN ({','.join('?' * len(tickers))})"
+        )
+        params = list(tickers)
+        if since is not None:
+            query += " AND a.published >= ?"
+            params.append(int(since))
+        with self._lock:
+            return pd.read_sql_query(query + " GROUP BY a.id ORDER BY a.published DESC", self._conn, params=params)
+
+    def daily_sentiment(self, ticker):
+        """종목의 일별 감성 집계 → DataFrame (index: 일자, 긍정/부정/중립 건수 · 강도 합 net)"""
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT day, positive, negative, neutral, net FROM sentiment_daily WHERE ticker = ? ORDER BY day",
+                self._conn, params=[ticker],
+            )
+        return df.set_index(pd.DatetimeIndex(pd.to_datetime(df.pop("day")), name="day"))
 
-    peg = info.get("pegRatio")
-    if peg is not None and peg > 0:
-        if peg < 1.0:
-            val_score += 7
-        elif peg < 1.5:
-            val_score += 5
-        elif peg < 2.0:
-            val_score += 3
-        elif peg < 3.0:
-            val_score += 1
+    def usage(self):
+        """(기사 수, 종목-기사 연결 수)"""
+        with self._lock:
+            n_articles = self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+            n_links = self._conn.execute("SELECT COUNT(*) FROM article_tickers").fetchone()[0]
+        return n_articles, n_links
 
-    details["valuation"] = min(val_score, 25)
 
-    # ─── 성장성 (25점) ───
-    grow_score = 0
-    rev_growth = info.get("revenueGrowth")
-    if rev_growth is not None:
-        if rev_growth > 0.30:
-            grow_score += 13
-        elif rev_growth > 0.20:
-            grow_score += 10
-        elif rev_growth > 0.10:
-            grow_score += 7
-        elif rev_growth > 0.05:
-            grow_score += 5
-        elif rev_growth > 0:
-            grow_score += 3
+@st.cache_resource
+def _get_news_store():
+    """리런·세션 간 공유되는 뉴스 저장소 (디스크에 쓸 수 없으면 메모리)"""
+    try:
+        return _NewsStore(NEWS_DB_PATH)
+    except Exception:
+        return _NewsStore(":memory:")
 
-    earn_growth = info.get("earningsGrowth")
-    if earn_growth is not None:
-        if earn_growth > 0.30:
-            grow_score += 12
-        elif earn_growth > 0.20:
-            grow_score += 10
-        elif earn_growth > 0.10:
-            grow_score += 7
-        elif earn_growth > 0.05:
-            grow_score += 5
-        elif earn_growth > 0:
-            grow_score += 3
 
-    details["growth"] = min(grow_score, 25)
+def sentiment_index(hist, daily, window=5):
+    """일별 감성 집계를 주가 인덱스에 정렬 → DataFrame(기사 수, 감성 지수)
+
+    휴장일 기사는 다음 거래일로 넘기고, 감성 지수는 최근 window 거래일 기사의
+    평균 부호 강도(긍정 +, 부정 −)다. 기사가 없는 구간은 NaN.
+    """
+    out = pd.DataFrame(index=hist.index, columns=["기사 수", "감성 지수"], dtype=float)
+    if hist.empty or daily.empty:
+        return out
+    dates = hist.index.tz_localize(None) if hist.index.tz is not None else hist.index
+    dates = dates.normalize().values
+    days = daily.index.values
+    pos = np.searchsorted(dates, days, side="left")
+    # 첫 봉 이전 기사는 첫 봉에 몰리지 않도록 제외 (휴장일 → 다음 거래일 이월만 허용)
+    inside = (pos < len(dates)) & (days >= dates[0])
+    count = np.zeros(len(dates))
+    net = np.zeros(len(dates))
+    np.add.at(count, pos[inside], (daily["positive"] + daily["negative"] + daily["neutral"]).values[inside])
+    np.add.at(net, pos[inside], daily["net"].values[inside])
+    rolled_count = pd.Series(count).rolling(window, min_periods=1).sum().values
+    rolled_net = pd.Series(net).rolling(window, min_periods=1).sum().values
+    out["기사 수"] = count
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out["감성 지수"] = np.where(rolled_count > 0, rolled_net / rolled_count, np.nan)
+    return out
+
+
+def ingest_news(ticker, records):
+    """fetch_news_data 결과(NewsRecord) → 중복 제거 · (신규만) 감성 분석 · 저장 → [(record, (sentiment, strength))]"""
+    return _get_news_store().ingest(ticker, records or ())
+
 
-    score = details["profitability"] + details["stability"] + details["valuation"] + details["growth"]
-    return min(score, 100), details
+def calculate_financial_health_score(info):
+    """재무 건전성 점수 계산 (0-100) — HEALTH_SCORE_RULES 구간표로 info 한 건을 채점"""
+    scores = score_health_records([info]).iloc[0]
+    details = {c: int(scores[c]) for c in ["profitability", "stability", "valuation", "growth"]}
+    return int(scores["total"]), details
+
+
+# 재무 건전성 점수 구간표: (카테고리, info 키, 비교, 양수만 평가, [(경계, 점수), ...])
+# 구간은 점수가 높은 쪽부터 순서대로 판정해 처음 만족하는 구간의 점수를 준다
+HEALTH_SCORE_RULES = [
+    ("profitability", "returnOnEquity", ">", False, [(0.20, 8), (0.15, 7), (0.10, 5), (0.05, 3), (0, 1)]),
+    ("profitability", "returnOnAssets", ">", False, [(0.10, 7), (0.07, 6), (0.05, 4), (0.02, 2), (0, 1)]),
+    ("profitability", "profitMargins", ">", False, [(0.25, 10), (0.15, 8), (0.10, 6), (0.05, 4), (0, 2)]),
+    ("stability", "currentRatio", ">=", False, [(2.0, 13), (1.5, 10), (1.0, 7), (0.5, 3)]),
+    ("stability", "debtToEquity", "<", False, [(30, 12), (50, 10), (100, 7), (150, 4), (200, 2)]),
+    ("valuation", "trailingPE", "<", True, [(10, 10), (15, 8), (22, 6), (30, 4), (50, 2)]),
+    ("valuation", "priceToBook", "<", True, [(1.0, 8), (2.0, 6), (4.0, 4), (7.0, 2)]),
+    ("valuation", "pegRatio", "<", True, [(1.0, 7), (1.5, 5), (2.0, 3), (3.0, 1)]),
+    ("growth", "revenueGrowth", ">", False, [(0.30, 13), (0.20, 10), (0.10, 7), (0.05, 5), (0, 3)]),
+    ("growth", "earningsGrowth", ">", False, [(0.30, 12), (0.20, 10), (0.10, 7), (0.05, 5), (0, 3)]),
+]
+HEALTH_SCORE_FIELDS = list(dict.fromkeys(rule[1] for rule in HEALTH_SCORE_RULES))
+_HEALTH_COMPARE = {">": np.greater, ">=": np.greater_equal, "<": np.less}
+
+
+def score_health_frame(df):
+    """여러 종목의 info 필드 DataFrame을 한 번에 채점 (카테고리별 25점, 합계 100점 상한)"""
+    scores = {c: np.zeros(len(df), dtype=np.int64) for c in ["profitability", "stability", "valuation", "growth"]}
+    for category, field, op, positive_only, bands in HEALTH_SCORE_RULES:
+        if field not in df.columns:
+            continue
+        v = pd.to_numeric(df[field], errors="coerce").to_numpy(dtype=float)
+        conds = [_HEALTH_COMPARE[op](v, edge) for edge, _ in bands]
+        if positive_only:
+            conds = [c & (v > 0) for c in conds]
+        scores[category] += np.select(conds, [pts for _, pts in bands], default=0)
+    for category in scores:
+        scores[category] = np.minimum(scores[category], 25)
+    scores["total"] = np.minimum(sum(scores.values()), 100)
+    return pd.DataFrame(scores, index=df.index)
+
+
+def score_health_records(infos):
+    """info dict 목록(또는 {티커: info}) → 종목별 점수 DataFrame"""
+    if isinstance(infos, dict):
+        index, records = list(infos), list(infos.values())
+    else:
+        index, records = None, list(infos)
+    df = pd.DataFrame([{f: rec.get(f) for f in HEALTH_SCORE_FIELDS} for rec in records], index=index)
+    return score_health_frame(df)
+
+
+def _period_info_frame(items, close, growth_lag):
+    """기간 × 재무 항목 → info 필드 형식 DataFrame (과거 시점 건전성 채점 입력)"""
+    def ratio(num, den):
+        return num / den.where(den != 0)
+
+    def growth(s):
+        prev = s.shift(growth_lag)
+        return (s - prev) / prev.abs().where(prev != 0)
+
+    f = pd.DataFrame(index=items.index)
+    f["returnOnEquity"] = ratio(items["net_income"], items["total_equity"])
+    f["returnOnAssets"] = ratio(items["net_income"], items["total_assets"])
+    f["profitMargins"] = ratio(items["net_income"], items["revenue"])
+    f["currentRatio"] = ratio(items["current_assets"], items["current_liabilities"])
+    f["debtToEquity"] = ratio(items["total_debt"], items["total_equity"]) * 100
+    f["trailingPE"] = ratio(close, ratio(items["net_income"], items["shares"]))
+    f["priceToBook"] = ratio(close, ratio(items["total_equity"], items["shares"]))
+    f["revenueGrowth"] = growth(items["revenue"])
+    f["earningsGrowth"] = growth(items["net_income"])
+    f["pegRatio"] = ratio(f["trailingPE"], f["earningsGrowth"] * 100).where(f["earningsGrowth"] > 0)
+    return f
+
+
+# 카테고리별 채점 입력 필드 — 입력이 없는 카테고리는 추이 점수에서 평가 제외 후 환산
+_HEALTH_CATEGORY_FIELDS = {}
+for _cat, _field, *_ in HEALTH_SCORE_RULES:
+    _HEALTH_CATEGORY_FIELDS.setdefault(_cat, []).append(_field)
+
+
+@arrow_cache(ttl=3600)
+def build_health_history(ticker):
+    """과거 연간/분기(TTM) 재무제표 + 기간말 주가로 재구성한 재무 건전성 점수 추이"""
+    financials = fetch_stock_financials(ticker)
+    loaded = load_parallel({
+        "info": lambda: fetch_stock_info(ticker),
+        "hist": lambda: fetch_stock_history(ticker, period="5y"),
+        "statements": lambda: financials.prefetch(["balance_sheet", "income_stmt", "q_balance_sheet", "q_income_stmt"]),
+    })
+    info, hist = loaded["info"], loaded["hist"]
+
+    close = pd.Series(dtype=float)
+    same_currency = info.get("financialCurrency", info.get("currency")) == info.get("currency")
+    if not hist.empty and same_currency:
+        close = hist["Close"].copy()
+        if close.index.tz is not None:
+            close.index = close.index.tz_localize(None)
+
+    frames = []
+    annual = statement_items(financials.get("balance_sheet"), financials.get("income_stmt"))
+    if not annual.empty:
+        frames.append(("연간", annual, 1))
+    q = statement_items(financials.get("q_balance_sheet"), financials.get("q_income_stmt"))
+    if not q.empty:
+        q[_FLOW_ITEMS] = ttm_flows(q)
+        frames.append(("TTM", q, 4))
+
+    parts = []
+    for basis, items, lag in frames:
+        period_close = close.asof(items.index) if not close.empty else pd.Series(np.nan, index=items.index)
+        period_info = _period_info_frame(items, pd.Series(period_close.to_numpy(), index=items.index), lag)
+        # 입력이 없는 범주(예: 성장률 계산에 필요한 과거 기간이 부족한 TTM)는 0점이 아니라 평가 제외로 보고,
+        # 남은 범주 점수를 100점 만점으로 환산해 연간 점수와 같은 축에 그린다 (최소 3개 범주)
+        has_input = pd.concat([period_info[fields].notna().any(axis=1)
+                               for fields in _HEALTH_CATEGORY_FIELDS.values()], axis=1)
+        n_categories = has_input.sum(axis=1)
+        scorable = n_categories >= 3
+        scores = score_health_frame(period_info[scorable])
+        n_scored = n_categories[scorable].to_numpy()
+        scores["total"] = np.minimum(np.round(scores["total"] * len(_HEALTH_CATEGORY_FIELDS) / n_scored), 100).astype(int)
+        scores["평가 범주"] = n_scored
+        scores["기준"] = basis
+        parts.append(scores)
+
+    if not parts:
+        return pd.DataFrame()
+    result = pd.concat(parts).sort_index()
+    result["등급"] = [get_letter_grade(s)[0] for s in result["total"]]
+    result.index.name = "기간"
+    return result
 
 
 def get_letter_grade(score):
@@ -3326,6 +5307,20 @@ def get_letter_grade(score):
         return "F", "#f04452"
 
 
+# 리포트 HTML 템플릿 — 스타일은 전역 CSS의 .fr-* 클래스 사용
+_REPORT_PAGE = Template(
+    '<div class="fr-report">$sections'
+    '<div class="fr-footer">본 리포트는 공개된 재무 데이터에 기반한 정량 분석이며, 투자 권유가 아닙니다. '
+    '투자 결정 시 전문가 상담을 권장합니다.</div></div>'
+)
+_REPORT_OPINION = Template(
+    '<div class="fr-card fr-$accent"><h3>1. 종합 의견</h3>'
+    '<span class="fr-badge">$opinion</span><p class="fr-summary">$summary</p></div>'
+)
+_REPORT_SECTION = Template('<div class="fr-card fr-$accent"><h3>$title</h3><div class="fr-body">$body</div></div>')
+_REPORT_SUBSECTION = Template('<h4>$title</h4>$body')
+
+
 def generate_fundamental_report(info, score_details, news_sentiments, hist):
     """규칙 기반 AI 펀더멘탈 리포트 생성"""
     total_score = score_details["profitability"] + score_details["stability"] + score_details["valuation"] + score_details["growth"]
@@ -3335,7 +5330,7 @@ def generate_fundamental_report(info, score_details, news_sentiments, hist):
     # ─── 1. 종합 의견 ───
     if total_score >= 70:
         overall_opinion = "강세 (Bullish)"
-        opinion_color = "#00b386"
+        opinion_accent = "good"
         opinion_summary = (
             f"{name}은(는) 재무 건전성 점수 {total_score}점으로 양호한 투자 매력도를 보이고 있습니다. "
             f"수익성, 안정성, 밸류에이션, 성장성 측면에서 전반적으로 긍정적인 요소가 우세하며, "
@@ -3343,7 +5338,7 @@ def generate_fundamental_report(info, score_details, news_sentiments, hist):
         )
     elif total_score >= 45:
         overall_opinion = "중립 (Neutral)"
-        opinion_color = "#ff9f43"
+        opinion_accent = "warn"
         opinion_summary = (
             f"{name}은(는) 재무 건전성 점수 {total_score}점으로 보통 수준입니다. "
             f"일부 재무 지표에서 강점을 보이나, 개선이 필요한 영역도 존재합니다. "
@@ -3351,7 +5346,7 @@ def generate_fundamental_report(info, score_details, news_sentiments, hist):
         )
     else:
         overall_opinion = "약세 (Bearish)"
-        opinion_color = "#f04452"
+        opinion_accent = "bad"
         opinion_summary = (
             f"{name}은(는) 재무 건전성 점수 {total_score}점으로 주의가 필요합니다. "
             f"주요 재무 지표에서 취약점이 확인되며, 투자 시 충분한 리스크 분석이 선행되어야 합니다."
@@ -3376,76 +5371,38 @@ def generate_fundamental_report(info, score_details, news_sentiments, hist):
     # ─── 7. 투자 전략 제안 ───
     strategy_analysis = _generate_strategy(info, total_score, score_details, news_sentiments)
 
-    report_html = f"""
-    <link href="https://fonts.googleapis.com/css2?family=Pretendard:wght@300;400;500;600;700;800&display=swap" rel="stylesheet">
-    <div style="font-family: 'Pretendard', -apple-system, BlinkMacSystemFont, system-ui, sans-serif; background:#f4f5f7; padding:4px 0;">
-
-        <!-- 종합 의견 -->
-        <div style="background:#ffffff;border-radius:16px;padding:24px 28px;margin:16px 0;border-left:5px solid {opinion_color};box-shadow:0 1px 4px rgba(0,0,0,0.04);">
-            <h3 style="margin:0 0 8px 0;font-size:1.05rem;font-weight:700;color:#191f28;">1. 종합 의견</h3>
-            <div style="display:inline-block;background:{opinion_color}18;color:{opinion_color};padding:5px 16px;border-radius:20px;font-weight:700;font-size:0.88rem;margin-bottom:12px;">
-                {overall_opinion}
-            </div>
-            <p style="color:#4e5968;line-height:1.8;font-size:0.88rem;margin-top:12px;">{opinion_summary}</p>
-        </div>
-
-        <!-- 재무 건전성 분석 -->
-        <div style="background:#ffffff;border-radius:16px;padding:24px 28px;margin:16px 0;border-left:5px solid #3182f6;box-shadow:0 1px 4px rgba(0,0,0,0.04);">
-            <h3 style="margin:0 0 14px 0;font-size:1.05rem;font-weight:700;color:#191f28;">2. 재무 건전성 분석</h3>
-            <div style="color:#4e5968;line-height:1.9;font-size:0.86rem;">
-                <h4 style="color:#191f28;font-size:0.92rem;font-weight:600;margin:10px 0 6px 0;">수익성 ({score_details["profitability"]}/25점)</h4>
-                {profitability_analysis}
-                <h4 style="color:#191f28;font-size:0.92rem;font-weight:600;margin:16px 0 6px 0;">안정성 ({score_details["stability"]}/25점)</h4>
-                {stability_analysis}
-            </div>
-        </div>
-
-        <!-- 밸류에이션 분석 -->
-        <div style="background:#ffffff;border-radius:16px;padding:24px 28px;margin:16px 0;border-left:5px solid #ff9f43;box-shadow:0 1px 4px rgba(0,0,0,0.04);">
-            <h3 style="margin:0 0 14px 0;font-size:1.05rem;font-weight:700;color:#191f28;">3. 밸류에이션 분석 ({score_details["valuation"]}/25점)</h3>
-            <div style="color:#4e5968;line-height:1.9;font-size:0.86rem;">
-                {valuation_analysis}
-            </div>
-        </div>
-
-        <!-- 성장성 분석 -->
-        <div style="background:#ffffff;border-radius:16px;padding:24px 28px;margin:16px 0;border-left:5px solid #00b386;box-shadow:0 1px 4px rgba(0,0,0,0.04);">
-            <h3 style="margin:0 0 14px 0;font-size:1.05rem;font-weight:700;color:#191f28;">4. 성장성 분석 ({score_details["growth"]}/25점)</h3>
-            <div style="color:#4e5968;line-height:1.9;font-size:0.86rem;">
-                {growth_analysis}
-            </div>
-        </div>
+    sections = [
+        _REPORT_OPINION.substitute(accent=opinion_accent, opinion=overall_opinion, summary=opinion_summary),
+        _REPORT_SECTION.substitute(
+            accent="blue", title="2. 재무 건전성 분석",
+            body=_REPORT_SUBSECTION.substitute(title=f"수익성 ({score_details['profitability']}/25점)", body=profitability_analysis)
+            + _REPORT_SUBSECTION.substitute(title=f"안정성 ({score_details['stability']}/25점)", body=stability_analysis),
+        ),
+        _REPORT_SECTION.substitute(accent="warn", title=f"3. 밸류에이션 분석 ({score_details['valuation']}/25점)", body=valuation_analysis),
+        _REPORT_SECTION.substitute(accent="good", title=f"4. 성장성 분석 ({score_details['growth']}/25점)", body=growth_analysis),
+        _REPORT_SECTION.substitute(accent="purple", title="5. 최근 이슈 영향 분석", body=news_impact_analysis),
+        _REPORT_SECTION.substitute(accent="bad", title="6. 리스크 요인", body=risk_analysis),
+        _REPORT_SECTION.substitute(accent="dark", title="7. 투자 전략 제안", body=strategy_analysis),
+    ]
+    report_html = _REPORT_PAGE.substitute(sections="".join(sections))
+    return report_html
 
-        <!-- 최근 이슈 영향 분석 -->
-        <div style="background:#ffffff;border-radius:16px;padding:24px 28px;margin:16px 0;border-left:5px solid #6c5ce7;box-shadow:0 1px 4px rgba(0,0,0,0.04);">
-            <h3 style="margin:0 0 14px 0;font-size:1.05rem;font-weight:700;color:#191f28;">5. 최근 이슈 영향 분석</h3>
-            <div style="color:#4e5968;line-height:1.9;font-size:0.86rem;">
-                {news_impact_analysis}
-            </div>
-        </div>
 
-        <!-- 리스크 요인 -->
-        <div style="background:#ffffff;border-radius:16px;padding:24px 28px;margin:16px 0;border-left:5px solid #f04452;box-shadow:0 1px 4px rgba(0,0,0,0.04);">
-            <h3 style="margin:0 0 14px 0;font-size:1.05rem;font-weight:700;color:#191f28;">6. 리스크 요인</h3>
-            <div style="color:#4e5968;line-height:1.9;font-size:0.86rem;">
-                {risk_analysis}
-            </div>
-        </div>
+def _fingerprint(obj):
+    """dict/list를 안정적인 해시 문자열로 (메모이제이션 키용)"""
+    return hashlib.sha1(json.dumps(obj, sort_keys=True, default=str).encode("utf-8")).hexdigest()
 
-        <!-- 투자 전략 제안 -->
-        <div style="background:#ffffff;border-radius:16px;padding:24px 28px;margin:16px 0;border-left:5px solid #191f28;box-shadow:0 1px 4px rgba(0,0,0,0.04);">
-            <h3 style="margin:0 0 14px 0;font-size:1.05rem;font-weight:700;color:#191f28;">7. 투자 전략 제안</h3>
-            <div style="color:#4e5968;line-height:1.9;font-size:0.86rem;">
-                {strategy_analysis}
-            </div>
-        </div>
 
-        <div style="text-align:center;padding:12px;color:#b0b8c1;font-size:0.72rem;margin-top:8px;">
-            본 리포트는 공개된 재무 데이터에 기반한 정량 분석이며, 투자 권유가 아닙니다. 투자 결정 시 전문가 상담을 권장합니다.
-        </div>
-    </div>
-    """
-    return report_html
+def render_fundamental_report(ticker, info, score_details, news_sentiments, hist, period):
+    """generate_fundamental_report 메모이제이션 — 같은 (티커, info, 뉴스, 기간)이면 재생성 생략"""
+    hist_end = None
+    if hist is not None and not hist.empty and "Close" in hist.columns:
+        hist_end = (str(hist.index[-1]), float(hist["Close"].iloc[-1]))
+    key = ("generate_fundamental_report", ticker, _fingerprint(info), _fingerprint(news_sentiments), period, hist_end)
+    return _get_arrow_cache().get_or_compute(
+        "generate_fundamental_report", key, 600,
+        lambda: generate_fundamental_report(info, score_details, news_sentiments, hist)
+    )
 
 
 def _analyze_profitability(info, score):
@@ -3725,12 +5682,12 @@ def _analyze_growth(info, score, hist):
             price_return = ((end_price - start_price) / start_price) * 100
             if price_return > 0:
                 parts.append(
-                    f"<p>분석 기간 주가 수익률은 <b style='color:#00b386;'>{price_return:+.1f}%</b>로 "
+                    f"<p>분석 기간 주가 수익률은 <b class='fr-up'>{price_return:+.1f}%</b>로 "
                     f"시장에서 성장 기대감이 반영되고 있습니다.</p>"
                 )
             else:
                 parts.append(
-                    f"<p>분석 기간 주가 수익률은 <b style='color:#f04452;'>{price_return:+.1f}%</b>로 "
+                    f"<p>분석 기간 주가 수익률은 <b class='fr-down'>{price_return:+.1f}%</b>로 "
                     f"시장의 성장 우려가 반영된 상태입니다.</p>"
                 )
         except Exception:
@@ -3755,9 +5712,9 @@ def _analyze_news_impact(news_sentiments):
 
     parts.append(
         f"<p>최근 뉴스 {total}건 분석 결과: "
-        f"<span style='color:#00b386;font-weight:600;'>긍정 {pos_count}건</span>, "
-        f"<span style='color:#f04452;font-weight:600;'>부정 {neg_count}건</span>, "
-        f"<span style='color:#8b95a1;font-weight:600;'>중립 {neutral_count}건</span></p>"
+        f"<span class='fr-up'>긍정 {pos_count}건</span>, "
+        f"<span class='fr-down'>부정 {neg_count}건</span>, "
+        f"<span class='fr-flat'>중립 {neutral_count}건</span></p>"
     )
 
     if pos_count > neg_count:
@@ -3837,7 +5794,7 @@ def _analyze_risks(info, score_details):
     if not risks:
         return "<p>현재 데이터 기반으로 특별한 고위험 요인은 식별되지 않았습니다. 다만, 시장 전반의 거시경제 리스크(금리, 인플레이션, 지정학적 불확실성)에 대한 모니터링은 지속해야 합니다.</p>"
 
-    return "<ul style='padding-left:20px;'>" + "\n".join(risks) + "</ul>"
+    return "<ul class='fr-list'>" + "\n".join(risks) + "</ul>"
 
 
 def _generate_strategy(info, total_score, score_details, news_sentiments):
@@ -3859,7 +5816,7 @@ def _generate_strategy(info, total_score, score_details, news_sentiments):
         strategy = "적극 매수 (Strong Buy)"
         strategy_color = "#00b386"
         parts.append(
-            f"<p><span style='background:#e8fff3;color:#00b386;padding:4px 12px;border-radius:12px;font-weight:700;'>"
+            f"<p><span class='fr-pill fr-pill-buy'>"
             f"{strategy}</span></p>"
             f"<p>{name}은(는) 우수한 재무 건전성(점수 {total_score}/100)과 긍정적 뉴스 흐름을 보이고 있어 "
             f"적극적인 포지션 구축을 권장합니다.</p>"
@@ -3868,7 +5825,7 @@ def _generate_strategy(info, total_score, score_details, news_sentiments):
         strategy = "분할 매수 (Accumulate)"
         strategy_color = "#3182f6"
         parts.append(
-            f"<p><span style='background:#e8f3ff;color:#3182f6;padding:4px 12px;border-radius:12px;font-weight:700;'>"
+            f"<p><span class='fr-pill fr-pill-accumulate'>"
             f"{strategy}</span></p>"
             f"<p>재무 건전성이 양호한 수준(점수 {total_score}/100)으로, "
             f"분할 매수를 통한 점진적 포지션 확대가 적합합니다.</p>"
@@ -3877,7 +5834,7 @@ def _generate_strategy(info, total_score, score_details, news_sentiments):
         strategy = "관망 / 보유 (Hold)"
         strategy_color = "#ff9f43"
         parts.append(
-            f"<p><span style='background:#fff8e8;color:#e09200;padding:4px 12px;border-radius:12px;font-weight:700;'>"
+            f"<p><span class='fr-pill fr-pill-hold'>"
             f"{strategy}</span></p>"
             f"<p>재무 건전성 점수 {total_score}/100으로 보통 수준입니다. "
             f"기존 보유자는 유지하되, 신규 진입은 추가 확인 후 결정하는 것이 바람직합니다.</p>"
@@ -3886,7 +5843,7 @@ def _generate_strategy(info, total_score, score_details, news_sentiments):
         strategy = "비중 축소 (Reduce)"
         strategy_color = "#f04452"
         parts.append(
-            f"<p><span style='background:#fff0f0;color:#f04452;padding:4px 12px;border-radius:12px;font-weight:700;'>"
+            f"<p><span class='fr-pill fr-pill-sell'>"
             f"{strategy}</span></p>"
             f"<p>재무 건전성이 취약한 수준(점수 {total_score}/100)입니다. "
             f"기존 보유자는 비중 축소를 검토하고, 신규 진입은 신중하게 접근해야 합니다.</p>"
@@ -3895,7 +5852,7 @@ def _generate_strategy(info, total_score, score_details, news_sentiments):
         strategy = "투자 회피 (Avoid)"
         strategy_color = "#f04452"
         parts.append(
-            f"<p><span style='background:#fff0f0;color:#f04452;padding:4px 12px;border-radius:12px;font-weight:700;'>"
+            f"<p><span class='fr-pill fr-pill-sell'>"
             f"{strategy}</span></p>"
             f"<p>재무 건전성 점수 {total_score}/100으로 심각한 수준입니다. "
             f"펀더멘탈 개선 신호가 확인될 때까지 투자를 자제하는 것이 권장됩니다.</p>"
@@ -3914,7 +5871,7 @@ def _generate_strategy(info, total_score, score_details, news_sentiments):
             parts.append("<p>52주 고점 부근으로 추격 매수보다는 조정 시 진입을 권장합니다.</p>")
 
     parts.append(
-        "<p style='margin-top:12px;padding:12px 16px;background:#f4f5f7;border-radius:10px;font-size:0.82rem;color:#4e5968;'>"
+        "<p class='fr-note'>"
         "<b>참고:</b> 본 전략은 정량적 재무 분석에 기반한 것이며, 실제 투자 시에는 거시경제 환경, "
         "산업 동향, 기업 고유 이벤트 등을 종합적으로 고려해야 합니다. "
         "투자의 최종 결정과 책임은 투자자 본인에게 있습니다.</p>"
@@ -3978,9 +5935,12 @@ def render_fundamental_analysis():
 
     # ─── 데이터 로드 ───
     with st.spinner(f"📡 {current_ticker} 펀더멘탈 데이터 수집중..."):
-        info = fetch_stock_info(current_ticker)
-        hist = fetch_stock_history(current_ticker, period=fa_period)
-        news_data = fetch_news_data(current_ticker)
+        loaded = load_parallel({
+            "info": lambda: fetch_stock_info(current_ticker),
+            "hist": lambda: fetch_stock_history(current_ticker, period=fa_period),
+            "news": lambda: fetch_news_data(current_ticker),
+        })
+        info, hist, news_data = loaded["info"], loaded["hist"], loaded["news"]
 
     if not info and hist.empty:
         st.error(f"'{current_ticker}' 데이터를 찾을 수 없습니다. 티커를 확인하세요.")
@@ -4111,6 +6071,36 @@ def render_fundamental_analysis():
         )
         st.plotly_chart(fig_bar, use_container_width=True)
 
+    if st.toggle("과거 재무 건전성 점수 추이 보기", key="fa_health_history"):
+        with st.spinner("과거 재무제표로 점수 재구성중..."):
+            health_hist = build_health_history(current_ticker)
+        if not health_hist.empty:
+            fig_hh = go.Figure()
+            basis_style = {"연간": ("#3182f6", "circle"), "TTM": ("#6c5ce7", "diamond")}
+            for basis, (color, symbol) in basis_style.items():
+                part = health_hist[health_hist["기준"] == basis]
+                if part.empty:
+                    continue
+                full = part["평가 범주"] == len(_HEALTH_CATEGORY_FIELDS)
+                fig_hh.add_trace(go.Scatter(
+                    x=part.index, y=part["total"], name=f"{basis} 기준",
+                    mode="lines+markers", line=dict(color=color, width=2.5),
+                    # 일부 범주만으로 환산한 점은 속이 빈 마커
+                    marker=dict(size=8, symbol=[symbol if f else f"{symbol}-open" for f in full],
+                                line=dict(width=1.5, color=["#ffffff" if f else color for f in full])),
+                    customdata=np.column_stack([part["등급"], part["평가 범주"]]),
+                    hovertemplate=f"%{{x|%Y-%m-%d}} · %{{y}}점 (%{{customdata[0]}}) · "
+                                  f"%{{customdata[1]}}/{len(_HEALTH_CATEGORY_FIELDS)}개 범주<extra></extra>",
+                ))
+            layout = _chart_layout("재무 건전성 점수 추이", 320)
+            layout["yaxis"]["range"] = [0, 100]
+            fig_hh.update_layout(**layout)
+            st.plotly_chart(fig_hh, use_container_width=True)
+            st.caption("과거 기간은 재무제표와 기간말 주가로 산출한 값이며, 현재 점수(Yahoo 제공 지표 기준)와 입력 정의가 다를 수 있습니다. "
+                       "속이 빈 마커는 입력이 없는 범주(주로 성장성)를 빼고 나머지 범주 점수를 100점 만점으로 환산한 기간입니다.")
+        else:
+            st.info("과거 재무제표가 부족해 점수 추이를 만들 수 없습니다.")
+
     st.divider()
 
     # ══════════════════════════════════════════════
@@ -4120,36 +6110,11 @@ def render_fundamental_analysis():
 
     news_sentiments = []
 
-    if news_data:
-        for item in news_data[:10]:
-            # yfinance news structure varies by version
-            title = item.get("title", "")
-            publisher = item.get("publisher", "")
-            link = item.get("link", "")
-
-            # Handle different date formats
-            pub_date = ""
-            if "providerPublishTime" in item:
-                try:
-                    pub_date = datetime.fromtimestamp(item["providerPublishTime"]).strftime("%Y-%m-%d %H:%M")
-                except Exception:
-                    pub_date = ""
-            elif "publishedDate" in item:
-                pub_date = str(item["publishedDate"])[:16]
-
-            # Newer yfinance versions may nest data differently
-            if not title and "content" in item:
-                content = item["content"]
-                if isinstance(content, dict):
-                    title = content.get("title", "")
-                    publisher = content.get("provider", {}).get("displayName", "") if isinstance(content.get("provider"), dict) else ""
-                    pub_date = str(content.get("pubDate", ""))[:16]
-                    link = content.get("canonicalUrl", {}).get("url", "") if isinstance(content.get("canonicalUrl"), dict) else ""
-
-            if not title:
-                continue
-
-            sentiment, strength = analyze_news_sentiment({"title": title, "summary": item.get("summary", "")})
+    articles = ingest_news(current_ticker, news_data[:10]) if news_data else []
+
+    if articles:
+        for record, (sentiment, strength) in articles:
+            title, publisher, link, pub_date = record.title, record.publisher, record.link, record.published_label
             news_sentiments.append((sentiment, strength))
 
             if sentiment == "positive":
@@ -4191,10 +6156,433 @@ def render_fundamental_analysis():
     # ══════════════════════════════════════════════
     st.markdown('<div class="section-header">AI 펀더멘탈 리포트</div>', unsafe_allow_html=True)
 
-    report_html = generate_fundamental_report(info, score_details, news_sentiments, hist)
+    report_html = render_fundamental_report(current_ticker, info, score_details, news_sentiments, hist, fa_period)
     st.html(report_html)
 
 
+# ══════════════════════════════════════════════
+#  PAGE: PORTFOLIO (포트폴리오)
+# ══════════════════════════════════════════════
+
+PORTFOLIO_PATH = os.path.join(LOCAL_DATA_DIR, "portfolio.json")
+PORTFOLIO_COLUMNS = ["티커", "수량", "평균단가"]
+# 시세 통화 → (통화, 배율): 보조 단위로 호가되는 시장 (런던 펜스, 텔아비브 아고롯, 요하네스버그 센트)
+MINOR_CURRENCY_UNITS = {"GBp": ("GBP", 0.01), "GBX": ("GBP", 0.01), "ILA": ("ILS", 0.01), "ZAc": ("ZAR", 0.01)}
+# info에 통화가 없을 때 거래소 접미사로 추정
+SUFFIX_CURRENCIES = {
+    ".KS": "KRW", ".KQ": "KRW", ".T": "JPY", ".L": "GBp", ".HK": "HKD", ".DE": "EUR", ".PA": "EUR",
+    ".AS": "EUR", ".MI": "EUR", ".SW": "CHF", ".TO": "CAD", ".AX": "AUD", ".SS": "CNY", ".SZ": "CNY",
+    ".TW": "TWD", ".SI": "SGD",
+}
+
+
+def normalize_positions(df):
+    """편집된 보유 종목표 정리 — 티커 변환 · 빈 행 제거 · 같은 티커는 수량 합산(평균단가 가중평균)"""
+    df = df.reindex(columns=PORTFOLIO_COLUMNS).copy()
+    df["티커"] = df["티커"].fillna("").astype(str).map(normalize_ticker_input)
+    df["수량"] = pd.to_numeric(df["수량"], errors="coerce")
+    df["평균단가"] = pd.to_numeric(df["평균단가"], errors="coerce").fillna(0.0)
+    df = df[(df["티커"] != "") & (df["수량"] > 0)]
+    if df.empty:
+        return pd.DataFrame(columns=PORTFOLIO_COLUMNS)
+    df = df.assign(원가=df["수량"] * df["평균단가"]).groupby("티커", sort=False, as_index=False)[["수량", "원가"]].sum()
+    df["평균단가"] = df["원가"] / df["수량"]
+    return df[PORTFOLIO_COLUMNS].reset_index(drop=True)
+
+
+def load_positions():
+    """로컬에 저장된 보유 종목 (없으면 빈 표)"""
+    try:
+        with open(PORTFOLIO_PATH, encoding="utf-8") as f:
+            rows = json.load(f)
+    except (OSError, ValueError):
+        rows = []
+    return pd.DataFrame(rows, columns=PORTFOLIO_COLUMNS)
+
+
+def save_positions(df):
+    """보유 종목을 로컬 JSON으로 저장 (임시 파일 → 교체로 원자적 기록)"""
+    os.makedirs(LOCAL_DATA_DIR, exist_ok=True)
+    tmp_path = PORTFOLIO_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(df[PORTFOLIO_COLUMNS].to_dict("records"), f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, PORTFOLIO_PATH)
+
+
+def position_currency(ticker, info=None):
+    """종목의 시세 통화 — yfinance info의 currency 우선, 없으면 거래소 접미사로 추정 (기본 USD)"""
+    currency = (info or {}).get("currency")
+    if isinstance(currency, str) and currency:
+        return currency if currency in MINOR_CURRENCY_UNITS else currency.upper()
+    suffix = ticker[ticker.rfind("."):].upper() if "." in ticker else ""
+    return SUFFIX_CURRENCIES.get(suffix, "USD")
+
+
+def fx_ticker(currency):
+    """통화 → yfinance 환율 티커 (1달러당 해당 통화, 예: JPY=X). 달러는 None"""
+    currency = MINOR_CURRENCY_UNITS.get(currency, (currency, 1.0))[0]
+    return None if currency == "USD" else f"{currency}=X"
+
+
+def portfolio_analytics(positions, prices, fx=None, base="USD", currencies=None, z=1.645):
+    """보유 종목 × 종가 패널 → {"positions": 종목별 평가표, "summary": 1행 요약, "history": 평가액·낙폭}
+
+    모든 지표를 (기간 × 종목) 배열 연산으로 계산: 통화 환산, 손익, 비중, 일간 수익률 공분산 기반
+    연변동성 · 1일 VaR(정규 근사, 종목별 기여도), 현재 수량을 기간 내내 보유했을 때의 최대낙폭.
+
+    fx는 {통화: 1달러당 해당 통화 환율 시계열}, currencies는 종목별 시세 통화(생략 시 접미사로 추정).
+    환율이 없는 통화의 종목은 평가금액을 NaN으로 두어 다른 통화와 섞지 않는다.
+    매입 시점 환율은 알 수 없으므로 손익은 종목 통화 기준(손익(현지), 손익률)으로만 계산하고,
+    평가금액만 기준 통화로 환산한다. 요약의 손익은 현지 통화 손익을 현재 환율로 환산한 값이라
+    환차손익은 포함하지 않는다.
+    """
+    fx = fx or {}
+    tickers = list(positions["티커"])
+    shares = positions["수량"].to_numpy(dtype=float)
+    avg_cost = positions["평균단가"].to_numpy(dtype=float)
+    panel = prices.reindex(columns=tickers).ffill()
+    if currencies is None:
+        currencies = [position_currency(t) for t in tickers]
+
+    # 통화 환산 계수 = 보조 단위 배율 × (기준 통화/달러) ÷ (종목 통화/달러)
+    def usd_rate(currency):
+        if currency == "USD":
+            return np.ones(len(panel))
+        series = fx.get(currency)
+        if series is None or series.dropna().empty:
+            return np.full(len(panel), np.nan)
+        return series.reindex(panel.index).ffill().bfill().to_numpy(dtype=float)
+
+    units = [MINOR_CURRENCY_UNITS.get(c, (c, 1.0)) for c in currencies]
+    base_rate = usd_rate(base)[:, None]
+    factor = np.column_stack([scale / usd_rate(c) for c, scale in units]) * base_rate if tickers else np.ones(panel.shape)
+    values = panel.to_numpy(dtype=float) * factor
+
+    last_price = values[-1] if len(values) else np.full(len(tickers), np.nan)
+    last_factor = factor[-1] if len(values) else np.full(len(tickers), np.nan)
+    local_price = panel.iloc[-1].to_numpy(dtype=float) if len(panel) else np.full(len(tickers), np.nan)
+    market_value = shares * last_price
+    local_pnl = shares * (local_price - avg_cost)
+    local_cost = shares * avg_cost
+    total = np.nansum(market_value)
+    weights = np.nan_to_num(market_value / total) if total > 0 else np.zeros(len(tickers))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rets = values[1:] / values[:-1] - 1
+    cov = pd.DataFrame(rets).cov(min_periods=20).fillna(0.0).to_numpy()
+    marginal = cov @ weights
+    sigma = float(np.sqrt(max(weights @ marginal, 0.0)))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var_contrib = z * weights * marginal / sigma * total if sigma > 0 else np.zeros(len(tickers))
+
+    history = pd.Series(np.nansum(values * shares, axis=1), index=panel.index)
+    history = history[history > 0]
+    drawdown = history / history.cummax() - 1
+
+    table = pd.DataFrame({
+        "티커": tickers,
+        "통화": list(currencies),
+        "수량": shares,
+        "현재가": local_price,
+        "평가금액": market_value,
+        "손익(현지)": np.where(avg_cost > 0, local_pnl, np.nan),
+        "손익률(%)": np.where(avg_cost > 0, (local_price / np.where(avg_cost > 0, avg_cost, 1) - 1) * 100, np.nan),
+        "비중(%)": weights * 100,
+        "연변동성(%)": np.sqrt(np.diag(cov) * 252) * 100,
+        "VaR 기여": var_contrib,
+    })
+    priced = np.isfinite(market_value) & (avg_cost > 0)
+    total_pnl = np.nansum(np.where(priced, local_pnl * last_factor, 0.0))
+    total_cost = np.nansum(np.where(priced, local_cost * last_factor, 0.0))
+    summary = pd.DataFrame([{
+        "평가금액": total,
+        "손익": total_pnl,
+        "수익률(%)": total_pnl / total_cost * 100 if total_cost > 0 else np.nan,
+        "연변동성(%)": sigma * np.sqrt(252) * 100,
+        "VaR95(1일)": z * sigma * total,
+        "최대낙폭(%)": drawdown.min() * 100 if not drawdown.empty else np.nan,
+        "가격 없음": int(np.isnan(last_price).sum()),
+    }])
+    return {"positions": table, "summary": summary,
+            "history": pd.DataFrame({"평가금액": history, "낙폭(%)": drawdown * 100})}
+
+
+@arrow_cache(ttl=300)
+def load_portfolio_analytics(positions_key, base="USD", period="1y"):
+    """(티커, 수량, 평균단가) 튜플 → portfolio_analytics 결과
+
+    종목별 시세 통화는 (캐시된) info에서 읽고, 종목 종가와 필요한 통화별 환율은 한 번의 일괄 조회로 가져온다.
+    """
+    positions = pd.DataFrame(list(positions_key), columns=PORTFOLIO_COLUMNS)
+    tickers = list(positions["티커"])
+    infos = load_parallel({t: (lambda t=t: fetch_stock_info(t)) for t in tickers})
+    currencies = [position_currency(t, infos[t]) for t in tickers]
+    fx_tickers = {}
+    for currency in currencies + [base]:
+        symbol = fx_ticker(currency)
+        if symbol is not None:
+            fx_tickers[MINOR_CURRENCY_UNITS.get(currency, (currency, 1.0))[0]] = symbol
+    prices = fetch_price_panel(tuple(tickers) + tuple(sorted(set(fx_tickers.values()))), period)
+    if prices.empty:
+        return {"positions": pd.DataFrame(), "summary": pd.DataFrame(), "history": pd.DataFrame()}
+    fx = {c: prices[s] for c, s in fx_tickers.items() if s in prices.columns}
+    return portfolio_analytics(positions, prices, fx, base, currencies)
+
+
+def render_portfolio():
+    st.markdown("""
+    <div class="page-header">
+        <div class="page-header-icon">💼</div>
+        <div>
+            <h1>Portfolio</h1>
+            <p>보유 종목 · 손익 · 비중 · 변동성 · VaR · 낙폭</p>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown("### 보유 종목")
+    edited = st.data_editor(
+        load_positions(), num_rows="dynamic", use_container_width=True, key="pf_editor",
+        column_config={
+            "티커": st.column_config.TextColumn("티커", help="티커 또는 종목명 (예: AAPL, 005930.KS, 삼성전자)"),
+            "수량": st.column_config.NumberColumn("수량", min_value=0.0, format="%.4f"),
+            "평균단가": st.column_config.NumberColumn("평균단가", min_value=0.0, help="종목 시세 통화 기준 (예: 한국 종목은 원, 도쿄 종목은 엔, 런던 종목은 펜스)"),
+        },
+    )
+    positions = normalize_positions(edited)
+    c1, c2, c3 = st.columns([1, 1, 2])
+    with c1:
+        if st.button("💾 저장", use_container_width=True):
+            save_positions(positions)
+            st.success(f"{len(positions)}개 종목을 저장했습니다.")
+    with c2:
+        base = st.radio("기준 통화", ["USD", "KRW"], horizontal=True, key="pf_base")
+    with c3:
+        period = st.radio("분석 기간", ["6mo", "1y", "2y", "5y"], index=1, horizontal=True, key="pf_period")
+
+    if positions.empty:
+        st.info("보유 종목을 입력하세요. 티커와 수량은 필수이고, 평균단가를 넣으면 손익이 계산됩니다.")
+        return
+
+    key = tuple(positions.itertuples(index=False, name=None))
+    with st.spinner("📡 가격 조회..."):
+        result = load_portfolio_analytics(key, base, period)
+    summary, table, history = result["summary"], result["positions"], result["history"]
+    if summary.empty:
+        st.error("가격 데이터를 불러올 수 없습니다.")
+        return
+
+    s = summary.iloc[0]
+    sym = "$" if base == "USD" else "₩"
+    c1, c2, c3, c4, c5 = st.columns(5)
+    with c1:
+        st.metric("평가금액", f"{sym}{s['평가금액']:,.0f}")
+    with c2:
+        st.metric("손익 (환차 제외)", f"{sym}{s['손익']:,.0f}",
+                  delta=f"{s['수익률(%)']:+.2f}%" if pd.notna(s["수익률(%)"]) else None)
+    with c3:
+        st.metric("연변동성", f"{s['연변동성(%)']:.1f}%")
+    with c4:
+        st.metric("VaR 95% (1일)", f"{sym}{s['VaR95(1일)']:,.0f}")
+    with c5:
+        st.metric("최대낙폭", f"{s['최대낙폭(%)']:.1f}%" if pd.notna(s["최대낙폭(%)"]) else "--")
+    if s["가격 없음"]:
+        missing = ", ".join(table.loc[table["현재가"].isna(), "티커"])
+        st.warning(f"가격 또는 환율을 찾을 수 없는 종목: {missing}")
+
+    st.dataframe(table.round(2), use_container_width=True, hide_index=True)
+
+    c1, c2 = st.columns([1, 2])
+    with c1:
+        held = table[table["평가금액"] > 0].sort_values("비중(%)")
+        fig = go.Figure(go.Bar(x=held["비중(%)"], y=held["티커"], orientation="h", marker_color="#3182f6"))
+        fig.update_layout(**_chart_layout("비중 (%)", max(300, 22 * len(held))))
+        st.plotly_chart(fig, use_container_width=True)
+    with c2:
+        if not history.empty:
+            st.plotly_chart(make_line(history["평가금액"], f"평가금액 추이 ({base}, 현재 수량 기준)"), use_container_width=True)
+            st.plotly_chart(make_line(history["낙폭(%)"], "낙폭 (%)", color="#f04452", height=250), use_container_width=True)
+
+
+# ══════════════════════════════════════════════
+#  PAGE: COMPARE (종목 비교)
+# ══════════════════════════════════════════════
+
+COMPARE_MAX_TICKERS = 20
+COMPARE_FFILL_LIMIT = 5  # 한쪽 시장만 쉬는 휴일 등, 직전 종가로 이어 쓸 최대 거래일 수
+
+
+def align_price_panel(prices, ffill_limit=COMPARE_FFILL_LIMIT):
+    """거래 캘린더가 다른 종목들을 하나의 날짜 축으로 정렬
+
+    과반 종목이 거래한 날만 공통 캘린더로 남겨(예: 주식과 섞인 코인의 주말 제거) 그 사이의
+    움직임은 다음 거래일 수익률에 반영하고, 한쪽 시장만 쉬는 날은 ffill_limit일까지 직전 종가로 채운다.
+    각 종목의 상장 전 구간은 NaN으로 둔다.
+    """
+    if prices.empty:
+        return prices
+    values = prices.to_numpy(dtype=float)
+    traded = np.isfinite(values).sum(axis=1)
+    calendar = traded >= max(1, int(np.ceil(prices.shape[1] / 2)))
+    aligned = prices.ffill(limit=ffill_limit)[calendar]
+    # ffill이 상장 전 구간을 채우지는 않으므로 첫 관측 이후만 유효
+    return aligned.dropna(how="all")
+
+
+def comparison_analytics(prices, benchmark):
+    """정렬된 종가 패널 → {"rebased", "relative", "returns", "summary"} (모두 (기간 × 종목) 배열 연산)
+
+    rebased: 종목별 첫 관측을 100으로, relative: 벤치마크 대비 가격비를 두 종목이 함께 거래를 시작한 날 100으로.
+    """
+    values = prices.to_numpy(dtype=float)
+    valid = np.isfinite(values)
+    first = valid.argmax(axis=0)
+    cols = np.arange(values.shape[1])
+    rebased = values / values[first, cols] * 100
+
+    b = list(prices.columns).index(benchmark)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = values / values[:, b:b + 1]
+    ratio_first = np.isfinite(ratio).argmax(axis=0)
+    relative = ratio / ratio[ratio_first, cols] * 100
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rets = np.log(values[1:] / values[:-1])
+    n_obs = np.isfinite(rets).sum(axis=0)
+    years = n_obs / 252
+    last = values[len(values) - 1 - np.isfinite(values[::-1]).argmax(axis=0), cols]
+    total = last / values[first, cols]
+    vol = np.nanstd(rets, axis=0, ddof=1) * np.sqrt(252)
+    drawdown = rebased / np.fmax.accumulate(rebased, axis=0) - 1
+    # 벤치마크 베타는 두 종목이 모두 관측된 날만으로
+    both = np.isfinite(rets) & np.isfinite(rets[:, b:b + 1])
+    x = np.where(both, rets, np.nan)
+    y = np.where(both, rets[:, b:b + 1], np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cagr = np.where(years > 0, total ** (1 / years) - 1, np.nan)
+        sharpe = np.nanmean(rets, axis=0) * 252 / vol
+        y_dev = y - np.nanmean(y, axis=0)
+        beta = np.nanmean((x - np.nanmean(x, axis=0)) * y_dev, axis=0) / np.nanmean(y_dev ** 2, axis=0)
+    summary = pd.DataFrame({
+        "티커": prices.columns,
+        "시작일": prices.index[first].strftime("%Y-%m-%d"),
+        "총수익률(%)": (total - 1) * 100,
+        "CAGR(%)": cagr * 100,
+        "연변동성(%)": vol * 100,
+        "샤프": sharpe,
+        "최대낙폭(%)": np.nanmin(drawdown, axis=0) * 100,
+        f"베타({benchmark})": beta,
+        "상대강도": relative[-1],
+    })
+    return {
+        "rebased": pd.DataFrame(rebased, index=prices.index, columns=prices.columns),
+        "relative": pd.DataFrame(relative, index=prices.index, columns=prices.columns),
+        "returns": pd.DataFrame(rets, index=prices.index[1:], columns=prices.columns),
+        "summary": summary,
+    }
+
+
+@arrow_cache(ttl=300)
+def load_comparison(tickers, period="1y", benchmark=None):
+    """티커 튜플 → comparison_analytics 결과 (가격은 fetch_price_panel 한 번으로 일괄 조회)"""
+    prices = fetch_price_panel(tickers, period)
+    if prices.empty:
+        return {}
+    prices = align_price_panel(prices.reindex(columns=[t for t in tickers if t in prices.columns]))
+    if benchmark not in prices.columns:
+        benchmark = prices.columns[0]
+    return comparison_analytics(prices, benchmark)
+
+
+def render_compare():
+    st.markdown("""
+    <div class="page-header">
+        <div class="page-header-icon">⚖️</div>
+        <div>
+            <h1>Compare</h1>
+            <p>여러 종목 누적 성과 · 상대강도 · 롤링 상관관계</p>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    c1, c2 = st.columns([3, 1])
+    with c1:
+        ticker_text = st.text_input(
+            "비교 종목", "^GSPC, AAPL, MSFT, NVDA, 005930.KS", key="cmp_tickers",
+            help=f"쉼표로 구분, 최대 {COMPARE_MAX_TICKERS}개 (티커 또는 종목명)",
+        )
+    with c2:
+        period = st.selectbox("기간", ["6mo", "1y", "2y", "5y", "10y"], index=3, key="cmp_period")
+    tickers = list(dict.fromkeys(normalize_ticker_input(t) for t in ticker_text.split(",") if t.strip()))
+    tickers = [t for t in tickers if t]
+    if len(tickers) > COMPARE_MAX_TICKERS:
+        st.warning(f"처음 {COMPARE_MAX_TICKERS}개 종목만 비교합니다.")
+        tickers = tickers[:COMPARE_MAX_TICKERS]
+    if len(tickers) < 2:
+        st.info("비교할 종목을 두 개 이상 입력하세요.")
+        return
+    benchmark = st.selectbox("상대강도 기준", tickers, index=0, key="cmp_benchmark")
+
+    with st.spinner("📡 가격 일괄 조회..."):
+        result = load_comparison(tuple(tickers), period, benchmark)
+    if not result:
+        st.error("가격 데이터를 불러올 수 없습니다.")
+        return
+    rebased, relative, summary = result["rebased"], result["relative"], result["summary"]
+    missing = [t for t in tickers if t not in rebased.columns]
+    if missing:
+        st.warning(f"가격을 찾을 수 없는 종목: {', '.join(missing)}")
+    if benchmark not in rebased.columns:
+        benchmark = rebased.columns[0]
+
+    st.plotly_chart(make_comparison_chart(rebased, relative, benchmark), use_container_width=True)
+    st.dataframe(
+        summary.sort_values("총수익률(%)", ascending=False).style.format(
+            {c: "{:.2f}" for c in summary.columns if summary[c].dtype.kind == "f"}),
+        use_container_width=True, hide_index=True,
+    )
+
+    with st.expander("📰 비교 종목 뉴스 (저장된 기사, 최근 30일)"):
+        news = _get_news_store().articles_for(tickers, since=time.time() - 30 * 86400)
+        if news.empty:
+            st.caption("저장된 기사가 없습니다. 종목 분석 페이지에서 뉴스를 조회하면 기사가 쌓입니다.")
+        else:
+            label = {"positive": "긍정", "negative": "부정", "neutral": "중립"}
+            st.dataframe(
+                pd.DataFrame({
+                    "게시일": pd.to_datetime(news["published"], unit="s"),
+                    "종목": news["tickers"],
+                    "감성": news["sentiment"].map(label),
+                    "강도": news["strength"],
+                    "제목": news["title"],
+                    "언론사": news["publisher"],
+                    "링크": news["link"],
+                }),
+                use_container_width=True, hide_index=True,
+                column_config={"링크": st.column_config.LinkColumn("링크", display_text="열기")},
+            )
+
+    st.markdown("### 롤링 상관관계 (일간 로그수익률)")
+    returns = result["returns"]
+    if len(returns.columns) < 2 or len(returns) < 20:
+        st.info("상관관계를 계산하기에 데이터가 부족합니다.")
+        return
+    corr_engine = rolling_correlation(returns)
+    c1, c2 = st.columns([1, 2])
+    with c1:
+        window = st.select_slider("윈도우 (거래일)", [20, 60, 120, 250], value=60, key="cmp_corr_window")
+    with c2:
+        labels = corr_engine.index.strftime("%Y-%m-%d")
+        end_label = st.select_slider("기준 시점", options=list(labels), value=labels[-1], key="cmp_corr_end")
+    corr = corr_engine.matrix(end=labels.get_loc(end_label), window=window)
+    st.plotly_chart(make_heatmap(corr), use_container_width=True)
+    others = [t for t in returns.columns if t != benchmark]
+    pair = st.selectbox(f"{benchmark}와의 상관계수 추이", others, key="cmp_corr_pair")
+    series = corr_engine.pair_series(benchmark, pair, window=window).dropna()
+    st.plotly_chart(make_line(series, f"{benchmark} · {pair} {window}일 롤링 상관계수", height=300),
+                    use_container_width=True)
+
+
 # ══════════════════════════════════════════════
 #  RUN
 # ══════════════════════════════════════════════
@@ -0,0 +1,353 @@
+"""
+YW Finance Terminal — 백테스트 엔진
+- 종목 분석 페이지의 RSI/MACD 상태(과매수 · 과매도 · 골든크로스 · 데드크로스)와 이동평균 규칙 검증
+- 신호 · 포지션 · 거래비용 · 자산곡선을 모두 numpy 배열 연산으로 계산
+- 파라미터 스윕을 여러 종목에 걸쳐 프로세스 풀에서 실행
+
+ProcessPoolExecutor 워커가 이 모듈을 import해 함수를 실행하므로 streamlit에 의존하지 않는다.
+"""
+
+import functools
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+# 진입/청산 조건으로 조합할 수 있는 상태
+STATE_NAMES = ["과매도", "과매수", "골든크로스", "데드크로스", "MA 위", "MA 아래"]
+
+DEFAULT_PARAMS = {
+    "rsi_window": 14, "rsi_lower": 30, "rsi_upper": 70,
+    "macd_fast": 12, "macd_slow": 26, "macd_signal": 9,
+    "ma_window": 20,
+}
+
+
+def rolling_mean(a, window):
+    """누적합 기반 단순이동평균 (앞 window-1개는 NaN, 2차원이면 열별)"""
+    a = np.asarray(a, dtype=float)
+    cs = np.concatenate([np.zeros((1,) + a.shape[1:]), np.cumsum(a, axis=0)])
+    out = np.full(a.shape, np.nan)
+    if len(a) >= window:
+        out[window - 1:] = (cs[window:] - cs[:-window]) / window
+    return out
+
+
+def rsi(close, window=14):
+    """RSI — 종목 분석 페이지와 같은 단순이동평균 방식"""
+    delta = np.diff(np.asarray(close, dtype=float), prepend=np.nan)
+    gain = rolling_mean(np.where(delta > 0, delta, 0.0), window)
+    loss = rolling_mean(np.where(delta < 0, -delta, 0.0), window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - 100 / (1 + gain / loss)
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """MACD 선과 시그널 선 — 종목 분석 페이지와 같은 pandas ewm(span) 방식"""
+    s = pd.Series(np.asarray(close, dtype=float))
+    line = s.ewm(span=fast).mean() - s.ewm(span=slow).mean()
+    return line.to_numpy(), line.ewm(span=signal).mean().to_numpy()
+
+
+def indicator_states(close, **params):
+    """상태 이름 → 불리언 배열 (지표가 아직 계산되지 않은 구간은 False)"""
+    p = {**DEFAULT_PARAMS, **params}
+    close = np.asarray(close, dtype=float)
+    r = rsi(close, p["rsi_window"])
+    line, sig = macd(close, p["macd_fast"], p["macd_slow"], p["macd_signal"])
+    ma = rolling_mean(close, p["ma_window"])
+    with np.errstate(invalid="ignore"):
+        return {
+            "과매도": r < p["rsi_lower"],
+            "과매수": r > p["rsi_upper"],
+            "골든크로스": line > sig,
+            "데드크로스": line < sig,
+            "MA 위": close > ma,
+            "MA 아래": close < ma,
+        }
+
+
+def combine_states(states, names, how="and"):
+    """여러 상태를 AND/OR로 결합 (names가 비면 항상 False). 상태 배열 모양이 달라도 브로드캐스트"""
+    if not names:
+        return np.zeros_like(next(iter(states.values())), dtype=bool)
+    op = np.logical_and if how == "and" else np.logical_or
+    return functools.reduce(op, [states[n] for n in names])
+
+
+def hold_positions(entry, exit):
+    """진입 신호에서 매수, 청산 신호에서 매도 후 다음 신호까지 유지 → 0/1 포지션 (2차원이면 열별)
+
+    같은 날 두 신호가 겹치면 진입 우선. 직전 신호를 앞으로 채우는 방식이라 루프가 없다.
+    """
+    entry, exit = np.asarray(entry, dtype=bool), np.asarray(exit, dtype=bool)
+    entry, exit = np.broadcast_arrays(entry, exit)
+    signal = np.where(entry, 1.0, np.where(exit, 0.0, np.nan))
+    idx = np.where(np.isnan(signal), 0, np.arange(len(signal)).reshape((-1,) + (1,) * (signal.ndim - 1)))
+    idx = np.maximum.accumulate(idx, axis=0)
+    filled = np.take_along_axis(signal, idx, axis=0)
+    return np.nan_to_num(filled, nan=0.0)
+
+
+def run_backtest(close, position, cost_bps=10.0):
+    """포지션 → 일간 전략 수익률 (비용 차감). position이 (T, P)면 P개 전략을 한 번에
+
+    t일 종가 기준 포지션은 t+1일 수익률에 적용(룩어헤드 방지)하고, 포지션 변화량만큼
+    cost_bps(편도, bp)를 차감한다.
+    """
+    close = np.asarray(close, dtype=float)
+    position = np.asarray(position, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = np.nan_to_num(np.diff(close, prepend=np.nan) / np.concatenate([[np.nan], close[:-1]]))
+    if position.ndim == 2:
+        ret = ret[:, None]
+    held = np.concatenate([np.zeros((1,) + position.shape[1:]), position[:-1]])
+    turnover = np.abs(np.diff(held, axis=0, prepend=0.0))
+    return held * ret - turnover * cost_bps / 1e4
+
+
+def performance(strategy_returns, periods=TRADING_DAYS):
+    """전략 수익률 (T,) 또는 (T, P) → 성과표 (총수익률 · CAGR · 연변동성 · 샤프 · 최대낙폭 · 거래일 비중)"""
+    r = np.asarray(strategy_returns, dtype=float)
+    if r.ndim == 1:
+        r = r[:, None]
+    equity = np.cumprod(1 + r, axis=0)
+    years = max(len(r) / periods, 1e-9)
+    vol = r.std(axis=0, ddof=1) * np.sqrt(periods) if len(r) > 1 else np.full(r.shape[1], np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = r.mean(axis=0) * periods / vol
+        cagr = equity[-1] ** (1 / years) - 1
+    total = equity[-1] - 1
+    # 낙폭은 수천 개 조합을 한 번에 넘겨도 (T, P) 임시 배열이 하나만 더 생기도록 제자리 연산
+    peak = np.maximum.accumulate(equity, axis=0)
+    np.divide(equity, peak, out=peak)
+    max_drawdown = peak.min(axis=0) - 1
+    active = np.count_nonzero(r, axis=0) / len(r)
+    return pd.DataFrame({
+        "총수익률(%)": total * 100,
+        "CAGR(%)": cagr * 100,
+        "연변동성(%)": vol * 100,
+        "샤프": sharpe,
+        "최대낙폭(%)": max_drawdown * 100,
+        "거래일 비중(%)": active * 100,
+    })
+
+
+def backtest_rules(close, entry=("과매도",), exit=("과매수",), entry_how="and", exit_how="or",
+                   cost_bps=10.0, **params):
+    """상태 조합 전략 1개 백테스트 → {"equity", "buy_hold", "position", "metrics"}
+
+    close는 날짜 인덱스를 가진 Series. metrics는 전략/매수후보유 2행.
+    """
+    states = indicator_states(close.to_numpy(), **params)
+    position = hold_positions(combine_states(states, list(entry), entry_how),
+                              combine_states(states, list(exit), exit_how))
+    strat = run_backtest(close.to_numpy(), position, cost_bps)
+    buy_hold = run_backtest(close.to_numpy(), np.ones(len(close)), 0.0)
+    metrics = performance(np.column_stack([strat, buy_hold]))
+    metrics.index = ["전략", "매수 후 보유"]
+    metrics["매매 횟수"] = [int(np.abs(np.diff(position, prepend=0.0)).sum()), 1]
+    return {
+        "equity": pd.Series(np.cumprod(1 + strat), index=close.index, name="전략"),
+        "buy_hold": pd.Series(np.cumprod(1 + buy_hold), index=close.index, name="매수 후 보유"),
+        "position": pd.Series(position, index=close.index, name="포지션"),
+        "metrics": metrics,
+    }
+
+
+def evaluate_ticker_grid(task):
+    """프로세스 풀 작업 단위: (티커, 종가 배열, RSI 그리드, 규칙) → 파라미터별 성과표
+
+    grid_returns로 종목의 모든 조합을 한 번의 배열 연산으로 평가한다.
+    """
+    ticker, close, spec, rule = task
+    close = np.asarray(close, dtype=float)
+    close = close[np.isfinite(close)]
+    params, returns = grid_returns(close, "RSI 역추세", spec, rule.get("cost_bps", 10.0), rule=rule)
+    if returns.shape[1] == 0:
+        return pd.DataFrame()
+    return pd.concat([params.assign(티커=ticker), performance(returns)], axis=1)
+
+
+def sweep(closes, spec, rule, executor=None):
+    """여러 종목 × 파라미터 조합 스윕 → 성과표. executor(ProcessPoolExecutor 등)가 있으면 종목별 병렬
+
+    closes: 종가 DataFrame (열: 티커), spec: {"rsi_window": [...], "rsi_lower": [...], "rsi_upper": [...]},
+    rule: {"entry": [...], "exit": [...], "entry_how", "exit_how", "cost_bps"}.
+    """
+    tasks = [(t, closes[t].dropna().to_numpy(), dict(spec), rule) for t in closes.columns]
+    results = executor.map(evaluate_ticker_grid, tasks) if executor is not None else map(evaluate_ticker_grid, tasks)
+    frames = [df for df in results if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    table = pd.concat(frames, ignore_index=True)
+    return table[["티커"] + [c for c in table.columns if c != "티커"]]
+
+
+# ─── 파라미터 그리드 최적화 ───
+# 같은 윈도우의 지표는 한 번만 계산하고, 임계값·조합은 배열 축으로 브로드캐스트해
+# (T, 조합 수) 수익률 행렬을 한 번에 만든다. 지표는 모두 과거 데이터만 쓰므로 전체 기간에서
+# 한 번 계산한 행렬을 워크포워드 구간별로 잘라 평가해도 룩어헤드가 없다.
+
+GRID_FAMILIES = {
+    "RSI 역추세": ["rsi_window", "rsi_lower", "rsi_upper"],
+    "MA 크로스": ["ma_fast", "ma_slow"],
+    "MACD": ["macd_fast", "macd_slow", "macd_signal"],
+}
+
+
+def _window_means(cs, windows):
+    """누적합 cs (T+1,) 하나로 여러 윈도우 이동평균 → (T, W)"""
+    t = len(cs) - 1
+    out = np.full((t, len(windows)), np.nan)
+    for j, w in enumerate(windows):
+        if t >= w:
+            out[w - 1:, j] = (cs[w:] - cs[:-w]) / w
+    return out
+
+
+def _rsi_grid(close, windows, lowers, uppers, rule=None):
+    """RSI 기간 × 하한 × 상한. 상승/하락폭 누적합은 한 번만 계산하고 RSI 기간별로 블록 생성
+
+    rule이 없으면 과매도 진입 · 과매수 청산. rule({"entry", "exit", "entry_how", "exit_how"})이 있으면
+    RSI 외 상태(MACD · MA)는 기본 파라미터로 한 번 계산해 (T, 1, 1)로 두고 RSI 상태와 브로드캐스트로 결합한다.
+    """
+    if rule is not None:
+        fixed = {k: v[:, None, None] for k, v in indicator_states(close).items() if k not in ("과매도", "과매수")}
+    delta = np.diff(close, prepend=np.nan)
+    cs_gain = np.concatenate([[0.0], np.cumsum(np.where(delta > 0, delta, 0.0))])
+    cs_loss = np.concatenate([[0.0], np.cumsum(np.where(delta < 0, -delta, 0.0))])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = 100 - 100 / (1 + _window_means(cs_gain, windows) / _window_means(cs_loss, windows))
+    lo, up = np.meshgrid(lowers, uppers, indexing="ij")
+    for j, w in enumerate(windows):
+        with np.errstate(invalid="ignore"):
+            # (T, L, 1) < 하한 · (T, 1, U) > 상한 → (T, L, U)
+            oversold = r[:, j, None, None] < lowers[None, :, None]
+            overbought = r[:, j, None, None] > uppers[None, None, :]
+        if rule is None:
+            entry, exit = oversold, overbought
+        else:
+            states = {**fixed, "과매도": oversold, "과매수": overbought}
+            entry = combine_states(states, list(rule["entry"]), rule.get("entry_how", "and"))
+            exit = combine_states(states, list(rule["exit"]), rule.get("exit_how", "or"))
+        position = np.broadcast_to(hold_positions(entry, exit), (len(close), len(lowers), len(uppers)))
+        params = np.column_stack([np.full(lo.size, w), lo.ravel(), up.ravel()])
+        yield params, position.reshape(len(close), -1)
+
+
+def _ma_grid(close, fasts, slows):
+    """단기 MA > 장기 MA 구간 보유. 모든 MA 길이를 누적합 하나로"""
+    lengths = np.union1d(fasts, slows)
+    ma = _window_means(np.concatenate([[0.0], np.cumsum(close)]), lengths)
+    slow_ma = ma[:, np.searchsorted(lengths, slows)]
+    for f in fasts:
+        with np.errstate(invalid="ignore"):
+            position = ma[:, np.searchsorted(lengths, f), None] > slow_ma
+        yield np.column_stack([np.full(len(slows), f), slows]), position.astype(float)
+
+
+def _macd_grid(close, fasts, slows, signals):
+    """MACD 선 > 시그널 선 구간 보유. EMA는 고유 span마다 한 번, 시그널은 같은 단기 span의 MACD 선들에 한 번에"""
+    spans = np.union1d(fasts, slows)
+    s = pd.Series(close)
+    ema = np.column_stack([s.ewm(span=int(n)).mean().to_numpy() for n in spans])
+    slow_ema = ema[:, np.searchsorted(spans, slows)]
+    sl, sg = np.meshgrid(slows, signals, indexing="ij")
+    for f in fasts:
+        lines = pd.DataFrame(ema[:, np.searchsorted(spans, f), None] - slow_ema)
+        sig = np.stack([lines.ewm(span=int(n)).mean().to_numpy() for n in signals], axis=-1)
+        position = lines.to_numpy()[:, :, None] > sig
+        params = np.column_stack([np.full(sl.size, f), sl.ravel(), sg.ravel()])
+        yield params, position.reshape(len(close), -1).astype(float)
+
+
+def _valid_params(family, params):
+    """의미 없는 조합 제거 (하한 ≥ 상한, 단기 ≥ 장기)"""
+    if family == "RSI 역추세":
+        return params[:, 1] < params[:, 2]
+    return params[:, 0] < params[:, 1]
+
+
+def grid_returns(close, family, spec, cost_bps=10.0, rule=None):
+    """전략군 family의 파라미터 그리드 → (파라미터 DataFrame, 전략 수익률 (T, P))
+
+    spec: {파라미터: 값 목록} (GRID_FAMILIES[family]의 키). 포지션은 바깥 파라미터 블록 단위로만
+    만들어 수익률로 바꾸므로 메모리는 수익률 행렬 하나 + 블록 하나 수준이다.
+    rule: RSI 역추세 전용 진입/청산 상태 조합 (생략 시 과매도 진입 · 과매수 청산).
+    """
+    close = np.asarray(close, dtype=float)
+    names = GRID_FAMILIES[family]
+    values = [np.unique(np.asarray(list(spec[n]), dtype=float)) for n in names]
+    # 기간 · span은 정수, RSI 임계값은 정수로만 입력됐을 때 정수로 표시
+    int_cols = [n for n, v in zip(names, values) if n != "rsi_lower" and n != "rsi_upper" or np.all(v == np.round(v))]
+    for i, n in enumerate(names):
+        if n in int_cols:
+            values[i] = values[i].astype(int)
+    builder = {"RSI 역추세": _rsi_grid, "MA 크로스": _ma_grid, "MACD": _macd_grid}[family]
+    if rule is not None:
+        builder = functools.partial(builder, rule=rule)
+    param_blocks, return_blocks = [], []
+    for params, position in builder(close, *values):
+        keep = _valid_params(family, params)
+        if keep.any():
+            param_blocks.append(params[keep])
+            return_blocks.append(run_backtest(close, position[:, keep], cost_bps))
+    if not param_blocks:
+        return pd.DataFrame(columns=names), np.empty((len(close), 0))
+    table = pd.DataFrame(np.concatenate(param_blocks), columns=names)
+    table[int_cols] = table[int_cols].astype(int)
+    return table, np.concatenate(return_blocks, axis=1)
+
+
+def grid_search(close, family, spec, cost_bps=10.0):
+    """전체 기간 그리드 성과표 (샤프 내림차순)"""
+    params, returns = grid_returns(close, family, spec, cost_bps)
+    if returns.shape[1] == 0:
+        return pd.DataFrame()
+    table = pd.concat([params, performance(returns)], axis=1)
+    return table.sort_values("샤프", ascending=False, na_position="last").reset_index(drop=True)
+
+
+def walk_forward(close, family, spec, n_splits=4, anchored=False, metric="샤프", cost_bps=10.0):
+    """워크포워드 검증 → {"folds": 구간별 표, "oos": 검증 구간 이어붙인 수익률, "summary": 사후 최적 대비 성과}
+
+    기간을 n_splits + 1개로 나눠 k번째 구간에서 metric 최고 파라미터를 고른 뒤 k+1번째 구간에서 평가한다.
+    anchored=True면 학습 구간이 처음부터 누적된다. close는 날짜 인덱스를 가진 Series.
+    """
+    params, returns = grid_returns(close.to_numpy(), family, spec, cost_bps)
+    if returns.shape[1] == 0:
+        return {"folds": pd.DataFrame(), "oos": pd.Series(dtype=float), "summary": pd.DataFrame()}
+    bounds = np.linspace(0, len(close), n_splits + 2).astype(int)
+    names = list(params.columns)
+    rows, oos = [], []
+    for k in range(1, n_splits + 1):
+        train = slice(0 if anchored else bounds[k - 1], bounds[k])
+        test = slice(bounds[k], bounds[k + 1])
+        scores = performance(returns[train])[metric].to_numpy()
+        if np.all(np.isnan(scores)):
+            continue
+        best = int(np.nanargmax(scores))
+        test_perf = performance(returns[test, best]).iloc[0]
+        oos.append(pd.Series(returns[test, best], index=close.index[test]))
+        rows.append({
+            "구간": k,
+            "학습 기간": f"{close.index[train.start]:%Y-%m-%d} ~ {close.index[train.stop - 1]:%Y-%m-%d}",
+            "검증 기간": f"{close.index[test.start]:%Y-%m-%d} ~ {close.index[test.stop - 1]:%Y-%m-%d}",
+            **params.iloc[best].to_dict(),
+            f"학습 {metric}": scores[best],
+            f"검증 {metric}": test_perf[metric],
+            "검증 수익률(%)": test_perf["총수익률(%)"],
+        })
+    if not rows:
+        return {"folds": pd.DataFrame(), "oos": pd.Series(dtype=float), "summary": pd.DataFrame()}
+    folds = pd.DataFrame(rows)
+    folds[names] = folds[names].astype(params.dtypes.to_dict())
+    oos = pd.concat(oos)
+    # 같은 검증 기간에서, 전체 기간을 보고 고른 최적 파라미터(과최적화 기준선)와 비교
+    hindsight = int(np.nanargmax(performance(returns)[metric].to_numpy()))
+    span = close.index.get_indexer(oos.index)
+    summary = performance(np.column_stack([oos.to_numpy(), returns[span, hindsight]]))
+    summary.index = ["워크포워드", "전체 기간 최적(사후)"]
+    return {"folds": folds, "oos": oos, "summary": summary}
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# app.py는 패키지가 아닌 단일 스크립트이므로 저장소 루트를 import 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
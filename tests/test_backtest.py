@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import backtest
+
+
+def _close(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.015, n)))
+
+
+def _single_rsi(close, w, lo, up, cost):
+    s = backtest.indicator_states(close, rsi_window=w, rsi_lower=lo, rsi_upper=up)
+    return backtest.run_backtest(close, backtest.hold_positions(s["과매도"], s["과매수"]), cost)
+
+
+def _single_ma(close, fast, slow, cost):
+    with np.errstate(invalid="ignore"):
+        position = backtest.rolling_mean(close, fast) > backtest.rolling_mean(close, slow)
+    return backtest.run_backtest(close, position.astype(float), cost)
+
+
+def _single_macd(close, fast, slow, signal, cost):
+    line, sig = backtest.macd(close, fast, slow, signal)
+    return backtest.run_backtest(close, (line > sig).astype(float), cost)
+
+
+@pytest.mark.parametrize("family, spec, single", [
+    ("RSI 역추세", {"rsi_window": [7, 14], "rsi_lower": [25, 30, 70], "rsi_upper": [65, 70]}, _single_rsi),
+    ("MA 크로스", {"ma_fast": [5, 20], "ma_slow": [20, 60]}, _single_ma),
+    ("MACD", {"macd_fast": [8, 12], "macd_slow": [26], "macd_signal": [5, 9]}, _single_macd),
+])
+def test_grid_returns_columns_match_single_parameter_backtests(family, spec, single):
+    close = _close()
+    params, returns = backtest.grid_returns(close, family, spec, cost_bps=5.0)
+    assert returns.shape == (len(close), len(params))
+    assert backtest._valid_params(family, params.to_numpy()).all()
+    for k, row in enumerate(params.itertuples(index=False)):
+        np.testing.assert_allclose(returns[:, k], single(close, *row, 5.0), atol=1e-12)
+
+
+def test_grid_returns_drops_invalid_combinations():
+    params, _ = backtest.grid_returns(_close(), "RSI 역추세",
+                                      {"rsi_window": [14], "rsi_lower": [30, 70], "rsi_upper": [70]})
+    assert params.to_dict("records") == [{"rsi_window": 14, "rsi_lower": 30, "rsi_upper": 70}]
+
+
+def test_grid_returns_rule_matches_backtest_rules():
+    close = pd.Series(_close(), index=pd.bdate_range("2020-01-01", periods=600))
+    rule = {"entry": ["과매도", "골든크로스"], "exit": ["과매수", "MA 아래"]}
+    params, returns = backtest.grid_returns(close.to_numpy(), "RSI 역추세",
+                                            {"rsi_window": [10], "rsi_lower": [35], "rsi_upper": [60]}, rule=rule)
+    single = backtest.backtest_rules(close, entry=rule["entry"], exit=rule["exit"],
+                                     rsi_window=10, rsi_lower=35, rsi_upper=60)
+    np.testing.assert_allclose(np.cumprod(1 + returns[:, 0]), single["equity"].to_numpy())
+
+
+@pytest.mark.parametrize("anchored", [False, True])
+def test_walk_forward_selection_ignores_later_data(anchored):
+    index = pd.bdate_range("2018-01-01", periods=1000)
+    close = pd.Series(_close(1000, seed=4), index=index)
+    spec = {"ma_fast": [5, 10, 20], "ma_slow": [30, 60, 120]}
+    base = backtest.walk_forward(close, "MA 크로스", spec, n_splits=4, anchored=anchored)["folds"]
+
+    bounds = np.linspace(0, len(close), 4 + 2).astype(int)
+    for k in range(1, 5):
+        # 학습 구간 k가 끝난 뒤의 가격을 흔들어도 k번째까지의 선택은 그대로여야 한다
+        rng = np.random.default_rng(k)
+        perturbed = close.copy()
+        perturbed.iloc[bounds[k]:] *= np.exp(np.cumsum(rng.normal(0, 0.03, len(close) - bounds[k])))
+        folds = backtest.walk_forward(perturbed, "MA 크로스", spec, n_splits=4, anchored=anchored)["folds"]
+        chosen = ["ma_fast", "ma_slow", "학습 샤프"]
+        pd.testing.assert_frame_equal(folds.loc[folds["구간"] <= k, chosen], base.loc[base["구간"] <= k, chosen])
+        assert folds.loc[folds["구간"] == k, "검증 샤프"].iloc[0] != base.loc[base["구간"] == k, "검증 샤프"].iloc[0]
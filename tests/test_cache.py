@@ -0,0 +1,80 @@
+import pandas as pd
+
+import app
+
+
+def test_arrow_cache_returns_independent_copies_of_raw_values():
+    calls = []
+
+    @app.arrow_cache(ttl=60)
+    def fetch(key):
+        calls.append(key)
+        return {"name": "Test", "tags": ["a"]}
+
+    first = fetch("copy-test")
+    first["name"] = "mutated"
+    first["tags"].append("b")
+    second = fetch("copy-test")
+    assert second == {"name": "Test", "tags": ["a"]}
+    assert len(calls) == 1
+
+
+def test_arrow_cache_round_trips_frames():
+    @app.arrow_cache(ttl=60)
+    def frame(n):
+        return pd.DataFrame({"x": range(n)})
+
+    assert frame(3).equals(frame(3))
+
+
+def test_arrow_cache_miss_returns_same_view_as_hit():
+    source = pd.DataFrame({"x": [1, 2, 3]})
+
+    @app.arrow_cache(ttl=60)
+    def frame(tag):
+        return source
+
+    first = frame("miss-view")
+    assert first is not source
+    assert first.equals(frame("miss-view"))
+    first_writable = first["x"].to_numpy().flags.writeable
+    assert first_writable == frame("miss-view")["x"].to_numpy().flags.writeable
+
+
+def test_arrow_cache_keys_on_qualified_name():
+    class A:
+        @staticmethod
+        @app.arrow_cache(ttl=60)
+        def fetch(key):
+            return {"tag": "A"}
+
+    class B:
+        @staticmethod
+        @app.arrow_cache(ttl=60)
+        def fetch(key):
+            return {"tag": "B"}
+
+    assert A.fetch("same")["tag"] == "A"
+    assert B.fetch("same")["tag"] == "B"
+
+
+def test_arrow_cache_computes_concurrent_misses_once():
+    import threading
+    import time
+
+    calls = []
+
+    @app.arrow_cache(ttl=60)
+    def slow(key):
+        calls.append(key)
+        time.sleep(0.2)
+        return pd.DataFrame({"x": [1, 2]})
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(slow("single-flight"))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == ["single-flight"]
+    assert len(results) == 4 and all(r.equals(results[0]) for r in results)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+import app
+
+
+def _quarters(dates):
+    index = pd.DatetimeIndex(dates)
+    return pd.DataFrame({item: np.arange(1.0, len(index) + 1) for item in app._FLOW_ITEMS}, index=index)
+
+
+def test_ttm_flows_sums_four_consecutive_quarters():
+    q = _quarters(["2023-03-31", "2023-06-30", "2023-09-30", "2023-12-31", "2024-03-31"])
+    ttm = app.ttm_flows(q)
+    assert ttm["revenue"].isna().sum() == 3
+    assert ttm["revenue"].iloc[3] == 1 + 2 + 3 + 4
+    assert ttm["revenue"].iloc[4] == 2 + 3 + 4 + 5
+
+
+def test_ttm_flows_rejects_window_with_missing_quarter():
+    # 2023-09-30 분기가 빠짐 → 네 행이 다섯 분기에 걸치므로 TTM이 아님
+    q = _quarters(["2023-03-31", "2023-06-30", "2023-12-31", "2024-03-31", "2024-06-30", "2024-09-30"])
+    ttm = app.ttm_flows(q)
+    assert ttm["revenue"].iloc[:5].isna().all()
+    assert ttm["revenue"].iloc[5] == 3 + 4 + 5 + 6
+
+
+def test_health_score_band_edges():
+    # 경계값은 엄격 비교(>, <)면 아래 구간, >=면 해당 구간
+    total, details = app.calculate_financial_health_score({
+        "returnOnEquity": 0.20, "returnOnAssets": 0.0, "profitMargins": -0.1,
+        "currentRatio": 1.5, "debtToEquity": 30,
+    })
+    assert details["profitability"] == 7 + 0 + 0
+    assert details["stability"] == 10 + 10
+    assert total == 27
+
+
+def test_health_score_ignores_nan_and_nonpositive_valuation():
+    _, details = app.calculate_financial_health_score({
+        "trailingPE": -5.0, "priceToBook": 0.0, "pegRatio": float("nan"), "revenueGrowth": None,
+    })
+    assert details == {"profitability": 0, "stability": 0, "valuation": 0, "growth": 0}
+
+
+def test_health_score_matches_frame_scoring():
+    infos = {
+        "A": {"returnOnEquity": 0.25, "currentRatio": 2.0, "trailingPE": 9.9, "earningsGrowth": 0.31},
+        "B": {"returnOnAssets": 0.05, "debtToEquity": 199.0, "priceToBook": 6.9, "revenueGrowth": 0.0},
+    }
+    frame = app.score_health_records(infos)
+    for ticker, info in infos.items():
+        total, details = app.calculate_financial_health_score(info)
+        assert total == frame.loc[ticker, "total"]
+        assert details == {c: frame.loc[ticker, c] for c in details}
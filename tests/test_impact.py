@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+import app
+
+
+def test_series_frequency_from_median_gap():
+    assert app.series_frequency(pd.Series(1.0, pd.bdate_range("2024-01-01", periods=30))) == "일간"
+    assert app.series_frequency(pd.Series(1.0, pd.date_range("2024-01-05", periods=30, freq="W-FRI"))) == "주간"
+    assert app.series_frequency(pd.Series(1.0, pd.date_range("2020-01-01", periods=30, freq="MS"))) == "월간"
+    assert app.series_frequency(pd.Series(1.0, pd.date_range("2015-01-01", periods=30, freq="QS"))) == "분기"
+
+
+def test_release_dated_shifts_by_frequency_lag_and_drops_nan():
+    monthly = pd.Series(np.arange(12.0), pd.date_range("2024-01-01", periods=12, freq="MS"))
+    monthly.iloc[1] = np.nan
+    shifted = app.release_dated(monthly)
+    assert len(shifted) == 11 and shifted.iloc[1] == 2.0
+    assert shifted.index[0] == pd.Timestamp("2024-01-01") + pd.Timedelta(days=app.FRED_RELEASE_LAG_DAYS["월간"])
+    quarterly = pd.Series(1.0, pd.date_range("2020-01-01", periods=8, freq="QS"))
+    assert (app.release_dated(quarterly).index - quarterly.index).unique() == [pd.Timedelta(days=120)]
+
+
+def test_detect_indicator_events_merges_moves_within_min_gap():
+    idx = pd.bdate_range("2024-01-01", periods=200)
+    values = np.zeros(len(idx))
+    values[50:] += 5.0   # 상승 이벤트
+    values[55:] += 4.0   # 5영업일 뒤 후속 변동 → 같은 국면
+    values[120:] -= 6.0  # 하락 이벤트
+    values += np.random.default_rng(0).normal(0, 0.1, len(idx)).cumsum() * 0.01
+    events = app.detect_indicator_events(pd.Series(values, idx), z=3, min_gap_days=20)
+    assert list(events.index) == [idx[50], idx[120]]
+    assert list(events["direction"]) == ["up", "down"]
+    assert events["change"].iloc[0] > 4.5
+
+
+def test_detect_indicator_events_empty_for_flat_series():
+    flat = pd.Series(1.0, pd.bdate_range("2024-01-01", periods=30))
+    events = app.detect_indicator_events(flat)
+    assert events.empty and list(events.columns) == ["change", "direction"]
+
+
+def _event_prices():
+    idx = pd.bdate_range("2024-01-01", periods=40)
+    rng = np.random.default_rng(2)
+    prices = pd.DataFrame(100 * np.exp(rng.normal(0, 0.01, (40, 2)).cumsum(axis=0)), idx, columns=["A", "B"])
+    bench = pd.Series(100 * np.exp(rng.normal(0, 0.01, 40).cumsum()), idx)
+    return prices, bench
+
+
+def test_event_study_matches_manual_car():
+    prices, bench = _event_prices()
+    car = app.event_study(prices, [prices.index[10]], bench, horizon=3)
+    abnormal = np.log(prices).diff().sub(np.log(bench).diff(), axis=0)
+    np.testing.assert_allclose(car.iloc[0].to_numpy(), abnormal.iloc[10:14].sum().to_numpy())
+
+
+def test_event_study_rolls_holiday_to_next_session_and_drops_edges():
+    prices, bench = _event_prices()
+    sunday = prices.index[10] - pd.Timedelta(days=1)  # 2024-01-14(일) → 다음 거래일 01-15
+    car = app.event_study(prices, [prices.index[0], sunday, prices.index[-2]], bench, horizon=3)
+    assert list(car.index) == [sunday]
+    expected = app.event_study(prices, [prices.index[10]], bench, horizon=3)
+    np.testing.assert_allclose(car.to_numpy(), expected.to_numpy())
+
+
+def test_event_study_nan_inside_window_gives_nan():
+    prices, bench = _event_prices()
+    prices.iloc[12, 0] = np.nan
+    car = app.event_study(prices, [prices.index[10], prices.index[20]], bench, horizon=3)
+    assert np.isnan(car.iloc[0, 0]) and np.isfinite(car.iloc[0, 1])
+    assert car.iloc[1].notna().all()
+
+
+def _indefinite_cov():
+    # 쌍별로 추정한 상관행렬은 양반정치가 아닐 수 있다 (고유값 하나가 음수)
+    return np.array([[1.0, 0.9, -0.9], [0.9, 1.0, 0.9], [-0.9, 0.9, 1.0]])
+
+
+def test_nearest_psd_repairs_negative_eigenvalues():
+    cov = _indefinite_cov()
+    assert np.linalg.eigvalsh(cov).min() < 0
+    fixed = app._nearest_psd(cov)
+    np.testing.assert_allclose(fixed, fixed.T)
+    assert np.linalg.eigvalsh(fixed).min() > -1e-12
+    np.linalg.cholesky(fixed + np.eye(3) * 1e-12)
+
+
+def test_nearest_psd_keeps_valid_covariance():
+    a = np.random.default_rng(0).normal(size=(50, 3))
+    cov = np.cov(a, rowvar=False)
+    np.testing.assert_allclose(app._nearest_psd(cov), cov, atol=1e-12)
+
+
+def _scenario_inputs():
+    tickers = ["A", "B", "C"]
+    sens = pd.DataFrame({"beta": [0.02, -0.01, 0.005], "se": [0.005, 0.004, 0.002]}, index=tickers)
+    resid_cov = pd.DataFrame(_indefinite_cov() * 1e-4, index=tickers, columns=tickers)
+    return sens, resid_cov
+
+
+def test_simulate_scenario_shape_order_and_bands():
+    sens, resid_cov = _scenario_inputs()
+    out = app.simulate_scenario(sens, resid_cov, shock=1.0, groups={"AB": ["A", "B"], "none": ["Z"]},
+                                n_paths=2000, seed=7)
+    assert list(out.index) == ["A", "B", "C", "AB"]
+    assert list(out.columns) == ["구분", "중앙값(%)", "하단 5%", "상단 95%", "하락 확률(%)"]
+    assert list(out["구분"]) == ["종목", "종목", "종목", "그룹"]
+    assert (out["하단 5%"] <= out["중앙값(%)"]).all() and (out["중앙값(%)"] <= out["상단 95%"]).all()
+    assert out["하락 확률(%)"].between(0, 100).all()
+    assert out.loc["A", "중앙값(%)"] > 0 > out.loc["B", "중앙값(%)"]
+
+
+def test_simulate_scenario_is_seeded():
+    sens, resid_cov = _scenario_inputs()
+    first = app.simulate_scenario(sens, resid_cov, shock=-2.0, n_paths=500, seed=3)
+    pd.testing.assert_frame_equal(first, app.simulate_scenario(sens, resid_cov, shock=-2.0, n_paths=500, seed=3))
+    assert not first.equals(app.simulate_scenario(sens, resid_cov, shock=-2.0, n_paths=500, seed=4))
+
+
+def test_simulate_scenario_without_uncertainty_is_deterministic():
+    sens, resid_cov = _scenario_inputs()
+    sens["se"] = 0.0
+    out = app.simulate_scenario(sens, resid_cov * 0, shock=2.0, n_paths=200)
+    expected = np.expm1(sens["beta"] * 2.0) * 100
+    for col in ["중앙값(%)", "하단 5%", "상단 95%"]:
+        np.testing.assert_allclose(out[col].to_numpy(), expected.to_numpy(), atol=1e-3)  # Cholesky 안정화 항 1e-12
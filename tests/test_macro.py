@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+import app
+
+
+def _macro_frame(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=n)
+    df = pd.DataFrame({
+        "a": base + rng.normal(scale=0.5, size=n),
+        "b": -base + rng.normal(scale=0.8, size=n),
+        "c": rng.normal(loc=1e4, scale=50, size=n),  # 큰 수준값 — 누적합 자릿수 손실 확인용
+    }, index=pd.date_range("2015-01-31", periods=n, freq="ME"))
+    df.iloc[5:15, 0] = np.nan
+    df.iloc[40:43, 1] = np.nan
+    df.iloc[100::7, 2] = np.nan
+    return df
+
+
+def test_rolling_correlation_matrix_matches_pandas_corr():
+    df = _macro_frame()
+    engine = app.RollingCorrelation(df)
+    pd.testing.assert_frame_equal(engine.matrix(), df.corr(min_periods=10), atol=1e-10)
+    window = df.iloc[120:180]
+    pd.testing.assert_frame_equal(engine.matrix(end=179, window=60), window.corr(min_periods=10), atol=1e-10)
+
+
+def test_rolling_correlation_pair_series_matches_pandas_rolling():
+    df = _macro_frame()
+    engine = app.RollingCorrelation(df)
+    for a, b in [("a", "b"), ("a", "c"), ("b", "c")]:
+        expected = df[a].rolling(24, min_periods=12).corr(df[b])
+        got = engine.pair_series(a, b, window=24, min_periods=12)
+        np.testing.assert_allclose(got.to_numpy(), expected.to_numpy(), atol=1e-10)
+
+
+def test_rolling_correlation_update_matches_full_rebuild():
+    df = _macro_frame()
+    engine = app.RollingCorrelation(df.iloc[:150])
+    assert engine.extends(df)
+    engine.update(df)
+    assert len(engine.index) == len(df)
+    pd.testing.assert_frame_equal(engine.matrix(), df.corr(min_periods=10), atol=1e-10)
+    pd.testing.assert_frame_equal(engine.matrix(end=len(df) - 1, window=36), df.iloc[-36:].corr(min_periods=10),
+                                  atol=1e-10)
+    expected = df["a"].rolling(36, min_periods=10).corr(df["c"])
+    np.testing.assert_allclose(engine.pair_series("a", "c", window=36).to_numpy(), expected.to_numpy(), atol=1e-10)
+
+
+def test_rolling_correlation_rejects_changed_history():
+    df = _macro_frame()
+    engine = app.RollingCorrelation(df.iloc[:150])
+    revised = df.copy()
+    revised.iloc[10, 1] += 1.0
+    assert not engine.extends(revised)
+
+
+def test_fit_ols_with_lags_matches_lstsq():
+    df = _macro_frame()
+    fit = app.fit_ols(df, "c", ["a", "b"], lags=(0, 2))
+    frame = pd.DataFrame({
+        "a": df["a"], "a(t-2)": df["a"].shift(2), "b": df["b"], "b(t-2)": df["b"].shift(2), "y": df["c"],
+    }).dropna()
+    X = np.column_stack([np.ones(len(frame)), frame[["a", "a(t-2)", "b", "b(t-2)"]].to_numpy()])
+    Y = frame["y"].to_numpy()
+    beta = np.linalg.lstsq(X, Y, rcond=None)[0]
+    resid = Y - X @ beta
+    dof = len(Y) - X.shape[1]
+    se = np.sqrt(np.diag(np.linalg.inv(X.T @ X)) * (resid @ resid) / dof)
+    r2 = 1 - (resid @ resid) / ((Y - Y.mean()) ** 2).sum()
+
+    assert fit["n"] == len(frame)
+    assert list(fit["coef"].index) == ["상수", "a", "a(t-2)", "b", "b(t-2)"]
+    np.testing.assert_allclose(fit["coef"]["계수"].to_numpy(), beta, rtol=1e-8)
+    np.testing.assert_allclose(fit["coef"]["표준오차"].to_numpy(), se, rtol=1e-8)
+    assert np.isclose(fit["r2"], r2)
+    assert np.isclose(fit["adj_r2"], 1 - (1 - r2) * (len(Y) - 1) / dof)
+    assert fit["fitted"].index.equals(frame.index)
+
+
+def test_fit_ols_single_regressor_matches_polyfit():
+    df = _macro_frame()
+    fit = app.fit_ols(df, "b", ["a"], lags=(1,))
+    pair = pd.DataFrame({"x": df["a"].shift(1), "y": df["b"]}).dropna()
+    slope, intercept = np.polyfit(pair["x"], pair["y"], 1)
+    np.testing.assert_allclose(fit["coef"]["계수"].to_numpy(), [intercept, slope], rtol=1e-8)
+
+
+def test_fit_ols_returns_none_without_enough_observations():
+    df = _macro_frame().iloc[:4]  # 관측 4개 ≤ 설명변수 2개 + 2
+    assert app.fit_ols(df, "c", ["a", "b"]) is None
+
+
+def test_batch_ols_scan_matches_pairwise_polyfit():
+    df = _macro_frame()
+    table = app.batch_ols_scan(df, lag=1).set_index(["X", "Y"])
+    assert len(table) == 6
+    for (x, y), row in table.iterrows():
+        pair = pd.DataFrame({"x": df[x].shift(1), "y": df[y]}).dropna()
+        slope, intercept = np.polyfit(pair["x"], pair["y"], 1)
+        resid = pair["y"] - (slope * pair["x"] + intercept)
+        sxx = ((pair["x"] - pair["x"].mean()) ** 2).sum()
+        assert row["관측수"] == len(pair)
+        assert np.isclose(row["기울기"], slope, rtol=1e-8)
+        assert np.isclose(row["표준오차"], np.sqrt((resid ** 2).sum() / (len(pair) - 2) / sxx), rtol=1e-8)
+        assert np.isclose(row["R²"], pair["x"].corr(pair["y"]) ** 2, rtol=1e-8)
+    assert table["R²"].is_monotonic_decreasing
+
+
+def test_batch_ols_scan_drops_pairs_below_min_obs():
+    df = _macro_frame()
+    df.iloc[30:, 0] = np.nan
+    table = app.batch_ols_scan(df, lag=0, min_obs=25)
+    assert not ((table["X"] == "a") | (table["Y"] == "a")).any()
+
+
+def _beta_inputs(n=300, seed=1):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2022-01-03", periods=n)
+    x = pd.Series(rng.normal(0, 0.01, n), idx, name="mkt")
+    y = pd.DataFrame({
+        "lo": 0.5 * x + rng.normal(0, 0.005, n),
+        "hi": 100 + 1.8 * x + rng.normal(0, 0.01, n),  # 큰 수준값 + 큰 베타
+    })
+    x.iloc[50:58] = np.nan
+    y.iloc[120:140, 0] = np.nan
+    y.iloc[200:203, 1] = np.nan
+    return y, x
+
+
+def _window_polyfit(y, x, window, min_periods):
+    out = {"beta": [], "alpha": [], "r2": []}
+    for end in range(len(y)):
+        pair = pd.DataFrame({"x": x.iloc[max(end - window + 1, 0):end + 1],
+                             "y": y.iloc[max(end - window + 1, 0):end + 1]}).dropna()
+        if len(pair) < min_periods:
+            for k in out:
+                out[k].append(np.nan)
+            continue
+        slope, intercept = np.polyfit(pair["x"], pair["y"], 1)
+        out["beta"].append(slope)
+        out["alpha"].append(intercept)
+        out["r2"].append(pair["x"].corr(pair["y"]) ** 2)
+    return {k: np.array(v) for k, v in out.items()}
+
+
+def test_rolling_beta_series_matches_window_polyfit():
+    y, x = _beta_inputs()
+    got = app.rolling_beta(y["lo"], x, window=40, min_periods=20)
+    expected = _window_polyfit(y["lo"], x, 40, 20)
+    assert isinstance(got["beta"], pd.Series) and got["beta"].name == "lo"
+    for k in ("beta", "alpha", "r2"):
+        np.testing.assert_allclose(got[k].to_numpy(), expected[k], rtol=1e-7, atol=1e-9)
+
+
+def test_rolling_beta_frame_matches_per_column_series():
+    y, x = _beta_inputs()
+    got = app.rolling_beta(y, x, window=60)
+    assert list(got["beta"].columns) == ["lo", "hi"]
+    for col in y.columns:
+        expected = _window_polyfit(y[col], x, 60, 30)
+        for k in ("beta", "alpha", "r2"):
+            np.testing.assert_allclose(got[k][col].to_numpy(), expected[k], rtol=1e-7, atol=1e-9)
@@ -0,0 +1,47 @@
+import pytest
+
+import app
+
+
+@pytest.mark.parametrize("headline", [
+    "Analysts turn bearish on chipmakers",
+    "Weakness in China sales weighs on outlook",
+    "Dollar could weaken further",
+    "Risky bets pile up in credit markets",
+    "Regulators probe fraudulent accounting",
+    "Shares have fallen for a third session",
+])
+def test_derived_negative_forms(headline):
+    assert app.score_headline(headline)[0] == "negative"
+
+
+@pytest.mark.parametrize("headline", [
+    "Retailer turns profitable ahead of schedule",
+    "Strongest quarter on record",
+    "Stocks rallied after the report",
+])
+def test_derived_positive_forms(headline):
+    assert app.score_headline(headline)[0] == "positive"
+
+
+def test_derived_form_counts_once_with_its_keyword():
+    # weak + weakness는 같은 키워드 1개
+    assert app.score_headline("Weak demand and weakness in margins") == ("negative", 1)
+
+
+def test_word_boundaries_still_apply():
+    assert app.score_headline("Chief executive outlines plan against rivals") == ("neutral", 0)
+
+
+@pytest.mark.parametrize("headline", [
+    "Bank sells interest-bearing notes",
+    "Company recorded a one-time charge",
+    "Label releases new recording",
+])
+def test_excluded_inflections_do_not_match(headline):
+    assert app.score_headline(headline) == ("neutral", 0)
+
+
+def test_excluded_inflections_keep_base_keyword():
+    assert app.score_headline("Bears take control of the market")[0] == "negative"
+    assert app.score_headline("Record revenue for the quarter")[0] == "positive"